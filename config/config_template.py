@@ -324,6 +324,8 @@ Example 3: Multi-location customer:
 import os
 from pathlib import Path
 
+from src.utils.config_defaults import performance_defaults
+
 # ============================================================================
 # CUSTOMER SPECIFIC CONFIGURATION - EDIT THESE VALUES
 # ============================================================================
@@ -432,3 +434,63 @@ POSTGRES_PORT = 5432
 POSTGRES_DATABASE = "invoice_staging"
 POSTGRES_USER = "invoice_user"
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "")
+
+# ============================================================================
+# PERFORMANCE TUNING
+# ============================================================================
+# Values live in src/utils/config_defaults.py (shared with config.py, which
+# fills them in for older config_customer.py files). Override them below
+# this section or via the LS_* environment variables.
+_DEFAULTS = performance_defaults(STORAGE_BASE)
+
+# Invoice processing worker pool (extraction, SQLite, ISDOC, PostgreSQL)
+WORKER_THREADS = _DEFAULTS["WORKER_THREADS"]
+# Requests allowed to wait for a free worker; beyond this /invoice returns 503
+WORKER_QUEUE_SIZE = _DEFAULTS["WORKER_QUEUE_SIZE"]
+# Maximum number of invoices in one POST /invoices/batch request
+MAX_BATCH_SIZE = _DEFAULTS["MAX_BATCH_SIZE"]
+# Maximum size of a raw/multipart PDF upload to POST /invoice
+MAX_UPLOAD_SIZE_MB = _DEFAULTS["MAX_UPLOAD_SIZE_MB"]
+# Recently processed PDF hashes kept in memory for duplicate short-circuit
+DUPLICATE_CACHE_SIZE = _DEFAULTS["DUPLICATE_CACHE_SIZE"]
+# Cached /invoice responses for Idempotency-Key retries (count, lifetime)
+IDEMPOTENCY_CACHE_SIZE = _DEFAULTS["IDEMPOTENCY_CACHE_SIZE"]
+IDEMPOTENCY_TTL_SECONDS = _DEFAULTS["IDEMPOTENCY_TTL_SECONDS"]
+
+# PDF extraction process pool - pdfplumber is CPU bound and holds the GIL,
+# so extraction runs in separate processes (0 = extract in worker thread).
+# Processes are restarted after N PDFs to release pdfminer memory.
+EXTRACTION_PROCESSES = _DEFAULTS["EXTRACTION_PROCESSES"]
+EXTRACTION_MAX_TASKS_PER_CHILD = _DEFAULTS["EXTRACTION_MAX_TASKS_PER_CHILD"]
+# Invoices with at least this many pages are extracted page-parallel in
+# tasks of EXTRACTION_PAGES_PER_TASK pages (0 = always whole PDF per process)
+EXTRACTION_PAGE_PARALLEL_MIN_PAGES = _DEFAULTS["EXTRACTION_PAGE_PARALLEL_MIN_PAGES"]
+EXTRACTION_PAGES_PER_TASK = _DEFAULTS["EXTRACTION_PAGES_PER_TASK"]
+# Cache of extracted page texts (gzip, keyed by PDF hash + pdfplumber
+# version) - re-extraction of archived PDFs skips pdfplumber
+TEXT_CACHE_ENABLED = _DEFAULTS["TEXT_CACHE_ENABLED"]
+TEXT_CACHE_DIR = _DEFAULTS["TEXT_CACHE_DIR"]
+# Generic extractor (non-L&Š suppliers): layout analysis above this time
+# per page is logged as a warning
+GENERIC_LAYOUT_MAX_MS_PER_PAGE = _DEFAULTS["GENERIC_LAYOUT_MAX_MS_PER_PAGE"]
+
+# Asynchronous jobs (POST /invoice?async=true) - background workers and
+# directory for persisted request payloads. At most JOB_QUEUE_SIZE jobs
+# are queued or running; beyond that /invoice?async=true returns 503
+# (0 = unlimited).
+JOB_WORKERS = _DEFAULTS["JOB_WORKERS"]
+JOB_QUEUE_SIZE = _DEFAULTS["JOB_QUEUE_SIZE"]
+JOBS_DIR = _DEFAULTS["JOBS_DIR"]
+
+# SQLite (invoices.db) - WAL journal, one reusable connection per thread.
+# Writers wait up to SQLITE_BUSY_TIMEOUT_MS for the write lock; NORMAL
+# synchronous is durable in WAL mode except for the last commits on power loss.
+SQLITE_BUSY_TIMEOUT_MS = _DEFAULTS["SQLITE_BUSY_TIMEOUT_MS"]
+SQLITE_CACHE_SIZE_KB = _DEFAULTS["SQLITE_CACHE_SIZE_KB"]
+SQLITE_SYNCHRONOUS = _DEFAULTS["SQLITE_SYNCHRONOUS"]
+# Writes are executed by one writer thread which commits everything queued
+# (up to SQLITE_GROUP_COMMIT_MAX writes) in one transaction. A window > 0
+# waits that many ms for more writes - worth it with SQLITE_SYNCHRONOUS=FULL.
+SQLITE_WRITE_QUEUE_ENABLED = _DEFAULTS["SQLITE_WRITE_QUEUE_ENABLED"]
+SQLITE_GROUP_COMMIT_MAX = _DEFAULTS["SQLITE_GROUP_COMMIT_MAX"]
+SQLITE_GROUP_COMMIT_WINDOW_MS = _DEFAULTS["SQLITE_GROUP_COMMIT_WINDOW_MS"]
@@ -6,28 +6,38 @@ Supplier Invoice Loader - Entry Point
 Multi-customer SaaS for automated invoice processing.
 """
 
+import asyncio
 import time
-import hashlib
 from datetime import datetime
-from typing import Optional
-from pathlib import Path
-import base64
+from typing import Optional, Tuple
 
-from fastapi import FastAPI, Header, HTTPException, Depends
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, Header, HTTPException, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
-from src.api import models
-from src.utils import config, monitoring, notifications
+from src.api import models, uploads
+from src.utils import config, monitoring, notifications, worker_pool
 from src.utils.text_utils import clean_string
+from src.utils.worker_pool import WorkerPoolFull
 from src.database import database
-from src.database.postgres_staging import PostgresStagingClient
-from src.extractors.ls_extractor import extract_invoice_data
-from src.business.isdoc_service import generate_isdoc_xml
+from src.extractors.extraction_pool import extraction_pool
+from src.extractors.registry import extractor_registry
+from src.business.invoice_processor import (
+    process_invoice_batch,
+    process_invoice_file,
+    process_invoice_request,
+)
+from src.business.job_queue import JobQueueFull, job_manager
+from src.business.duplicate_check import duplicate_index
+from src.business.idempotency import default_key, idempotency_registry, pdf_hash_b64
 
 # Start time for uptime calculation
 START_TIME = time.time()
 
+# Upper bound for GET /jobs/{job_id}/wait long-poll
+MAX_JOB_WAIT_SECONDS = 60
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Supplier Invoice Loader",
@@ -42,13 +52,14 @@ app = FastAPI(
 
 @app.middleware("http")
 async def track_requests(request, call_next):
-    """Middleware to track API requests in metrics"""
-    # Increment request counter
-    monitoring.metrics.increment_api_request()
-
-    # Process request
-    response = await call_next(request)
+    """Middleware to track API requests in metrics (by HTTP status)"""
+    try:
+        response = await call_next(request)
+    except Exception:
+        monitoring.metrics.increment_api_request(500)
+        raise
 
+    monitoring.metrics.increment_api_request(response.status_code)
     return response
 
 
@@ -67,12 +78,14 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)):
         HTTPException: If API key is invalid or missing
     """
     if not x_api_key:
+        monitoring.metrics.increment_auth_failure()
         raise HTTPException(
             status_code=422,
             detail="Missing X-API-Key header"
         )
 
     if x_api_key != config.API_KEY:
+        monitoring.metrics.increment_auth_failure()
         raise HTTPException(
             status_code=401,
             detail="Invalid API key"
@@ -105,7 +118,7 @@ async def health():
 
 
 @app.get("/metrics")
-async def metrics():
+def metrics():
     """Metrics endpoint - basic metrics in JSON format"""
     uptime = int(time.time() - START_TIME)
 
@@ -127,45 +140,20 @@ async def metrics():
 
 
 @app.get("/metrics/prometheus", response_class=PlainTextResponse)
-async def metrics_prometheus():
-    """Metrics endpoint - Prometheus format"""
-    uptime = int(time.time() - START_TIME)
-
-    # Get stats from database
-    try:
-        stats = database.get_stats()
-        total_processed = stats.get('total', 0)
-        total_errors = stats.get('by_status', {}).get('error', 0)
-    except Exception:
-        total_processed = 0
-        total_errors = 0
-
-    prometheus_metrics = f"""# HELP app_uptime_seconds Application uptime in seconds
-# TYPE app_uptime_seconds gauge
-app_uptime_seconds {uptime}
-
-# HELP app_invoices_processed_total Total number of invoices processed
-# TYPE app_invoices_processed_total counter
-app_invoices_processed_total {total_processed}
-
-# HELP app_invoices_errors_total Total number of invoice processing errors
-# TYPE app_invoices_errors_total counter
-app_invoices_errors_total {total_errors}
-
-# HELP app_info Application information
-# TYPE app_info gauge
-app_info{{version="2.0.0",customer="{config.CUSTOMER_NAME}"}} 1
-"""
+def metrics_prometheus():
+    """
+    Metrics endpoint - Prometheus format
 
-    return prometheus_metrics
+    Labeled counters, gauges and histograms from the in-memory registry
+    (updated while processing) - a scrape does not query the database.
+    """
+    return monitoring.get_metrics_prometheus()
 
 
 @app.get("/stats")
-async def stats():
+def stats():
     """Statistics endpoint - database statistics"""
     try:
-        # Initialize database if needed
-        database.init_database()
         stats = database.get_stats()
         # Add total_invoices for backward compatibility with tests
         if "total" in stats and "total_invoices" not in stats:
@@ -189,7 +177,7 @@ async def stats():
 # ============================================================================
 
 @app.get("/status")
-async def status(api_key: str = Depends(verify_api_key)):
+def status(api_key: str = Depends(verify_api_key)):
     """
     Detailed status endpoint - requires authentication
 
@@ -216,12 +204,19 @@ async def status(api_key: str = Depends(verify_api_key)):
             "smtp": "unknown"  # Could add SMTP check
         },
         "statistics": db_stats,
+        "workers": worker_pool.invoice_pool.get_stats(),
+        "jobs": job_manager.get_stats(),
+        "extraction_pool": extraction_pool.get_stats(),
+        "extractors": extractor_registry.get_stats(),
+        "sqlite_writer": database.write_queue.get_stats(),
+        "duplicate_cache": duplicate_index.get_stats(),
+        "idempotency": idempotency_registry.get_stats(),
         "uptime_seconds": int(time.time() - START_TIME)
     }
 
 
 @app.get("/invoices")
-async def list_invoices(
+def list_invoices(
     limit: int = 100,
     api_key: str = Depends(verify_api_key)
 ):
@@ -235,8 +230,6 @@ async def list_invoices(
         List of invoices with metadata
     """
     try:
-        # Initialize database if needed
-        database.init_database()
         # Get invoices from database
         invoices = database.get_all_invoices(limit=limit)
 
@@ -253,15 +246,33 @@ async def list_invoices(
         }
 
 
-@app.post("/invoice")
+@app.post("/invoice", openapi_extra=uploads.INVOICE_REQUEST_BODY)
 async def process_invoice(
-    request: models.InvoiceRequest,
+    http_request: Request,
+    async_job: bool = Query(False, alias="async", description="Queue job and return 202"),
+    idempotency_key: Optional[str] = Header(None),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Process invoice - requires authentication
 
-    Main endpoint for invoice processing from n8n workflow
+    Main endpoint for invoice processing from n8n workflow.
+    The blocking pipeline runs on the worker pool so the event loop
+    (and /health) stays responsive; returns 503 when the pool is full.
+
+    Accepts InvoiceRequest JSON with base64 PDF, or the raw PDF
+    (application/pdf, application/octet-stream - metadata in query
+    parameters) or multipart/form-data with a 'file' part. Raw and
+    multipart uploads are streamed to disk without base64 overhead.
+
+    With ?async=true the request is persisted and queued, and the endpoint
+    returns 202 with a job ID immediately (503 when JOB_QUEUE_SIZE jobs
+    are already waiting). Poll GET /jobs/{job_id}.
+
+    Requests are idempotent per Idempotency-Key header (default:
+    message_id + PDF hash): a retry while the first attempt is running
+    waits for it, a later retry gets the cached response
+    (Idempotent-Replayed: true header).
 
     Workflow:
     1. Decode and save PDF
@@ -271,143 +282,72 @@ async def process_invoice(
     5. Save XML to disk
     6. [Optional] Save to PostgreSQL staging database for invoice-editor
 
-    Args:
-        request: Invoice data including PDF file
-
     Returns:
         Processing result with status and extracted data
     """
-    try:
-        # 1. Decode PDF file
-        pdf_data = base64.b64decode(request.file_b64)
-
-        # Generate unique filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_filename = f"{timestamp}_{request.filename}"
-        pdf_path = config.PDF_DIR / pdf_filename
-
-        # Save PDF to disk
-        pdf_path.write_bytes(pdf_data)
-        print(f"✅ PDF saved: {pdf_path}")
-
-        # Calculate file hash for duplicate detection
-        file_hash = hashlib.md5(pdf_data).hexdigest()
-
-        # 2. Extract data from PDF
-        invoice_data = extract_invoice_data(str(pdf_path))
-
-        if not invoice_data:
-            raise Exception("Failed to extract data from PDF")
-
-        print(f"✅ Data extracted: Invoice {invoice_data.invoice_number}")
-
-        # 3. Save to SQLite database
-        database.init_database()
-        database.save_invoice(
-            customer_name=invoice_data.customer_name,
-            invoice_number=invoice_data.invoice_number,
-            invoice_date=invoice_data.issue_date,
-            total_amount=float(invoice_data.total_amount) if invoice_data.total_amount else 0.0,
-            file_path=str(pdf_path),
-            file_hash=file_hash,
-            status="received"
+    if uploads.is_json_request(http_request):
+        request = await uploads.parse_invoice_json(http_request)
+        key = idempotency_key or default_key(
+            request.message_id,
+            await asyncio.to_thread(pdf_hash_b64, request.file_b64)
         )
-        print(f"✅ Saved to SQLite: {invoice_data.invoice_number}")
-
-        # 4. Generate ISDOC XML
-        xml_filename = f"{invoice_data.invoice_number}.xml"
-        xml_path = config.XML_DIR / xml_filename
-
-        isdoc_xml = generate_isdoc_xml(invoice_data, str(xml_path))
-        print(f"✅ ISDOC XML generated: {xml_path}")
-
-        # 5. Save to PostgreSQL staging database (if enabled)
-        postgres_saved = False
-        postgres_invoice_id = None
-
-        if config.POSTGRES_STAGING_ENABLED:
-            try:
-                # Prepare PostgreSQL config
-                pg_config = {
-                    'host': config.POSTGRES_HOST,
-                    'port': config.POSTGRES_PORT,
-                    'database': config.POSTGRES_DATABASE,
-                    'user': config.POSTGRES_USER,
-                    'password': config.POSTGRES_PASSWORD
-                }
-
-                # Create PostgreSQL client
-                with PostgresStagingClient(pg_config) as pg_client:
-                    # Check for duplicates
-                    is_duplicate = pg_client.check_duplicate_invoice(
-                        invoice_data.supplier_ico,
-                        invoice_data.invoice_number
-                    )
-
-                    if is_duplicate:
-                        print(f"⚠️  Invoice already exists in PostgreSQL staging: {invoice_data.invoice_number}")
-                    else:
-                        # Prepare invoice data for PostgreSQL
-                        invoice_pg_data = {
-                            'supplier_ico': invoice_data.supplier_ico,
-                            'supplier_name': invoice_data.supplier_name,
-                            'supplier_dic': invoice_data.supplier_dic,
-                            'invoice_number': invoice_data.invoice_number,
-                            'invoice_date': invoice_data.issue_date,
-                            'due_date': invoice_data.due_date,
-                            'total_amount': invoice_data.total_amount,
-                            'total_vat': invoice_data.tax_amount,
-                            'total_without_vat': invoice_data.net_amount,
-                            'currency': invoice_data.currency
-                        }
-
-                        # Prepare items data for PostgreSQL
-                        items_pg_data = []
-                        for item in invoice_data.items:
-                            items_pg_data.append({
-                                'line_number': item.line_number,
-                                'name': item.description,
-                                'quantity': item.quantity,
-                                'unit': item.unit,
-                                'price_per_unit': item.unit_price_no_vat,
-                                'ean': item.ean_code,
-                                'vat_rate': item.vat_rate
-                            })
-
-                        # Insert to PostgreSQL
-                        postgres_invoice_id = pg_client.insert_invoice_with_items(
-                            invoice_pg_data,
-                            items_pg_data,
-                            isdoc_xml
-                        )
-
-                        if postgres_invoice_id:
-                            postgres_saved = True
-                            print(f"✅ Saved to PostgreSQL staging: invoice_id={postgres_invoice_id}")
-                        else:
-                            print(f"❌ Failed to save to PostgreSQL staging")
-
-            except Exception as pg_error:
-                # Log error but don't fail the whole process
-                print(f"⚠️  PostgreSQL staging error: {pg_error}")
-                # Continue - invoice is still saved to SQLite and files
-
-        # Return success response
-        return {
-            "success": True,
-            "message": "Invoice processed successfully",
-            "invoice_number": invoice_data.invoice_number,
-            "customer_name": invoice_data.customer_name,
-            "total_amount": float(invoice_data.total_amount) if invoice_data.total_amount else 0.0,
-            "items_count": len(invoice_data.items),
-            "pdf_saved": str(pdf_path),
-            "xml_saved": str(xml_path),
-            "sqlite_saved": True,
-            "postgres_staging_enabled": config.POSTGRES_STAGING_ENABLED,
-            "postgres_saved": postgres_saved,
-            "postgres_invoice_id": postgres_invoice_id,
-            "received_date": request.received_date
-        }
+
+        if async_job:
+            factory = lambda: _queue_invoice(job_manager.submit, request)
+        else:
+            factory = lambda: _run_invoice(process_invoice_request, request)
+
+        (status_code, content), replayed = await idempotency_registry.execute(key, factory)
+        return _invoice_response(status_code, content, replayed)
+
+    # Reject before reading the body when no worker (or job slot) can take it
+    if worker_pool.invoice_pool.is_full or (async_job and job_manager.is_full):
+        raise _server_busy()
+
+    metadata, pdf_path, file_hash = await uploads.receive_pdf_upload(http_request)
+    key = idempotency_key or default_key(metadata.message_id, file_hash)
+
+    if async_job:
+        factory = lambda: _queue_invoice(job_manager.submit_file, metadata, pdf_path, file_hash)
+    else:
+        factory = lambda: _run_invoice(process_invoice_file, metadata, pdf_path, file_hash)
+
+    try:
+        (status_code, content), replayed = await idempotency_registry.execute(key, factory)
+    except HTTPException as e:
+        if e.status_code == 503:
+            # Rejected before processing - no invoice or job refers to the upload
+            pdf_path.unlink(missing_ok=True)
+        raise
+    if replayed and content.get("pdf_saved") != str(pdf_path):
+        # Our copy of the upload was not used
+        pdf_path.unlink(missing_ok=True)
+    return _invoice_response(status_code, content, replayed)
+
+
+def _invoice_response(status_code: int, content: dict, replayed: bool) -> JSONResponse:
+    """JSON response for /invoice, marking idempotent replays"""
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(content), headers=headers)
+
+
+def _server_busy() -> HTTPException:
+    """503 response for full worker pool or job queue - n8n retries the delivery later"""
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, retry later",
+        headers={"Retry-After": "5"}
+    )
+
+
+async def _run_invoice(fn, *args) -> Tuple[int, dict]:
+    """Run invoice pipeline on worker pool and map errors to HTTP"""
+    try:
+        return 200, await worker_pool.invoice_pool.run(fn, *args)
+
+    except WorkerPoolFull as e:
+        print(f"⚠️  Invoice rejected, worker pool full: {e}")
+        raise _server_busy()
 
     except Exception as e:
         # Log error
@@ -421,6 +361,107 @@ async def process_invoice(
         )
 
 
+async def _queue_invoice(submit, *args) -> Tuple[int, dict]:
+    """Persist invoice as async job (202 response)"""
+    try:
+        job_id = await worker_pool.invoice_pool.run(submit, *args)
+    except (WorkerPoolFull, JobQueueFull) as e:
+        print(f"⚠️  Invoice job rejected: {e}")
+        raise _server_busy()
+
+    return 202, {
+        "success": True,
+        "message": "Invoice queued for processing",
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}"
+    }
+
+
+@app.post("/invoices/batch")
+async def process_invoices_batch(
+    request: models.InvoiceBatchRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Process many invoices in one request - requires authentication
+
+    Lets n8n send all PDF attachments of an email in one round trip.
+    Invoices are extracted concurrently, SQLite rows are written in one
+    transaction and PostgreSQL staging uses one connection.
+
+    Args:
+        request: List of invoices (max MAX_BATCH_SIZE)
+
+    Returns:
+        Per-item results in request order
+    """
+    if len(request.invoices) > config.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.invoices)} invoices (max {config.MAX_BATCH_SIZE})"
+        )
+
+    try:
+        results = await worker_pool.invoice_pool.run(process_invoice_batch, request.invoices)
+
+    except WorkerPoolFull as e:
+        print(f"⚠️  Invoice batch rejected, worker pool full: {e}")
+        raise _server_busy()
+
+    except Exception as e:
+        print(f"❌ Invoice batch processing failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+        raise HTTPException(
+            status_code=500,
+            detail=f"Invoice batch processing failed: {str(e)}"
+        )
+
+    succeeded = sum(1 for result in results if result.get("success"))
+    return {
+        "success": succeeded == len(results),
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, api_key: str = Depends(verify_api_key)):
+    """
+    Async job status - requires authentication
+
+    Returns:
+        Job status; 'result' holds the /invoice response when status is 'done'
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}/wait")
+async def wait_for_job(
+    job_id: str,
+    timeout: float = 30.0,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Long-poll async job - requires authentication
+
+    Returns as soon as the job finishes or after timeout seconds
+    (max 60) with the current status.
+    """
+    timeout = max(0.0, min(timeout, MAX_JOB_WAIT_SECONDS))
+    job = await job_manager.wait(job_id, timeout)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
 @app.post("/admin/test-email")
 async def admin_test_email(api_key: str = Depends(verify_api_key)):
     """
@@ -483,8 +524,21 @@ async def startup_event():
     print(f"PostgreSQL Staging: {'Enabled' if config.POSTGRES_STAGING_ENABLED else 'Disabled'}")
     if config.POSTGRES_STAGING_ENABLED:
         print(f"PostgreSQL: {config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DATABASE}")
+    print(f"Workers: {config.WORKER_THREADS} (queue: {config.WORKER_QUEUE_SIZE})")
+    print(f"Job workers: {config.JOB_WORKERS}")
+    print(f"Extraction processes: {config.EXTRACTION_PROCESSES or 'disabled'}")
     print("=" * 60)
 
+    # Create/upgrade SQLite schema once - request handlers run no DDL
+    schema_version = database.init_database()
+    print(f"✅ Database schema version: {schema_version}")
+
+    # Warm up pdfplumber worker processes
+    extraction_pool.start()
+
+    # Start async job workers (resumes jobs interrupted by restart)
+    job_manager.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -492,6 +546,10 @@ async def shutdown_event():
     print("=" * 60)
     print("🛑 Supplier Invoice Loader Shutting Down...")
     print("=" * 60)
+    job_manager.stop()
+    worker_pool.invoice_pool.shutdown(wait=True)
+    extraction_pool.shutdown(wait=True)
+    database.close_connections()
 
 
 # ============================================================================
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Backfill Extraction
+===================
+
+Znovu extrahuje faktúry uložené v SQLite (napr. po oprave regexov
+v ls_extractor.py), porovná invoice_number/total_amount s uloženými
+hodnotami a zmeny zapíše späť v dávkových transakciách.
+
+Prerušený beh pokračuje od posledného checkpointu. Neúspešné extrakcie
+sú v reporte a checkpointe a ďalší beh ich zopakuje ako prvé.
+
+Usage:
+    python scripts/backfill_extraction.py [--workers 8] [--batch-size 200]
+                                          [--dry-run] [--restart] [--limit N]
+                                          [--report diff.csv] [--checkpoint path]
+                                          [--unregistered]
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import config
+from src.business import backfill
+from src.extractors.extraction_pool import extraction_pool
+
+
+def print_header(text):
+    """Print formatted header"""
+    print("=" * 70)
+    print(f"  {text}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract stored invoices and update changed fields")
+    parser.add_argument("--workers", type=int, default=2 * (config.EXTRACTION_PROCESSES or os.cpu_count() or 1),
+                        help="Súbežné extrakcie (default: 2x EXTRACTION_PROCESSES)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Faktúr na transakciu/checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Len porovnať, nezapisovať")
+    parser.add_argument("--restart", action="store_true", help="Ignorovať checkpoint, začať od začiatku")
+    parser.add_argument("--limit", type=int, default=None, help="Max. počet faktúr v tomto behu")
+    parser.add_argument("--report", type=Path, default=None, help="CSV s rozdielmi")
+    parser.add_argument("--checkpoint", type=Path, default=config.STORAGE_BASE / "backfill_checkpoint.json",
+                        help="Súbor s checkpointom")
+    parser.add_argument("--unregistered", action="store_true",
+                        help="Vypísať PDF v PDF_DIR bez záznamu v databáze")
+    args = parser.parse_args()
+
+    print_header("Backfill Extraction")
+    print(f"Database:   {config.DB_FILE}")
+    print(f"PDF dir:    {config.PDF_DIR}")
+    print(f"Checkpoint: {args.checkpoint}")
+    print(f"Workers:    {args.workers} (extraction processes: {config.EXTRACTION_PROCESSES or 'disabled'})")
+    if args.dry_run:
+        print("Mode:       DRY RUN (no database updates)")
+    print()
+
+    if args.unregistered:
+        pdfs = backfill.find_unregistered_pdfs()
+        print(f"PDF without database record: {len(pdfs)}")
+        for pdf_path in pdfs:
+            print(f"  - {pdf_path.name}")
+        return True
+
+    extraction_pool.start()
+    try:
+        stats = backfill.run_backfill(
+            checkpoint_path=args.checkpoint,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            restart=args.restart,
+            limit=args.limit,
+            report_path=args.report
+        )
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted - run again to resume from checkpoint")
+        return False
+    finally:
+        extraction_pool.shutdown()
+
+    print()
+    print_header("SUMMARY")
+    print(f"Processed:    {stats.processed}")
+    print(f"Changed:      {stats.changed}{' (not written)' if args.dry_run else ''}")
+    print(f"Unchanged:    {stats.unchanged}")
+    print(f"Failed:       {stats.failed}{' (retried on next run)' if stats.failed and not args.dry_run else ''}")
+    print(f"Missing PDF:  {stats.missing_pdf}")
+    if args.report:
+        print(f"Report:       {args.report}")
+    return stats.failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
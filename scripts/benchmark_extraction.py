@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark Extraction Pipeline
+=============================
+
+Generuje syntetické L&Š faktúry (tests/synthetic_invoices.py) s rôznym
+počtom položiek/strán a meria jednotlivé kroky:
+- text_extraction: pdfplumber (iter_page_texts)
+- header_regex: LSInvoiceExtractor._extract_header
+- item_parsing: iter_items (streaming parser)
+- isdoc_build: generate_isdoc_xml
+
+Pre každý krok: medián a min času, špičková pamäť (tracemalloc). Výsledok
+sa dá uložiť ako JSON (--output) a porovnať s baseline (--baseline) -
+pomalší medián ako baseline * (1 + tolerance) = regresia, exit code 1.
+
+Usage:
+    python scripts/benchmark_extraction.py [--items 10,200,1000] [--repeat 5]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pdfplumber
+
+from src.extractors.ls_extractor import LSInvoiceExtractor, iter_items, iter_page_texts
+from src.business.isdoc_service import generate_isdoc_xml
+from tests.synthetic_invoices import make_invoice_pdf
+
+STAGES = ["text_extraction", "header_regex", "item_parsing", "isdoc_build"]
+
+
+def build_stages(pdf_path):
+    """Kroky ako funkcie bez argumentov; vstupy sa pripravia raz vopred"""
+    extractor = LSInvoiceExtractor()
+    pages = list(iter_page_texts(str(pdf_path)))
+    text = "".join(page + "\n" for page in pages if page)
+    invoice_data = extractor._extract_header(text)
+    invoice_data.items = list(iter_items(pages))
+
+    return {
+        "text_extraction": lambda: list(iter_page_texts(str(pdf_path))),
+        "header_regex": lambda: extractor._extract_header(text),
+        "item_parsing": lambda: list(iter_items(pages)),
+        "isdoc_build": lambda: generate_isdoc_xml(invoice_data),
+    }, invoice_data
+
+
+def check_result(invoice_data, expected):
+    """Chyby extrakcie oproti očakávaným hodnotám (prázdny zoznam = OK)"""
+    errors = []
+    for name in ("invoice_number", "issue_date", "customer_ico", "net_amount", "tax_amount", "total_amount"):
+        if getattr(invoice_data, name) != expected[name]:
+            errors.append(f"{name}: {getattr(invoice_data, name)!r} != {expected[name]!r}")
+    items = [(i.item_code, i.ean_code, i.quantity, i.total_with_vat) for i in invoice_data.items]
+    if items != expected["items"]:
+        errors.append(f"items: {len(items)} extracted, {len(expected['items'])} expected or values differ")
+    return errors
+
+
+def measure(fn, repeat):
+    """(medián ms, min ms, špičková pamäť KB)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), min(times), peak / 1024
+
+
+def compare(results, baseline, tolerance):
+    """Regresie oproti baseline: zoznam textov"""
+    previous = {(r["items"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["items"], result["stage"]))
+        if old and result["median_ms"] > old["median_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result['stage']} ({result['items']} items): "
+                f"{old['median_ms']:.2f} -> {result['median_ms']:.2f} ms"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark L&Š extraction stages")
+    parser.add_argument("--items", default="10,200,1000", help="Počty položiek oddelené čiarkou")
+    parser.add_argument("--repeat", type=int, default=5, help="Počet opakovaní každého kroku")
+    parser.add_argument("--seed", type=int, default=1, help="Seed generátora faktúr")
+    parser.add_argument("--output", type=Path, default=None, help="JSON s výsledkami")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON z predchádzajúceho behu")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Povolené spomalenie (0.25 = 25 %%)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  L&Š Extraction Benchmark")
+    print("=" * 70)
+    print(f"{'Items':>6} {'Pages':>6} {'Stage':<16} {'Median ms':>10} {'Min ms':>9} {'Peak KB':>9}")
+
+    results = []
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in [int(n) for n in args.items.split(",")]:
+            pdf, pages, expected = make_invoice_pdf(count, seed=args.seed)
+            pdf_path = Path(tmp) / f"synthetic_{count}.pdf"
+            pdf_path.write_bytes(pdf)
+
+            stages, invoice_data = build_stages(pdf_path)
+            errors = check_result(invoice_data, expected)
+            if errors:
+                ok = False
+                print(f"❌ Extraction of {count}-item invoice differs: {'; '.join(errors)}")
+
+            for stage in STAGES:
+                median_ms, min_ms, peak_kb = measure(stages[stage], args.repeat)
+                results.append({
+                    "items": count,
+                    "pages": len(pages),
+                    "pdf_bytes": len(pdf),
+                    "stage": stage,
+                    "median_ms": round(median_ms, 3),
+                    "min_ms": round(min_ms, 3),
+                    "peak_kb": round(peak_kb, 1),
+                })
+                print(f"{count:>6} {len(pages):>6} {stage:<16} {median_ms:>10.2f} {min_ms:>9.2f} {peak_kb:>9.1f}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "pdfplumber": pdfplumber.__version__,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            ok = False
+        else:
+            print(f"✅ No stage slower than baseline + {args.tolerance:.0%}")
+
+    print()
+    print("✅ Benchmark finished" if ok else "❌ Benchmark found problems")
+    return ok
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
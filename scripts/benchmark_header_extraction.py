@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark Header Extraction
+===========================
+
+Micro-benchmark pre extrakciu hlavičky L&Š faktúry:
+- legacy: 19x re.search nad celým textom, patterns z dict pri každom volaní
+- scanner: scan_header_fields (skompilované patterns, jeden prechod)
+
+Text je syntetický (bez PDF), takže meria len regex časť.
+
+Usage:
+    python scripts/benchmark_header_extraction.py [--pages 1,5,20] [--repeat 200]
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.extractors.ls_extractor import scan_header_fields
+
+
+# Pôvodné patterns (pred single-pass scannerom)
+LEGACY_PATTERNS = {
+    'invoice_number': r'FAKTÚRA[^\d]*?(\d+)',
+    'issue_date': r'Dátum\s+vystavenia[:\s]*(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)',
+    'due_date': r'Dátum\s+splatnosti[^\d]*?(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)',
+    'tax_point_date': r'Dátum\s+daňovej\s+povinnosti[:\s]*(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)',
+    'net_amount': r'Základ\s+DPH\s+([\d\s]+\.\s*[\d\s]+)\s*E\s*U\s*R',
+    'tax_amount': r'(?:^|\n)DPH\s+([\d\s]+\.\s*[\d\s]+)\s*E\s*U\s*R',
+    'total_amount': r'Celkom\s+k\s+úhrade\s+([\d\s]+\.[\d\s]+)\s*EUR',
+    'supplier_name': r'L\s*&\s*Š,\s*s\.r\.o\.',
+    'supplier_ico': r'IČO:\s*(\d{8})',
+    'supplier_dic': r'DIČ:\s*(\d{10})',
+    'supplier_icdph': r'IČ\s+DPH:\s*(SK\d{10})',
+    'customer_name': r'([A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ][^\n]{5,})\s*\n[^\n]*IČO\s+odberateľ',
+    'customer_ico': r'IČO\s+odberateľ:\s*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
+    'customer_dic': r'DIČ\s+odberateľ:\s*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
+    'customer_icdph': r'IČDPH\s+odberateľ:\s*(S\s*K\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
+    'iban': r'IBAN[:\s]*(SK\s*\d\s*\d[\d\s]{20,})',
+    'bic': r'BIC[:\s]*([A-Z]{6,11})',
+    'variable_symbol': r'Variabilný\s+symbol[:\s]*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
+    'constant_symbol': r'Konštantný\s+symbol[:\s]*(\d\s*\d\s*\d\s*\d)',
+}
+
+
+def legacy_scan(text):
+    """Pôvodný prístup - re.search pre každý pattern"""
+    values = {}
+    for field, pattern in dict(LEGACY_PATTERNS).items():
+        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            values[field] = match.group(1).strip() if match.lastindex else match.group(0).strip()
+    return values
+
+
+HEADER = """L & Š, s.r.o.
+IČO: 36555720 DIČ: 2020204418 IČ DPH: SK2020204418
+FAKTÚRA - DAŇOVÝ DOKLAD č. 32510374
+Dátum vystavenia: 1 6 . 0 9 . 2 0 2 5
+Dátum splatnosti: 3 0 . 0 9 . 2 0 2 5
+Dátum daňovej povinnosti: 1 6 . 0 9 . 2 0 2 5
+IBAN: SK12 0200 0000 0012 3456 7890 BIC: SUBASKBX
+Variabilný symbol: 3 2 5 1 0 3 7 4
+Konštantný symbol: 0 0 0 8
+M Á G E RSTAV, spol. s r.o.
+Hlavná 1, Bratislava IČO odberateľ: 3 1 4 3 6 8 7 1
+DIČ odberateľ: 2 0 2 0 3 6 7 1 5 1
+IČDPH odberateľ: S K 2 0 2 0 3 6 7 1 5 1
+č. Názov Množstvo MJ Zľava Cena/MJ bez DPH Cena/MJ s DPH Spolu s DPH
+"""
+
+ITEM = """{n} Položka tovaru číslo {n} balenie 3 KS 0.010 0.012 0.037
+{code} 8586000{code} 23% 0.010 0.012
+"""
+
+FOOTER = """23 % Základ DPH 1 2 3.45 EUR
+DPH 28.39 EUR
+Celkom k úhrade 151.84 EUR
+"""
+
+ITEMS_PER_PAGE = 40
+
+
+def build_sample_text(pages):
+    """Syntetický text L&Š faktúry s daným počtom strán"""
+    parts = [HEADER]
+    for n in range(1, pages * ITEMS_PER_PAGE + 1):
+        parts.append(ITEM.format(n=n, code=100000 + n))
+        if n % ITEMS_PER_PAGE == 0 and n < pages * ITEMS_PER_PAGE:
+            parts.append("Strana {}\nč. Názov Množstvo MJ Spolu s DPH\n".format(n // ITEMS_PER_PAGE + 1))
+    parts.append(FOOTER)
+    return "".join(parts)
+
+
+def measure(fn, text, repeat):
+    """Priemerný čas jedného volania v mikrosekundách"""
+    fn(text)  # warm-up (re cache)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark header extraction")
+    parser.add_argument("--pages", default="1,5,20", help="Počty strán oddelené čiarkou")
+    parser.add_argument("--repeat", type=int, default=200, help="Počet opakovaní")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Header Extraction Benchmark")
+    print("=" * 70)
+    print(f"{'Pages':>6} {'Chars':>9} {'Legacy µs':>12} {'Scanner µs':>12} {'Speedup':>9}")
+
+    for pages in [int(p) for p in args.pages.split(",")]:
+        text = build_sample_text(pages)
+
+        if legacy_scan(text) != scan_header_fields(text):
+            print(f"❌ Results differ for {pages} pages")
+            return False
+
+        legacy = measure(legacy_scan, text, args.repeat)
+        scanner = measure(scan_header_fields, text, args.repeat)
+        print(f"{pages:>6} {len(text):>9} {legacy:>12.1f} {scanner:>12.1f} {legacy / scanner:>8.1f}x")
+
+    print()
+    print("✅ Scanner results identical to legacy extraction")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark Item Memory
+=====================
+
+Pamäť a čas vytvorenia položiek faktúry:
+- legacy: dataclass s __dict__ (pôvodný InvoiceItem)
+- slots: InvoiceItem (dataclass slots=True)
+- columns: ItemColumns (stĺpce v array/list)
+
+Hodnoty sa parsujú zo stringov (nové Decimal pre každú položku), pamäť
+je tracemalloc po vytvorení (bez zdrojových stringov).
+
+Usage:
+    python scripts/benchmark_item_memory.py [--items 10000] [--repeat 5]
+"""
+
+import gc
+import sys
+import time
+import argparse
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.extractors.ls_extractor import InvoiceItem, parse_decimal
+from src.extractors.item_columns import ItemColumns
+
+# Pôvodný InvoiceItem - rovnaké polia, bez slots
+LegacyInvoiceItem = make_dataclass(
+    "LegacyInvoiceItem",
+    [(f.name, f.type, f) for f in fields(InvoiceItem)]
+)
+
+
+def build_rows(count):
+    """Syntetické hodnoty položiek ako stringy z PDF"""
+    return [
+        (n, str(100000 + n), f"8586000{100000 + n}", f"Položka tovaru číslo {n}",
+         str(n % 50 + 1), "KS", "0.010", "0.012", f"{n * 0.037:.3f}", "23", None)
+        for n in range(1, count + 1)
+    ]
+
+
+def iter_items(item_class, rows):
+    for n, code, ean, description, quantity, unit, price, price_vat, total, vat, discount in rows:
+        yield item_class(
+            line_number=n, item_code=code, ean_code=ean, description=description,
+            quantity=parse_decimal(quantity), unit=unit,
+            unit_price_no_vat=parse_decimal(price), unit_price_with_vat=parse_decimal(price_vat),
+            total_with_vat=parse_decimal(total), vat_rate=parse_decimal(vat),
+            discount_percent=parse_decimal(discount)
+        )
+
+
+def make_items(item_class, rows):
+    return list(iter_items(item_class, rows))
+
+
+def make_columns(rows):
+    # Položky vznikajú priebežne (ako z iter_items) a hneď sa zahodia
+    return ItemColumns(iter_items(InvoiceItem, rows))
+
+
+VARIANTS = [
+    ("legacy", lambda rows: make_items(LegacyInvoiceItem, rows)),
+    ("slots", lambda rows: make_items(InvoiceItem, rows)),
+    ("columns", make_columns),
+]
+
+
+def measure_memory(build, rows):
+    """Bajty držané výsledkom"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build(rows)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def measure_time(build, rows, repeat):
+    """Najlepší čas vytvorenia v milisekundách"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(rows)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark invoice item memory")
+    parser.add_argument("--items", type=int, default=10000, help="Počet položiek")
+    parser.add_argument("--repeat", type=int, default=5, help="Počet opakovaní merania času")
+    args = parser.parse_args()
+
+    rows = build_rows(args.items)
+    reference = make_items(InvoiceItem, rows)
+    if ItemColumns(reference).to_items() != reference:
+        print("❌ ItemColumns round-trip differs")
+        return False
+
+    print("=" * 70)
+    print(f"  Invoice Item Benchmark ({args.items} items)")
+    print("=" * 70)
+    print(f"{'Variant':>10} {'Memory KB':>12} {'B/item':>9} {'Build ms':>10}")
+
+    legacy_memory = None
+    for name, build in VARIANTS:
+        memory = measure_memory(build, rows)
+        build_ms = measure_time(build, rows, args.repeat)
+        legacy_memory = legacy_memory or memory
+        print(f"{name:>10} {memory / 1024:>12.1f} {memory / args.items:>9.0f} {build_ms:>10.1f}"
+              f"  ({memory / legacy_memory:.0%} of legacy)")
+
+    print()
+    print("✅ ItemColumns round-trip identical to InvoiceItem list")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
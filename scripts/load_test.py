@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Load Test - POST /invoice
+=========================
+
+Posiela PDF faktúry na /invoice s danou súbežnosťou a vypíše p50/p95/p99
+latenciu, priepustnosť a chybovosť celých requestov aj krokov pipeline.
+
+Režimy:
+- in-process (default): main.app cez ASGI, úložisko v dočasnom adresári,
+  PostgreSQL nahradený FakePostgresStagingClient (--pg-latency-ms)
+- --url http://server:8000: beží proti spustenému uvicornu (len celé
+  requesty - kroky pipeline nie sú zvonku merateľné)
+
+Bez --pdf-dir sa použijú syntetické L&Š faktúry (tests/synthetic_invoices.py).
+
+Usage:
+    python scripts/load_test.py [--requests 200] [--concurrency 8]
+        [--pdf-dir DIR | --synthetic 50 --items 20] [--upload json|raw]
+        [--url URL --api-key KEY] [--pg-latency-ms 5] [--output load.json]
+"""
+
+import sys
+import io
+import json
+import asyncio
+import argparse
+import contextlib
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from tests.load_harness import (
+    StageRecorder, in_process_environment, load_corpus, run_load, synthetic_corpus,
+)
+
+
+def print_report(report):
+    print("=" * 78)
+    print(f"  Requests: {report['requests']}  Concurrency: {report['concurrency']}  "
+          f"Wall: {report['wall_seconds']:.1f}s  Throughput: {report['throughput_rps']:.1f} req/s")
+    print(f"  Status codes: {report['status_codes']}")
+    print("=" * 78)
+    print(f"{'Stage':<26} {'Count':>6} {'Err %':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Max ms':>9}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<26} {stats['count']:>6} {stats['error_rate'] * 100:>6.1f} {stats['p50_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+
+
+async def run(args, corpus):
+    recorder = StageRecorder()
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            return await run_load(client, corpus, args.requests, args.concurrency, recorder,
+                                  args.api_key, args.upload)
+
+    from src.utils import config
+    from src.extractors.extraction_pool import extraction_pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with in_process_environment(Path(tmp), recorder, args.pg_latency_ms) as app:
+            transport = httpx.ASGITransport(app=app)
+            output = io.StringIO() if args.quiet else sys.stdout
+            try:
+                # Pipeline prints progress lines for every invoice
+                with contextlib.redirect_stdout(output):
+                    async with httpx.AsyncClient(transport=transport, base_url="http://load-test",
+                                                 timeout=timeout) as client:
+                        return await run_load(client, corpus, args.requests, args.concurrency, recorder,
+                                              args.api_key or config.API_KEY, args.upload)
+            finally:
+                extraction_pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test POST /invoice")
+    parser.add_argument("--requests", type=int, default=200, help="Počet requestov")
+    parser.add_argument("--concurrency", type=int, default=8, help="Súbežní klienti")
+    parser.add_argument("--pdf-dir", type=Path, default=None, help="Adresár s PDF na prehratie")
+    parser.add_argument("--synthetic", type=int, default=50, help="Počet syntetických faktúr (bez --pdf-dir)")
+    parser.add_argument("--items", type=int, default=20, help="Položiek na syntetickú faktúru")
+    parser.add_argument("--upload", choices=["json", "raw"], default="json", help="base64 JSON alebo application/pdf")
+    parser.add_argument("--url", default=None, help="URL bežiaceho servera (inak in-process)")
+    parser.add_argument("--api-key", default=None, help="X-API-Key (in-process: config.API_KEY)")
+    parser.add_argument("--pg-latency-ms", type=float, default=0.0, help="Simulovaná latencia PostgreSQL")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Timeout requestu v sekundách")
+    parser.add_argument("--output", type=Path, default=None, help="JSON s výsledkami")
+    parser.add_argument("--quiet", action="store_true", help="Potlačiť výpisy pipeline")
+    args = parser.parse_args()
+
+    if args.url and not args.api_key:
+        parser.error("--api-key is required with --url")
+
+    corpus = load_corpus(args.pdf_dir) if args.pdf_dir else synthetic_corpus(args.synthetic, args.items)
+    if not corpus:
+        print(f"❌ No PDF files in {args.pdf_dir}")
+        return False
+    print(f"📄 Corpus: {len(corpus)} PDFs, {'remote ' + args.url if args.url else 'in-process'}")
+
+    report = asyncio.run(run(args, corpus))
+    report["mode"] = "remote" if args.url else "in-process"
+    report["corpus_size"] = len(corpus)
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n💾 Results saved to {args.output}")
+
+    errors = sum(count for status, count in report["status_codes"].items() if status != "200")
+    print()
+    print("✅ All requests succeeded" if not errors else f"⚠️  {errors} requests failed")
+    return errors == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
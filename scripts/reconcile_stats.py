@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Reconcile Statistics
+====================
+
+Prepočíta tabuľku invoice_counters (zdroj pre get_stats, /stats,
+/metrics a denný súhrn) z tabuľky invoices a vypíše rozdiely.
+
+Počítadlá udržiavajú triggre pri každom zápise - rozdiel znamená zásah
+mimo SQLite (obnova zo zálohy, ručná úprava súboru, ...).
+
+Usage:
+    python scripts/reconcile_stats.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import config
+from src.database import database
+
+
+def print_header(text):
+    """Print formatted header"""
+    print("=" * 70)
+    print(f"  {text}")
+    print("=" * 70)
+
+
+def print_diff(name, before, after):
+    """Print changed counts of one breakdown"""
+    for key in sorted(set(before) | set(after), key=str):
+        if before.get(key, 0) != after.get(key, 0):
+            print(f"  {name}[{key}]: {before.get(key, 0)} -> {after.get(key, 0)}")
+
+
+def main():
+    print_header("Reconcile Statistics")
+    print(f"Database: {config.DB_FILE}")
+    print()
+
+    if not Path(config.DB_FILE).exists():
+        print(f"❌ Database not found: {config.DB_FILE}")
+        return False
+
+    version = database.init_database()
+    print(f"Schema version: {version}")
+
+    result = database.reconcile_stats()
+    database.close_connections()
+    before, after = result["before"], result["after"]
+
+    print(f"Invoices: {after['total']}")
+    if before == after:
+        print("✅ Counters match the invoices table")
+        return True
+
+    print("⚠️  Counters differed - rebuilt:")
+    if before["total"] != after["total"]:
+        print(f"  total: {before['total']} -> {after['total']}")
+    if before["duplicates"] != after["duplicates"]:
+        print(f"  duplicates: {before['duplicates']} -> {after['duplicates']}")
+    for name in ("by_status", "by_nex_status", "by_customer"):
+        print_diff(name, before[name], after[name])
+    print("✅ Counters rebuilt")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -4,13 +4,12 @@ L&Š Invoice Loader - Pydantic Models
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
-class InvoiceRequest(BaseModel):
-    """Request model pre príjem faktúry z n8n"""
-    file_b64: str = Field(..., description="PDF súbor v base64")
+class InvoiceMetadata(BaseModel):
+    """Metadáta faktúry z emailu (bez PDF obsahu)"""
     filename: Optional[str] = Field("invoice.pdf", description="Názov súboru")
     message_id: Optional[str] = Field(None, description="Gmail message ID")
     gmail_id: Optional[str] = Field(None, description="Gmail thread ID")
@@ -22,6 +21,16 @@ class InvoiceRequest(BaseModel):
         populate_by_name = True  # Allow both 'from' and 'from_email'
 
 
+class InvoiceRequest(InvoiceMetadata):
+    """Request model pre príjem faktúry z n8n"""
+    file_b64: str = Field(..., description="PDF súbor v base64")
+
+
+class InvoiceBatchRequest(BaseModel):
+    """Request model pre dávkový príjem faktúr (napr. všetky prílohy emailu)"""
+    invoices: List[InvoiceRequest] = Field(..., min_length=1, description="Zoznam faktúr")
+
+
 class InvoiceResponse(BaseModel):
     """Response model pre API"""
     status: str = Field(..., description="success alebo error")
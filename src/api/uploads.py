@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+L&Š Invoice Loader - PDF Upload Handling for POST /invoice
+
+Supported request bodies:
+- application/json       InvoiceRequest with base64 PDF (n8n default)
+- application/pdf,
+  application/octet-stream  raw PDF bytes, metadata in query parameters
+- multipart/form-data    'file' part with PDF, metadata as form fields
+
+Raw and multipart uploads are streamed to PDF_DIR in chunks while the
+MD5 hash is computed, so the PDF is never held in memory as a whole.
+Multipart bodies are parsed incrementally as they arrive (not spooled
+by request.form() first) and file writes run off the event loop.
+"""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from src.api import models
+from src.utils import config
+from src.business.invoice_processor import build_pdf_path
+
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Upper bound for one metadata form field (subject etc.)
+MAX_FIELD_SIZE = 64 * 1024
+
+# Metadata fields accepted as query parameters / form fields
+METADATA_FIELDS = ("filename", "message_id", "gmail_id", "from", "from_email", "subject", "received_date")
+
+# OpenAPI description of all accepted /invoice request bodies
+INVOICE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"$ref": "#/components/schemas/InvoiceRequest"}
+            },
+            "application/pdf": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+            "application/octet-stream": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        **{name: {"type": "string"} for name in METADATA_FIELDS}
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+def is_json_request(request: Request) -> bool:
+    """True for base64 JSON body (also when Content-Type is missing)"""
+    content_type = request.headers.get("content-type", "")
+    return not content_type or content_type.startswith("application/json")
+
+
+async def parse_invoice_json(request: Request) -> models.InvoiceRequest:
+    """
+    Validate JSON body as InvoiceRequest
+
+    Raises:
+        RequestValidationError: Invalid body (422, same as model parameter)
+    """
+    try:
+        return models.InvoiceRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+async def receive_pdf_upload(request: Request) -> Tuple[models.InvoiceMetadata, Path, str]:
+    """
+    Stream raw or multipart PDF upload to PDF_DIR
+
+    Returns:
+        (metadata, pdf_path, file_hash)
+
+    Raises:
+        HTTPException: 400 for malformed multipart body,
+                       413 if upload exceeds MAX_UPLOAD_SIZE_MB,
+                       422 if file is missing or empty
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        metadata, pdf_path, file_hash = await _receive_multipart(request, content_type)
+    else:
+        fields = {name: request.query_params[name] for name in METADATA_FIELDS if name in request.query_params}
+        metadata = _build_metadata(fields)
+
+        writer = await _PdfWriter.open()
+        try:
+            async for chunk in request.stream():
+                await writer.write(chunk)
+            pdf_path, file_hash = await writer.commit(metadata.filename)
+        except BaseException:
+            writer.abort()
+            raise
+
+    print(f"✅ PDF saved: {pdf_path}")
+    return metadata, pdf_path, file_hash
+
+
+async def _receive_multipart(request: Request, content_type: str) -> Tuple[models.InvoiceMetadata, Path, str]:
+    """
+    Parse multipart body incrementally while it arrives - the 'file' part
+    goes straight to PDF_DIR, metadata fields are collected in memory
+    (no spooling of the whole body like request.form())
+    """
+    _, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Missing multipart boundary")
+
+    # Parser callbacks run synchronously inside parser.write() - collect
+    # events and handle them (with awaits) after each chunk
+    events: List[Tuple[str, Any]] = []
+    header_field = bytearray()
+    header_value = bytearray()
+    headers: Dict[bytes, bytes] = {}
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("headers", _content_disposition(headers)))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        events.append(("data", data[start:end]))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    fields: Dict[str, Any] = {}
+    writer: Optional[_PdfWriter] = None
+    upload_filename: Optional[str] = None
+    # "file", metadata field name or None (ignored part)
+    current: Optional[str] = None
+    value = bytearray()
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid multipart body: {e}")
+
+            for event, payload in events:
+                if event == "headers":
+                    name, filename = payload
+                    if name == "file" and filename is not None:
+                        if writer is not None:
+                            raise HTTPException(status_code=400, detail="Only one 'file' part allowed")
+                        writer = await _PdfWriter.open()
+                        upload_filename = filename
+                        current = "file"
+                    elif name in METADATA_FIELDS and filename is None:
+                        current = name
+                        value.clear()
+                    else:
+                        current = None
+
+                elif event == "data":
+                    if current == "file":
+                        await writer.write(payload)
+                    elif current is not None:
+                        value.extend(payload)
+                        if len(value) > MAX_FIELD_SIZE:
+                            raise HTTPException(status_code=413, detail=f"Form field too large: {current}")
+
+                elif event == "end":
+                    if current is not None and current != "file":
+                        fields[current] = value.decode("utf-8", errors="replace")
+                    current = None
+            events.clear()
+
+        parser.finalize()
+
+        if writer is None:
+            raise HTTPException(status_code=422, detail="Missing 'file' part in multipart upload")
+
+        fields.setdefault("filename", upload_filename or "invoice.pdf")
+        metadata = _build_metadata(fields)
+        pdf_path, file_hash = await writer.commit(metadata.filename)
+
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+
+    return metadata, pdf_path, file_hash
+
+
+def _content_disposition(headers: Dict[bytes, bytes]) -> Tuple[Optional[str], Optional[str]]:
+    """(name, filename) from part headers - filename is None for plain fields"""
+    _, options = parse_options_header(headers.get(b"content-disposition", b""))
+    name = options.get(b"name")
+    filename = options.get(b"filename")
+    return (
+        name.decode("utf-8", errors="replace") if name is not None else None,
+        filename.decode("utf-8", errors="replace") if filename is not None else None
+    )
+
+
+def _build_metadata(fields: Dict[str, Any]) -> models.InvoiceMetadata:
+    try:
+        return models.InvoiceMetadata.model_validate(fields)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+class _PdfWriter:
+    """
+    Upload written to a .part file in PDF_DIR, hashed incrementally,
+    renamed to its final name by commit()
+
+    Chunks are buffered to CHUNK_SIZE; file I/O runs in a thread so it
+    does not block the event loop.
+    """
+
+    def __init__(self, part_path: Path, file):
+        self.part_path = part_path
+        self._file = file
+        self._buffer = bytearray()
+        self._md5 = hashlib.md5()
+        self.max_bytes = config.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        self.size = 0
+
+    @classmethod
+    async def open(cls) -> "_PdfWriter":
+        part_path = config.PDF_DIR / f"{uuid.uuid4().hex}.part"
+        # Exclusive create - never truncate a file of another upload
+        return cls(part_path, await asyncio.to_thread(open, part_path, "xb"))
+
+    async def write(self, chunk: bytes):
+        """
+        Raises:
+            HTTPException: 413 if upload exceeds MAX_UPLOAD_SIZE_MB
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"PDF too large (max {config.MAX_UPLOAD_SIZE_MB} MB)"
+            )
+        self._buffer.extend(chunk)
+        if len(self._buffer) >= CHUNK_SIZE:
+            await self._flush()
+
+    async def _flush(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        await asyncio.to_thread(self._write_data, data)
+
+    def _write_data(self, data: bytes):
+        self._md5.update(data)
+        self._file.write(data)
+
+    async def commit(self, filename: str) -> Tuple[Path, str]:
+        """
+        Close file and move it to its unique PDF_DIR path
+
+        Returns:
+            (pdf_path, file_hash)
+
+        Raises:
+            HTTPException: 422 if nothing was uploaded
+        """
+        await self._flush()
+        await asyncio.to_thread(self._file.close)
+
+        if self.size == 0:
+            raise HTTPException(status_code=422, detail="Empty PDF upload")
+
+        pdf_path = build_pdf_path(filename)
+        await asyncio.to_thread(self.part_path.replace, pdf_path)
+        return pdf_path, self._md5.hexdigest()
+
+    def abort(self):
+        """Remove partial file (also used on cancellation - no awaits)"""
+        self._file.close()
+        self.part_path.unlink(missing_ok=True)
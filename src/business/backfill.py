@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Re-extraction Backfill
+
+Re-runs PDF extraction over invoices already stored in SQLite (e.g. after
+a regex fix in ls_extractor.py), compares invoice_number/total_amount with
+the stored values and writes differences back. Only the header is
+extracted - line items are not parsed.
+
+Invoices are processed in id order, in chunks of batch_size: a chunk is
+extracted in parallel, its updates are written in one transaction and
+the last id is saved to the checkpoint file. An interrupted run resumes
+after the last finished chunk.
+
+Fields that come back empty from the re-extraction are never written
+over stored values. Failed extractions are written to the report and
+their ids kept in the checkpoint - the next run retries them first.
+
+CLI: scripts/backfill_extraction.py
+"""
+
+import csv
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils import config
+from src.database import database
+from src.extractors.registry import extract_invoice_header
+from src.extractors.text_cache import file_md5
+
+logger = logging.getLogger(__name__)
+
+# Rozdiel sumy pod touto hranicou sa neberie ako zmena (REAL v SQLite)
+AMOUNT_TOLERANCE = 0.005
+
+# Porovnávané polia - stačí hlavička (MODE_HEADER_ONLY), položky sa neparsujú
+BACKFILL_FIELDS = ('invoice_number', 'total_amount')
+
+REPORT_FIELDS = [
+    "id", "pdf_path", "old_invoice_number", "new_invoice_number", "old_total_amount", "new_total_amount", "error"
+]
+
+
+@dataclass
+class BackfillStats:
+    """Počítadlá behu (ukladajú sa aj do checkpointu)"""
+    last_id: int = 0
+    processed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    # Neúspešné extrakcie, ktoré ešte čakajú na opakovanie (failed_ids)
+    failed: int = 0
+    missing_pdf: int = 0
+    failed_ids: List[int] = field(default_factory=list)
+
+
+def load_checkpoint(checkpoint_path: Path) -> BackfillStats:
+    """Stav predchádzajúceho behu alebo prázdny stav"""
+    if not checkpoint_path.exists():
+        return BackfillStats()
+    data = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    return BackfillStats(**data)
+
+
+def save_checkpoint(checkpoint_path: Path, stats: BackfillStats):
+    """Atomický zápis checkpointu"""
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(asdict(stats), indent=2), encoding="utf-8")
+    tmp_path.replace(checkpoint_path)
+
+
+def resolve_pdf_path(stored_path: str) -> Optional[Path]:
+    """PDF podľa uloženej cesty, inak rovnaký názov v config.PDF_DIR (presunutý archív)"""
+    path = Path(stored_path)
+    if path.exists():
+        return path
+    # Windows cesty z pôvodného servera
+    moved = config.PDF_DIR / stored_path.replace("\\", "/").rsplit("/", 1)[-1]
+    if moved.exists():
+        return moved
+    return None
+
+
+def diff_invoice(row: Dict[str, Any], invoice_data) -> Optional[Dict[str, Any]]:
+    """
+    Porovná re-extrahované dáta s uloženým riadkom
+
+    Prázdne pole z novej extrakcie (slabší výsledok) uloženú hodnotu
+    neprepíše.
+
+    Returns:
+        Update dict (id, invoice_number, total_amount - None = bez zmeny)
+        alebo None bez zmeny
+    """
+    update = {'id': row['id'], 'invoice_number': None, 'total_amount': None}
+
+    new_number = invoice_data.invoice_number or None
+    if new_number and new_number != row.get('invoice_number'):
+        update['invoice_number'] = new_number
+
+    if invoice_data.total_amount:
+        new_amount = float(invoice_data.total_amount)
+        old_amount = row.get('total_amount')
+        if old_amount is None or abs(new_amount - old_amount) >= AMOUNT_TOLERANCE:
+            update['total_amount'] = new_amount
+
+    if update['invoice_number'] is None and update['total_amount'] is None:
+        return None
+    return update
+
+
+def _reextract(row: Dict[str, Any]):
+    """Extrahuje jednu faktúru - (row, invoice_data | None, chyba)"""
+    pdf_path = resolve_pdf_path(row['pdf_path'])
+    if pdf_path is None:
+        return row, None, "missing_pdf"
+    try:
+        invoice_data = extract_invoice_header(str(pdf_path), row.get('file_hash'), BACKFILL_FIELDS)
+    except Exception as e:
+        logger.error(f"Re-extraction failed for invoice {row['id']}: {e}", exc_info=True)
+        invoice_data = None
+    return row, invoice_data, None if invoice_data else "failed"
+
+
+def run_backfill(
+        checkpoint_path: Path,
+        workers: int,
+        batch_size: int = 200,
+        dry_run: bool = False,
+        restart: bool = False,
+        limit: Optional[int] = None,
+        report_path: Optional[Path] = None
+) -> BackfillStats:
+    """
+    Re-extract stored invoices and update changed rows
+
+    Args:
+        checkpoint_path: JSON file with progress (resume point)
+        workers: Concurrent extractions (each waits on extraction_pool)
+        batch_size: Invoices per chunk / update transaction / checkpoint
+        dry_run: Only report differences, do not update database
+                 (checkpoint is neither read nor written)
+        restart: Ignore existing checkpoint
+        limit: Stop after this many invoices (in this run)
+        report_path: CSV file for differences (appended)
+
+    Returns:
+        Cumulative statistics (including resumed runs)
+    """
+    stats = BackfillStats() if restart or dry_run else load_checkpoint(checkpoint_path)
+    if stats.last_id:
+        print(f"↩️  Resuming after invoice id {stats.last_id} ({stats.processed} already processed)")
+
+    report_file = None
+    report = None
+    if report_path:
+        new_report = restart or not report_path.exists()
+        report_file = open(report_path, "w" if restart else "a", newline="", encoding="utf-8")
+        report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+        if new_report:
+            report.writeheader()
+
+    started = time.time()
+    done_in_run = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as executor:
+            # Failures of previous runs first
+            if stats.failed_ids:
+                print(f"🔁 Retrying {len(stats.failed_ids)} failed invoices")
+                rows = database.get_invoices_by_ids(stats.failed_ids)
+                # Invoices deleted since the failure are not retried
+                stats.failed -= len(stats.failed_ids) - len(rows)
+                stats.failed_ids = []
+                updates = _process_rows(executor, rows, stats, report, retry=True)
+                _finish_chunk(checkpoint_path, stats, updates, report_file, dry_run)
+
+            while limit is None or done_in_run < limit:
+                chunk_size = batch_size if limit is None else min(batch_size, limit - done_in_run)
+                rows = database.get_invoices_after(stats.last_id, chunk_size)
+                if not rows:
+                    break
+
+                updates = _process_rows(executor, rows, stats, report)
+                stats.last_id = rows[-1]['id']
+                done_in_run += len(rows)
+                _finish_chunk(checkpoint_path, stats, updates, report_file, dry_run)
+
+                rate = done_in_run / max(time.time() - started, 1e-6)
+                print(f"✅ Up to id {stats.last_id}: {stats.processed} processed, "
+                      f"{stats.changed} changed, {stats.failed} failed ({rate:.1f}/s)")
+    finally:
+        if report_file:
+            report_file.close()
+
+    return stats
+
+
+def _process_rows(
+        executor: ThreadPoolExecutor,
+        rows: List[Dict[str, Any]],
+        stats: BackfillStats,
+        report: Optional[csv.DictWriter],
+        retry: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Re-extract rows in parallel, update stats and report
+
+    Args:
+        retry: Rows are earlier failures - already counted in processed/failed
+
+    Returns:
+        Updates for database.update_extracted_fields()
+    """
+    updates: List[Dict[str, Any]] = []
+    for row, invoice_data, error in executor.map(_reextract, rows):
+        if retry:
+            stats.failed -= 1
+        else:
+            stats.processed += 1
+
+        if error == "missing_pdf":
+            stats.missing_pdf += 1
+        elif error:
+            stats.failed += 1
+            stats.failed_ids.append(row['id'])
+
+        if error:
+            if report:
+                report.writerow({"id": row['id'], "pdf_path": row['pdf_path'], "error": error})
+            continue
+
+        update = diff_invoice(row, invoice_data)
+        if update is None:
+            stats.unchanged += 1
+            continue
+
+        stats.changed += 1
+        updates.append(update)
+        if report:
+            report.writerow({
+                "id": row['id'],
+                "pdf_path": row['pdf_path'],
+                "old_invoice_number": row.get('invoice_number'),
+                "new_invoice_number": update['invoice_number'],
+                "old_total_amount": row.get('total_amount'),
+                "new_total_amount": update['total_amount']
+            })
+    return updates
+
+
+def _finish_chunk(
+        checkpoint_path: Path,
+        stats: BackfillStats,
+        updates: List[Dict[str, Any]],
+        report_file,
+        dry_run: bool
+):
+    """Write chunk updates and checkpoint (failed ids stay for retry)"""
+    if report_file:
+        report_file.flush()
+
+    if not dry_run:
+        database.update_extracted_fields(updates)
+        save_checkpoint(checkpoint_path, stats)
+
+
+def find_unregistered_pdfs() -> List[Path]:
+    """PDF v config.PDF_DIR, ktorých hash nie je v tabuľke invoices"""
+    known = set(database.get_invoice_hashes())
+    return [
+        pdf_path
+        for pdf_path in sorted(config.PDF_DIR.glob("*.pdf"))
+        if file_md5(str(pdf_path)) not in known
+    ]
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Content Hash Duplicate Check
+
+n8n IMAP retries redeliver identical attachments. Before any PDF
+extraction the file hash is looked up here: first in an in-memory LRU of
+recent results, then via the idx_file_hash index in SQLite. A hit returns
+the previously stored result and skips pdfplumber, ISDOC and PostgreSQL.
+
+A hash that misses is claimed for the caller until release(), so a
+concurrent upload of the same PDF waits for that work and then gets its
+result instead of extracting the PDF a second time.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils import config
+from src.database import database
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateIndex:
+    """
+    LRU of file_hash -> processing result, backed by SQLite
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, max_size)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # file_hash -> event set when the claiming request finishes
+        self._inflight: Dict[str, threading.Event] = {}
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    def remember(self, file_hash: str, result: Dict[str, Any]):
+        """Store result of a successfully processed invoice"""
+        if not self.max_size:
+            return
+        with self._lock:
+            self._cache[file_hash] = result
+            self._cache.move_to_end(file_hash)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def lookup(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find previous result for identical PDF content
+
+        Returns:
+            Stored result (marked duplicate=True) or None
+        """
+        with self._lock:
+            result = self._cache.get(file_hash)
+            if result is not None:
+                self._cache.move_to_end(file_hash)
+                self.hits += 1
+
+        if result is None:
+            try:
+                row = database.get_invoice_by_hash(file_hash)
+            except Exception as e:
+                # Missing table etc. - treat as new invoice
+                logger.warning(f"Duplicate lookup failed: {e}")
+                row = None
+
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            with self._lock:
+                self.db_hits += 1
+            result = _result_from_row(row)
+            self.remember(file_hash, result)
+
+        duplicate = dict(result)
+        duplicate["duplicate"] = True
+        duplicate["message"] = "Invoice already processed (duplicate PDF)"
+        return duplicate
+
+    def claim(self, file_hash: str, wait: bool = True) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Look up file_hash and claim it for processing on a miss
+
+        Args:
+            file_hash: MD5 hash of the PDF content
+            wait: Block while another request processes the same hash;
+                  with wait=False the caller processes it unclaimed
+
+        Returns:
+            (duplicate, claimed) - duplicate is the previous result or None;
+            claimed=True means the caller must call release(file_hash)
+        """
+        while True:
+            duplicate = self.lookup(file_hash)
+            if duplicate is not None:
+                return duplicate, False
+
+            with self._lock:
+                # Claim holder may have finished since lookup()
+                if file_hash in self._cache:
+                    continue
+                event = self._inflight.get(file_hash)
+                if event is None:
+                    self._inflight[file_hash] = threading.Event()
+                    return None, True
+                if wait:
+                    self.waits += 1
+
+            if not wait:
+                return None, False
+
+            logger.info(f"Waiting for in-flight processing of identical PDF (hash {file_hash[:8]}...)")
+            event.wait()
+            # Claim holder failed - result is not stored, lookup misses and we claim
+
+    def release(self, file_hash: str):
+        """Release claim from claim() - wakes requests waiting for file_hash"""
+        with self._lock:
+            event = self._inflight.pop(file_hash, None)
+        if event is not None:
+            event.set()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'in_flight': len(self._inflight),
+            'hits': self.hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'waits': self.waits
+        }
+
+
+def _result_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild /invoice response from stored invoice row"""
+    xml_path = row.get('xml_path')
+    if not xml_path and row.get('invoice_number'):
+        xml_path = str(config.XML_DIR / f"{row['invoice_number']}.xml")
+
+    return {
+        "success": True,
+        "invoice_id": row.get('id'),
+        "invoice_number": row.get('invoice_number'),
+        "customer_name": row.get('customer_name'),
+        "total_amount": row.get('total_amount') or 0.0,
+        "items_count": None,
+        "pdf_saved": row.get('pdf_path'),
+        "xml_saved": xml_path,
+        "sqlite_saved": True,
+        "postgres_staging_enabled": config.POSTGRES_STAGING_ENABLED,
+        "postgres_saved": False,
+        "postgres_invoice_id": None,
+        "received_date": row.get('received_date')
+    }
+
+
+# Global duplicate index
+duplicate_index = DuplicateIndex(config.DUPLICATE_CACHE_SIZE)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Idempotent /invoice Requests
+
+n8n retries a delivery after an HTTP timeout while the first attempt may
+still be running. Requests are keyed by the Idempotency-Key header
+(default: message_id + PDF hash). A request whose key is already in
+flight waits for that execution instead of starting a second one, and
+later retries get the cached response.
+
+The execution runs as a task owned by the registry - a caller that
+disconnects stops waiting, but the task and its in-flight entry live
+until the pipeline finishes.
+
+All registry operations run on the asyncio event loop, so no locking
+is needed.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.utils import config
+
+logger = logging.getLogger(__name__)
+
+# (status_code, response content)
+Outcome = Tuple[int, Any]
+
+
+def default_key(message_id: Optional[str], content_hash: str) -> str:
+    """Idempotency key used when the client does not send one"""
+    return f"{message_id or ''}:{content_hash}"
+
+
+def pdf_hash_b64(file_b64: str) -> str:
+    """
+    MD5 of the decoded PDF - same hash as for raw/multipart uploads,
+    so one PDF gets one default key however it is sent (blocking,
+    call off the event loop)
+    """
+    try:
+        return hashlib.md5(base64.b64decode(file_b64)).hexdigest()
+    except (binascii.Error, ValueError):
+        # Invalid payload fails in the pipeline - key it by its text
+        return hashlib.md5(file_b64.encode("ascii", errors="ignore")).hexdigest()
+
+
+class IdempotencyRegistry:
+    """
+    In-flight request table plus TTL cache of completed responses
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = ttl_seconds
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._completed: "OrderedDict[str, Tuple[float, Outcome]]" = OrderedDict()
+
+        self.replayed = 0
+        self.coalesced = 0
+
+    async def execute(self, key: str, factory: Callable[[], Awaitable[Outcome]]) -> Tuple[Outcome, bool]:
+        """
+        Run factory once per key
+
+        Returns:
+            (outcome, replayed) - replayed is True when the outcome
+            comes from another execution
+
+        Raises:
+            Whatever the (shared) execution raised - errors are not cached,
+            so a later retry runs again
+        """
+        cached = self._get_completed(key)
+        if cached is not None:
+            self.replayed += 1
+            logger.info(f"Idempotent replay: {key}")
+            return cached, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info(f"Coalescing request onto in-flight execution: {key}")
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Cancelling this caller does not cancel the shared execution
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: str, task: asyncio.Future):
+        """Done callback of an execution - cache success, drop in-flight entry"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # Retrieved above - errors are not cached, nobody may be waiting
+            logger.info(f"Idempotent execution failed: {key}")
+            return
+
+        outcome = task.result()
+        if outcome[0] < 300:
+            self._store(key, outcome)
+
+    def _get_completed(self, key: str) -> Optional[Outcome]:
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+
+        stored_at, outcome = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            del self._completed[key]
+            return None
+
+        self._completed.move_to_end(key)
+        return outcome
+
+    def _store(self, key: str, outcome: Outcome):
+        if not self.max_size:
+            return
+        self._completed[key] = (time.time(), outcome)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_size:
+            self._completed.popitem(last=False)
+
+    def clear(self):
+        self._completed.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': len(self._inflight),
+            'cached': len(self._completed),
+            'replayed': self.replayed,
+            'coalesced': self.coalesced
+        }
+
+
+# Global registry for POST /invoice
+idempotency_registry = IdempotencyRegistry(config.IDEMPOTENCY_CACHE_SIZE, config.IDEMPOTENCY_TTL_SECONDS)
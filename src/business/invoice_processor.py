@@ -0,0 +1,546 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Invoice Processing Pipeline
+Blocking part of POST /invoice, executed on worker threads
+
+Workflow:
+1. Decode and save PDF
+2. Extract invoice data from PDF
+3. Save to SQLite database
+4. Generate ISDOC XML
+5. Save XML to disk
+6. [Optional] Save to PostgreSQL staging database for invoice-editor
+
+Each stage is timed into monitoring.metrics (stage latency histograms).
+"""
+
+import base64
+import hashlib
+import logging
+import sqlite3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.api import models
+from src.utils import config, monitoring
+from src.database import database
+from src.business.duplicate_check import duplicate_index
+from src.database.postgres_staging import PostgresStagingClient
+from src.extractors.ls_extractor import InvoiceData
+from src.extractors.registry import extract_invoice_data
+from src.business.isdoc_service import generate_isdoc_xml
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PreparedInvoice:
+    """Invoice after the CPU-bound stages, ready to be persisted"""
+    request: models.InvoiceMetadata
+    pdf_path: Path
+    file_hash: str
+    invoice_data: InvoiceData
+    xml_path: Optional[Path] = None
+    isdoc_xml: Optional[str] = None
+
+
+def process_invoice_request(request: models.InvoiceRequest) -> Dict[str, Any]:
+    """
+    Run the complete invoice pipeline for one request
+
+    Args:
+        request: Invoice data including PDF file
+
+    Returns:
+        Processing result with status and extracted data
+
+    Raises:
+        Exception: If any mandatory step fails
+    """
+    # 1. Decode PDF and check content hash before any other work
+    try:
+        pdf_data, file_hash = decode_pdf(request)
+        duplicate = check_duplicate(file_hash)
+    except Exception:
+        monitoring.metrics.increment_failed()
+        raise
+
+    if duplicate:
+        return duplicate
+
+    try:
+        try:
+            pdf_path = write_pdf(request.filename, pdf_data)
+        except Exception:
+            monitoring.metrics.increment_failed()
+            raise
+        return _process_claimed_invoice(request, pdf_path, file_hash)
+    finally:
+        duplicate_index.release(file_hash)
+
+
+def process_invoice_file(
+        metadata: models.InvoiceMetadata,
+        pdf_path: Path,
+        file_hash: str
+) -> Dict[str, Any]:
+    """
+    Run the invoice pipeline for a PDF already stored in PDF_DIR
+    (binary and multipart uploads are streamed to disk by the API)
+
+    Args:
+        metadata: Email metadata of the invoice
+        pdf_path: Stored PDF file
+        file_hash: MD5 hash of the PDF content
+
+    Returns:
+        Processing result with status and extracted data
+    """
+    duplicate = check_duplicate(file_hash)
+    if duplicate:
+        # Identical PDF is already stored - drop the new copy
+        pdf_path.unlink(missing_ok=True)
+        return duplicate
+
+    try:
+        return _process_claimed_invoice(metadata, pdf_path, file_hash)
+    finally:
+        duplicate_index.release(file_hash)
+
+
+def _process_claimed_invoice(metadata: models.InvoiceMetadata, pdf_path: Path, file_hash: str) -> Dict[str, Any]:
+    """Stages 2.-5. with metrics, for a hash claimed by check_duplicate()"""
+    try:
+        result = _process_stored_invoice(metadata, pdf_path, file_hash)
+    except Exception:
+        monitoring.metrics.increment_failed()
+        raise
+
+    if not result.get("duplicate"):
+        monitoring.metrics.increment_processed()
+        duplicate_index.remember(file_hash, result)
+    return result
+
+
+def _process_stored_invoice(metadata: models.InvoiceMetadata, pdf_path: Path, file_hash: str) -> Dict[str, Any]:
+    """Stages 2.-5. for a stored, non-duplicate PDF"""
+    # 2. Extract data from PDF
+    prepared = extract_saved_invoice(metadata, pdf_path, file_hash)
+    invoice_data = prepared.invoice_data
+
+    # 3. Save to SQLite database
+    try:
+        with monitoring.metrics.time_stage("sqlite"):
+            database.save_invoice(**build_invoice_record(prepared))
+    except sqlite3.IntegrityError:
+        # Same PDF stored meanwhile by a request that did not wait for our claim
+        duplicate = stored_duplicate(prepared)
+        if duplicate is None:
+            raise
+        return duplicate
+    print(f"✅ Saved to SQLite: {invoice_data.invoice_number}")
+
+    # 4. Generate ISDOC XML
+    generate_isdoc(prepared)
+
+    # 5. Save to PostgreSQL staging database (if enabled)
+    postgres_saved, postgres_invoice_id = save_to_postgres_staging(invoice_data, prepared.isdoc_xml)
+
+    return build_response(prepared, postgres_saved, postgres_invoice_id)
+
+
+def process_invoice_batch(requests: List[models.InvoiceRequest]) -> List[Dict[str, Any]]:
+    """
+    Process many invoices in one call (POST /invoices/batch)
+
+    Extraction and ISDOC generation run concurrently, SQLite rows are
+    written in one transaction and PostgreSQL staging shares a single
+    connection for the whole batch.
+
+    Returns:
+        Per-item results in request order; failed items have
+        success=False and an error message
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    prepared_items: List[Tuple[int, PreparedInvoice]] = []
+    claimed: List[str] = []
+
+    def prepare(request: models.InvoiceRequest) -> Union[PreparedInvoice, Dict[str, Any]]:
+        pdf_data, file_hash = decode_pdf(request)
+
+        # Claims are held until the batch is saved - never wait for another
+        # claim here (it may belong to this batch), the unique file_hash
+        # constraint resolves such items after the SQLite transaction
+        duplicate = check_duplicate(file_hash, wait=False, claims=claimed)
+        if duplicate:
+            return duplicate
+
+        pdf_path = write_pdf(request.filename, pdf_data)
+        prepared = extract_saved_invoice(request, pdf_path, file_hash)
+        generate_isdoc(prepared)
+        return prepared
+
+    try:
+        # 1.-4. Decode, extract and generate ISDOC concurrently
+        max_workers = max(1, min(config.WORKER_THREADS, len(requests)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="invoice-batch") as executor:
+            futures = [executor.submit(prepare, request) for request in requests]
+            for index, future in enumerate(futures):
+                try:
+                    prepared = future.result()
+                    if isinstance(prepared, dict):
+                        results[index] = prepared
+                    else:
+                        prepared_items.append((index, prepared))
+                except Exception as e:
+                    print(f"❌ Batch item {index} failed: {e}")
+                    monitoring.metrics.increment_failed()
+                    results[index] = _error_result(requests[index], e)
+
+        # 3. Save to SQLite database in one transaction
+        if prepared_items:
+            with monitoring.metrics.time_stage("sqlite_batch"):
+                saved = database.save_invoices_batch(
+                    [build_invoice_record(prepared) for _, prepared in prepared_items]
+                )
+
+            stored_items = []
+            for (index, prepared), (invoice_id, error) in zip(prepared_items, saved):
+                duplicate = stored_duplicate(prepared) if error else None
+                if duplicate:
+                    # Same PDF earlier in this batch or stored by a concurrent request
+                    results[index] = duplicate
+                elif error:
+                    print(f"❌ Batch item {index} not saved to SQLite: {error}")
+                    monitoring.metrics.increment_failed()
+                    results[index] = _error_result(prepared.request, error)
+                else:
+                    stored_items.append((index, prepared))
+            prepared_items = stored_items
+            print(f"✅ Saved to SQLite: {len(prepared_items)} invoices")
+
+        # 5. Save to PostgreSQL staging database (if enabled)
+        staging = save_to_postgres_staging_batch(
+            [(prepared.invoice_data, prepared.isdoc_xml) for _, prepared in prepared_items]
+        )
+        for (index, prepared), (postgres_saved, postgres_invoice_id) in zip(prepared_items, staging):
+            results[index] = build_response(prepared, postgres_saved, postgres_invoice_id)
+            monitoring.metrics.increment_processed()
+            duplicate_index.remember(prepared.file_hash, results[index])
+    finally:
+        for file_hash in claimed:
+            duplicate_index.release(file_hash)
+
+    return results
+
+
+def build_pdf_path(filename: Optional[str]) -> Path:
+    """
+    Unique PDF path in PDF_DIR (timestamp and random prefix)
+
+    Attachments often share a name (invoice.pdf) and batch items are
+    written in parallel within the same second - the random part keeps
+    them apart. Create the file with mode "xb" so a clash fails loudly.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return config.PDF_DIR / f"{timestamp}_{uuid.uuid4().hex[:8]}_{filename}"
+
+
+def decode_pdf(request: models.InvoiceRequest) -> Tuple[bytes, str]:
+    """
+    Decode base64 PDF and calculate its hash
+
+    Returns:
+        (pdf_data, file_hash)
+    """
+    with monitoring.metrics.time_stage("decode"):
+        pdf_data = base64.b64decode(request.file_b64)
+
+        # Calculate file hash for duplicate detection
+        file_hash = hashlib.md5(pdf_data).hexdigest()
+
+    return pdf_data, file_hash
+
+
+def write_pdf(filename: Optional[str], pdf_data: bytes) -> Path:
+    """Save PDF to PDF_DIR"""
+    pdf_path = build_pdf_path(filename)
+    with monitoring.metrics.time_stage("write_pdf"), open(pdf_path, "xb") as f:
+        f.write(pdf_data)
+    print(f"✅ PDF saved: {pdf_path}")
+    return pdf_path
+
+
+def check_duplicate(
+        file_hash: str,
+        wait: bool = True,
+        claims: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Return previous result if identical PDF was already processed
+
+    Skips extraction, ISDOC and PostgreSQL for redelivered attachments.
+    On a miss the hash is claimed (duplicate_index.claim) - the caller
+    must call duplicate_index.release(file_hash) when done. A request for
+    a hash that is being processed waits for that result.
+
+    Args:
+        file_hash: MD5 hash of the PDF content
+        wait: Passed to duplicate_index.claim()
+        claims: With wait=False the claim may fail - claimed hashes are
+                appended here instead and the caller releases those
+    """
+    with monitoring.metrics.time_stage("duplicate_check"):
+        duplicate, claimed = duplicate_index.claim(file_hash, wait=wait)
+    if claimed and claims is not None:
+        claims.append(file_hash)
+    if duplicate:
+        _record_duplicate(duplicate, file_hash)
+    return duplicate
+
+
+def stored_duplicate(prepared: PreparedInvoice) -> Optional[Dict[str, Any]]:
+    """
+    Stored result for a PDF whose INSERT hit the unique file_hash index
+
+    Removes the redundant PDF copy and ISDOC XML of this request.
+
+    Returns:
+        Duplicate result or None if no invoice with the hash exists
+    """
+    duplicate = duplicate_index.lookup(prepared.file_hash)
+    if duplicate is None:
+        return None
+
+    if duplicate.get("pdf_saved") != str(prepared.pdf_path):
+        prepared.pdf_path.unlink(missing_ok=True)
+    if prepared.xml_path and duplicate.get("xml_saved") != str(prepared.xml_path):
+        prepared.xml_path.unlink(missing_ok=True)
+
+    _record_duplicate(duplicate, prepared.file_hash)
+    return duplicate
+
+
+def _record_duplicate(duplicate: Dict[str, Any], file_hash: str):
+    monitoring.metrics.increment_duplicate()
+    print(f"⚠️  Duplicate PDF skipped: {duplicate.get('invoice_number')} (hash {file_hash[:8]}...)")
+
+
+def extract_saved_invoice(
+        metadata: models.InvoiceMetadata,
+        pdf_path: Path,
+        file_hash: str
+) -> PreparedInvoice:
+    """
+    Extract invoice data from stored PDF
+
+    Raises:
+        Exception: If no data could be extracted
+    """
+    with monitoring.metrics.time_stage("extract"):
+        invoice_data = extract_invoice_data(str(pdf_path), file_hash)
+
+    if not invoice_data:
+        raise Exception("Failed to extract data from PDF")
+
+    monitoring.metrics.observe_invoice_size(invoice_data.page_count, len(invoice_data.items))
+
+    print(f"✅ Data extracted: Invoice {invoice_data.invoice_number}")
+
+    return PreparedInvoice(
+        request=metadata,
+        pdf_path=pdf_path,
+        file_hash=file_hash,
+        invoice_data=invoice_data
+    )
+
+
+def generate_isdoc(prepared: PreparedInvoice):
+    """Generate ISDOC XML and save it to XML_DIR"""
+    xml_filename = f"{prepared.invoice_data.invoice_number}.xml"
+    prepared.xml_path = config.XML_DIR / xml_filename
+
+    with monitoring.metrics.time_stage("isdoc"):
+        prepared.isdoc_xml = generate_isdoc_xml(prepared.invoice_data, str(prepared.xml_path))
+    print(f"✅ ISDOC XML generated: {prepared.xml_path}")
+
+
+def build_invoice_record(prepared: PreparedInvoice) -> Dict[str, Any]:
+    """database.save_invoice() arguments - email metadata and the whole extracted header"""
+    invoice_data = prepared.invoice_data
+    request = prepared.request
+
+    def amount(value) -> Optional[float]:
+        return float(value) if value is not None else None
+
+    return {
+        'customer_name': invoice_data.customer_name,
+        'invoice_number': invoice_data.invoice_number,
+        'invoice_date': invoice_data.issue_date,
+        'total_amount': float(invoice_data.total_amount) if invoice_data.total_amount else 0.0,
+        'file_path': str(prepared.pdf_path),
+        'file_hash': prepared.file_hash,
+        'status': "received",
+        'message_id': request.message_id,
+        'gmail_id': request.gmail_id,
+        'sender': request.from_email,
+        'subject': request.subject,
+        'received_date': request.received_date,
+        'due_date': invoice_data.due_date,
+        'tax_amount': amount(invoice_data.tax_amount),
+        'net_amount': amount(invoice_data.net_amount),
+        'variable_symbol': invoice_data.variable_symbol,
+    }
+
+
+def build_response(
+        prepared: PreparedInvoice,
+        postgres_saved: bool,
+        postgres_invoice_id: Optional[int]
+) -> Dict[str, Any]:
+    """Build /invoice success response"""
+    invoice_data = prepared.invoice_data
+    return {
+        "success": True,
+        "message": "Invoice processed successfully",
+        "invoice_number": invoice_data.invoice_number,
+        "customer_name": invoice_data.customer_name,
+        "total_amount": float(invoice_data.total_amount) if invoice_data.total_amount else 0.0,
+        "items_count": len(invoice_data.items),
+        "pdf_saved": str(prepared.pdf_path),
+        "xml_saved": str(prepared.xml_path),
+        "sqlite_saved": True,
+        "postgres_staging_enabled": config.POSTGRES_STAGING_ENABLED,
+        "postgres_saved": postgres_saved,
+        "postgres_invoice_id": postgres_invoice_id,
+        "received_date": prepared.request.received_date
+    }
+
+
+def _error_result(request: models.InvoiceMetadata, error: Any) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "message": f"Invoice processing failed: {error}",
+        "filename": request.filename,
+        "message_id": request.message_id
+    }
+
+
+def _get_pg_config() -> Dict[str, Any]:
+    """PostgreSQL staging connection settings"""
+    return {
+        'host': config.POSTGRES_HOST,
+        'port': config.POSTGRES_PORT,
+        'database': config.POSTGRES_DATABASE,
+        'user': config.POSTGRES_USER,
+        'password': config.POSTGRES_PASSWORD
+    }
+
+
+def save_to_postgres_staging(
+        invoice_data: InvoiceData,
+        isdoc_xml: str
+) -> Tuple[bool, Optional[int]]:
+    """
+    Save invoice to PostgreSQL staging database (if enabled)
+
+    Errors are logged but never fail the whole process - invoice
+    is still saved to SQLite and files.
+
+    Returns:
+        (postgres_saved, postgres_invoice_id)
+    """
+    return save_to_postgres_staging_batch([(invoice_data, isdoc_xml)])[0]
+
+
+def save_to_postgres_staging_batch(
+        invoices: List[Tuple[InvoiceData, str]]
+) -> List[Tuple[bool, Optional[int]]]:
+    """
+    Save invoices to PostgreSQL staging over a single connection
+
+    Each invoice is committed together with its items.
+
+    Returns:
+        (postgres_saved, postgres_invoice_id) per invoice
+    """
+    results: List[Tuple[bool, Optional[int]]] = [(False, None)] * len(invoices)
+
+    if not config.POSTGRES_STAGING_ENABLED or not invoices:
+        return results
+
+    stage = "postgres" if len(invoices) == 1 else "postgres_batch"
+    try:
+        # Create PostgreSQL client
+        with monitoring.metrics.time_stage(stage), PostgresStagingClient(_get_pg_config()) as pg_client:
+            for index, (invoice_data, isdoc_xml) in enumerate(invoices):
+                results[index] = _insert_staging_invoice(pg_client, invoice_data, isdoc_xml)
+
+    except Exception as pg_error:
+        # Log error but don't fail the whole process
+        print(f"⚠️  PostgreSQL staging error: {pg_error}")
+        # Continue - invoice is still saved to SQLite and files
+
+    return results
+
+
+def _insert_staging_invoice(
+        pg_client: PostgresStagingClient,
+        invoice_data: InvoiceData,
+        isdoc_xml: str
+) -> Tuple[bool, Optional[int]]:
+    # Check for duplicates
+    is_duplicate = pg_client.check_duplicate_invoice(
+        invoice_data.supplier_ico,
+        invoice_data.invoice_number
+    )
+
+    if is_duplicate:
+        print(f"⚠️  Invoice already exists in PostgreSQL staging: {invoice_data.invoice_number}")
+        return False, None
+
+    # Prepare invoice data for PostgreSQL
+    invoice_pg_data = {
+        'supplier_ico': invoice_data.supplier_ico,
+        'supplier_name': invoice_data.supplier_name,
+        'supplier_dic': invoice_data.supplier_dic,
+        'invoice_number': invoice_data.invoice_number,
+        'invoice_date': invoice_data.issue_date,
+        'due_date': invoice_data.due_date,
+        'total_amount': invoice_data.total_amount,
+        'total_vat': invoice_data.tax_amount,
+        'total_without_vat': invoice_data.net_amount,
+        'currency': invoice_data.currency
+    }
+
+    # Items data for PostgreSQL - generator, rows are built while inserting
+    items_pg_data = (
+        {
+            'line_number': item.line_number,
+            'name': item.description,
+            'quantity': item.quantity,
+            'unit': item.unit,
+            'price_per_unit': item.unit_price_no_vat,
+            'ean': item.ean_code,
+            'vat_rate': item.vat_rate
+        }
+        for item in invoice_data.items
+    )
+
+    # Insert to PostgreSQL
+    postgres_invoice_id = pg_client.insert_invoice_with_items(
+        invoice_pg_data,
+        items_pg_data,
+        isdoc_xml
+    )
+
+    if postgres_invoice_id:
+        print(f"✅ Saved to PostgreSQL staging: invoice_id={postgres_invoice_id}")
+        return True, postgres_invoice_id
+
+    logger.error("Failed to save to PostgreSQL staging")
+    return False, None
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Asynchronous Invoice Jobs
+Decouples intake (POST /invoice?async=true) from processing
+
+The request payload is persisted to config.JOBS_DIR and the job is
+recorded in SQLite, so queued jobs survive a restart. Background worker
+threads run the normal invoice pipeline and store the result.
+
+At most config.JOB_QUEUE_SIZE jobs are queued or running - beyond that
+submit raises JobQueueFull and the API answers 503, as for a full
+worker pool.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.api import models
+from src.utils import config
+from src.database import database
+from src.business.invoice_processor import process_invoice_file, process_invoice_request
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised when max_queued jobs are already queued or running"""
+
+
+class JobManager:
+    """
+    Persistent job queue with a fixed number of worker threads
+
+    max_queued limits jobs queued or running (0 = unlimited). Jobs
+    requeued after a restart are always accepted.
+    """
+
+    def __init__(
+            self,
+            workers: int,
+            processor: Callable = process_invoice_request,
+            file_processor: Callable = process_invoice_file,
+            max_queued: int = 0
+    ):
+        self.workers = max(1, workers)
+        self.processor = processor
+        self.file_processor = file_processor
+        self.max_queued = max(0, max_queued)
+
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        # Long-poll waiters per job: (event loop, future completed by worker)
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start worker threads and requeue jobs interrupted by restart"""
+        with self._lock:
+            if self._threads:
+                return
+
+            database.init_database()
+            config.JOBS_DIR.mkdir(parents=True, exist_ok=True)
+
+            for job in database.get_unfinished_jobs():
+                logger.info(f"Requeueing interrupted job: {job['id']}")
+                database.update_job(job['id'], JOB_QUEUED)
+                self._pending += 1
+                self._queue.put(job['id'])
+
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"invoice-job-{i}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+            logger.info(f"Job manager started with {self.workers} workers")
+
+    def stop(self, timeout: float = 30.0):
+        """Stop worker threads after current jobs finish"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    @property
+    def is_full(self) -> bool:
+        """True if the next submit would be rejected"""
+        return 0 < self.max_queued <= self._pending
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, request: models.InvoiceRequest) -> str:
+        """
+        Persist request and enqueue it for background processing
+
+        Returns:
+            Job ID
+
+        Raises:
+            JobQueueFull: If max_queued jobs are queued or running
+        """
+        return self._enqueue(request, request.model_dump_json(by_alias=True))
+
+    def submit_file(self, metadata: models.InvoiceMetadata, pdf_path: Path, file_hash: str) -> str:
+        """
+        Enqueue PDF already stored in PDF_DIR (binary/multipart upload)
+
+        Returns:
+            Job ID
+
+        Raises:
+            JobQueueFull: If max_queued jobs are queued or running
+        """
+        payload = {
+            "metadata": metadata.model_dump(by_alias=True),
+            "pdf_path": str(pdf_path),
+            "file_hash": file_hash
+        }
+        return self._enqueue(metadata, json.dumps(payload))
+
+    def _enqueue(self, metadata: models.InvoiceMetadata, payload: str) -> str:
+        if not self.running:
+            self.start()
+
+        with self._lock:
+            if 0 < self.max_queued <= self._pending:
+                self._rejected += 1
+                raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs queued or running)")
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        payload_path = config.JOBS_DIR / f"{job_id}.json"
+        try:
+            payload_path.write_text(payload, encoding="utf-8")
+            database.insert_job(
+                job_id,
+                str(payload_path),
+                filename=metadata.filename,
+                message_id=metadata.message_id
+            )
+        except Exception:
+            self._job_finished()
+            payload_path.unlink(missing_ok=True)
+            raise
+
+        self._queue.put(job_id)
+
+        logger.info(f"Job queued: {job_id} ({metadata.filename})")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return job status (with decoded result) or None if unknown"""
+        job = database.get_job(job_id)
+        if not job:
+            return None
+        return self._format_job(job)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll - wait until job finishes or timeout expires
+
+        The worker completes a future per waiter, so waiting holds no
+        thread and does not poll; database reads run in a thread.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        # Register before reading status - a job finishing in between still wakes us
+        with self._lock:
+            self._waiters.setdefault(job_id, []).append((loop, waiter))
+
+        try:
+            job = await asyncio.to_thread(self.get, job_id)
+            if job is None or job['status'] in FINISHED_STATES:
+                return job
+
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            return await asyncio.to_thread(self.get, job_id)
+        finally:
+            self._remove_waiter(job_id, waiter)
+
+    def _remove_waiter(self, job_id: str, waiter: asyncio.Future):
+        with self._lock:
+            waiters = self._waiters.get(job_id)
+            if waiters is None:
+                return
+            waiters[:] = [entry for entry in waiters if entry[1] is not waiter]
+            if not waiters:
+                del self._waiters[job_id]
+
+    def _notify_waiters(self, job_id: str):
+        """Wake long-poll waiters of a finished job (called from worker thread)"""
+        with self._lock:
+            waiters = self._waiters.pop(job_id, [])
+
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_complete_waiter, waiter)
+            except RuntimeError:
+                # Event loop of the waiter is already closed
+                pass
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error ({job_id}): {e}", exc_info=True)
+            finally:
+                self._job_finished()
+
+    def _job_finished(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _run_job(self, job_id: str):
+        job = database.get_job(job_id)
+        if not job or job['status'] in FINISHED_STATES:
+            return
+
+        database.update_job(job_id, JOB_PROCESSING)
+        payload_path = Path(job['payload_path'])
+
+        try:
+            payload = json.loads(payload_path.read_text(encoding="utf-8"))
+            if "pdf_path" in payload:
+                result = self.file_processor(
+                    models.InvoiceMetadata.model_validate(payload["metadata"]),
+                    Path(payload["pdf_path"]),
+                    payload["file_hash"]
+                )
+            else:
+                result = self.processor(models.InvoiceRequest.model_validate(payload))
+            database.update_job(job_id, JOB_DONE, result=json.dumps(result, default=str))
+            print(f"✅ Job {job_id} done: {result.get('invoice_number')}")
+
+            # Payload no longer needed - PDF is stored in PDF_DIR
+            payload_path.unlink(missing_ok=True)
+
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            database.update_job(job_id, JOB_FAILED, error=str(e))
+
+        finally:
+            self._notify_waiters(job_id)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Job queue statistics for /status"""
+        return {
+            'workers': self.workers,
+            'max_queued': self.max_queued,
+            'pending': self._pending,
+            'rejected_total': self._rejected
+        }
+
+    @staticmethod
+    def _format_job(job: Dict) -> Dict[str, Any]:
+        result = json.loads(job['result']) if job.get('result') else None
+        return {
+            "job_id": job['id'],
+            "status": job['status'],
+            "filename": job.get('filename'),
+            "message_id": job.get('message_id'),
+            "created_at": job.get('created_at'),
+            "started_at": job.get('started_at'),
+            "finished_at": job.get('finished_at'),
+            "attempts": job.get('attempts'),
+            "result": result,
+            "error": job.get('error')
+        }
+
+
+def _complete_waiter(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# Global job manager
+job_manager = JobManager(config.JOB_WORKERS, max_queued=config.JOB_QUEUE_SIZE)
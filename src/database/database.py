@@ -2,97 +2,157 @@
 """
 Supplier Invoice Loader - Database Operations v2.0
 Enhanced with multi-customer support
+
+SQLite in WAL mode with one reusable connection per thread
+(get_connection). Writes run on a single writer thread that commits
+queued writes in groups (write_queue.py); callers wait for the commit.
 """
 
 import sqlite3
 import hashlib
 import time
 import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, Iterator, List, Tuple, TypeVar
 from datetime import datetime
 
+from src.database import migrations
+from src.database.write_queue import WriteQueue
+
 # Import customer name from config
 try:
     from src.utils.config import DB_FILE, CUSTOMER_NAME
+    from src.utils.config import SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_SYNCHRONOUS
+    from src.utils.config import (
+        SQLITE_WRITE_QUEUE_ENABLED, SQLITE_GROUP_COMMIT_MAX, SQLITE_GROUP_COMMIT_WINDOW_MS,
+    )
 except ImportError:
     # Fallback for testing
     DB_FILE = Path("invoices.db")
     CUSTOMER_NAME = "DEFAULT"
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_CACHE_SIZE_KB = 8192
+    SQLITE_SYNCHRONOUS = "NORMAL"
+    SQLITE_WRITE_QUEUE_ENABLED = True
+    SQLITE_GROUP_COMMIT_MAX = 64
+    SQLITE_GROUP_COMMIT_WINDOW_MS = 0.0
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-def init_database():
-    """Vytvorí databázovú štruktúru - v2.0 s multi-customer podporou"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    # Hlavná tabuľka faktúr - rozšírená o multi-customer polia
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS invoices (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-
-            -- Customer identification (NEW)
-            customer_name TEXT,
-
-            -- Email metadata
-            message_id TEXT,
-            gmail_id TEXT,
-            sender TEXT,
-            subject TEXT,
-            received_date TEXT,
-
-            -- File info
-            file_hash TEXT UNIQUE NOT NULL,
-            original_filename TEXT,
-            pdf_path TEXT NOT NULL,
-            xml_path TEXT,
-
-            -- Timestamps
-            created_at INTEGER NOT NULL,
-            processed_at INTEGER,
-
-            -- Status
-            status TEXT DEFAULT 'received',
-
-            -- NEX Genesis integration (NEW)
-            nex_genesis_id TEXT,
-            nex_status TEXT DEFAULT 'pending',
-            nex_sync_date TEXT,
-            nex_error_message TEXT,
-
-            -- Extracted data (Fáza 2)
-            invoice_number TEXT,
-            issue_date TEXT,
-            due_date TEXT,
-            total_amount REAL,
-            tax_amount REAL,
-            net_amount REAL,
-            variable_symbol TEXT,
-
-            -- Flags
-            is_duplicate INTEGER DEFAULT 0,
-
-            -- Migration tracking (NEW)
-            migration_version TEXT
-        )
-    """)
 
-    # Indexy pre rýchle vyhľadávanie
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON invoices(file_hash)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_message_id ON invoices(message_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_number ON invoices(invoice_number)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON invoices(status)")
+# ============================================================================
+# CONNECTIONS
+# ============================================================================
+# Každé vlákno má jedno trvalé spojenie na DB_FILE (nové pri zmene DB_FILE).
+# WAL: čitatelia (/stats, /invoices) neblokujú zápis a zápis neblokuje ich;
+# synchronous=NORMAL je vo WAL režime bezpečné (fsync pri checkpointe).
+
+_local = threading.local()
+_connections_lock = threading.Lock()
+_connections: Dict[int, sqlite3.Connection] = {}
+# Zvýši sa pri close_connections() - vlákna potom otvoria nové spojenie
+_generation = 0
+
+
+def _open_connection(db_file: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_file, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size={-int(SQLITE_CACHE_SIZE_KB)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def get_connection(db_file: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Per-thread connection to db_file (default DB_FILE), opened on first
+    use and then reused
+
+    Connection is used only by its own thread; close_connections() may
+    close it from another thread at shutdown.
+    """
+    db_file = db_file or str(DB_FILE)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.db_file == db_file and _local.generation == _generation:
+        return conn
+
+    if conn is not None:
+        conn.close()
+    conn = _open_connection(db_file)
+    _local.conn = conn
+    _local.db_file = db_file
+    _local.generation = _generation
+    with _connections_lock:
+        _connections[threading.get_ident()] = conn
+    return conn
+
+
+def close_connections():
+    """Close connections of all threads (application shutdown, tests)"""
+    global _generation
+    write_queue.stop()
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+        _generation += 1
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error closing SQLite connection: {e}")
+
+
+@contextmanager
+def _reader(row_factory=None) -> Iterator[sqlite3.Cursor]:
+    """Cursor for reads (autocommit - sees last committed state)"""
+    cursor = get_connection().cursor()
+    cursor.row_factory = row_factory
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+
+
+# Všetky zápisy idú cez jedno vlákno - skupinový commit (write_queue.py)
+write_queue = WriteQueue(get_connection, max_batch=SQLITE_GROUP_COMMIT_MAX,
+                         window_ms=SQLITE_GROUP_COMMIT_WINDOW_MS, enabled=SQLITE_WRITE_QUEUE_ENABLED)
+
+
+def submit_write(operation: Callable[[sqlite3.Cursor], T]) -> "Future[T]":
+    """
+    Queue operation(cursor) on the writer thread
+
+    Returns:
+        Future with the return value of operation, resolved after commit
+    """
+    return write_queue.submit(str(DB_FILE), operation)
+
 
-    # New indexes for multi-customer support
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_name ON invoices(customer_name)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nex_genesis_id ON invoices(nex_genesis_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nex_status ON invoices(nex_status)")
+def _write(operation: Callable[[sqlite3.Cursor], T]) -> T:
+    """Run write operation on the writer thread and wait for its commit"""
+    return submit_write(operation).result()
 
-    conn.commit()
-    conn.close()
-    logger.info("Database initialized successfully (v2.0)")
+
+def init_database() -> int:
+    """
+    Vytvorí/aktualizuje databázovú štruktúru - spustí čakajúce migrácie
+    (migrations.py). Volá sa raz pri štarte aplikácie, nie pri requestoch.
+
+    Returns:
+        Schema version
+    """
+    conn = get_connection()
+    applied = migrations.migrate(conn)
+    version = migrations.get_schema_version(conn)
+    if applied:
+        logger.info(f"Database initialized successfully (schema version {version})")
+    return version
 
 
 def calculate_file_hash(file_content: bytes) -> str:
@@ -113,29 +173,25 @@ def is_duplicate(file_hash: str, message_id: Optional[str] = None, customer_name
     Returns:
         True ak faktúra už existuje
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
     # Use customer from config if not provided
     if customer_name is None:
         customer_name = CUSTOMER_NAME
 
-    # Check by file hash (primary) within customer
-    cursor.execute(
-        "SELECT id FROM invoices WHERE file_hash = ? AND customer_name = ?",
-        (file_hash, customer_name)
-    )
-    result = cursor.fetchone()
-
-    # Check by message_id (secondary) within customer
-    if not result and message_id:
+    with _reader() as cursor:
+        # Check by file hash (primary) within customer
         cursor.execute(
-            "SELECT id FROM invoices WHERE message_id = ? AND customer_name = ?",
-            (message_id, customer_name)
+            "SELECT id FROM invoices WHERE file_hash = ? AND customer_name = ?",
+            (file_hash, customer_name)
         )
         result = cursor.fetchone()
 
-    conn.close()
+        # Check by message_id (secondary) within customer
+        if not result and message_id:
+            cursor.execute(
+                "SELECT id FROM invoices WHERE message_id = ? AND customer_name = ?",
+                (message_id, customer_name)
+            )
+            result = cursor.fetchone()
     return result is not None
 
 
@@ -158,37 +214,76 @@ def insert_invoice(
     Returns:
         ID novej faktúry
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
     # Use customer from config if not provided
     if customer_name is None:
         customer_name = CUSTOMER_NAME
 
-    cursor.execute("""
-        INSERT INTO invoices (
-            customer_name,
-            message_id, gmail_id, sender, subject, received_date,
-            file_hash, original_filename, pdf_path,
-            created_at, status,
-            nex_genesis_id, nex_status,
-            migration_version
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        customer_name,
+    record = _invoice_record(
+        file_path=pdf_path, file_hash=file_hash, original_filename=original_filename,
+        message_id=message_id, gmail_id=gmail_id, sender=sender, subject=subject,
+        received_date=received_date, customer_name=customer_name, nex_genesis_id=nex_genesis_id
+    )
+    invoice_id = _write(lambda cursor: _insert_invoice_row(cursor, record))
+
+    logger.info(f"Invoice inserted: ID={invoice_id}, customer={customer_name}, hash={file_hash[:8]}...")
+    return invoice_id
+
+
+# Celý záznam faktúry (email, súbor, extrahovaná hlavička) jedným INSERT -
+# žiadny polovične vyplnený riadok medzi INSERT a UPDATE
+_INVOICE_COLUMNS = (
+    'customer_name',
+    'message_id', 'gmail_id', 'sender', 'subject', 'received_date',
+    'file_hash', 'original_filename', 'pdf_path',
+    'created_at', 'status',
+    'nex_genesis_id', 'nex_status',
+    'invoice_number', 'issue_date', 'due_date',
+    'total_amount', 'tax_amount', 'net_amount', 'variable_symbol',
+    'migration_version',
+)
+
+_INSERT_INVOICE_SQL = (
+    f"INSERT INTO invoices ({', '.join(_INVOICE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_INVOICE_COLUMNS))})"
+)
+
+
+def _invoice_record(
+        file_path: str,
+        file_hash: str,
+        customer_name: Optional[str] = None,
+        invoice_number: Optional[str] = None,
+        invoice_date: Optional[str] = None,
+        total_amount: Optional[float] = None,
+        status: str = "received",
+        message_id: Optional[str] = None,
+        gmail_id: Optional[str] = None,
+        sender: Optional[str] = None,
+        subject: Optional[str] = None,
+        received_date: Optional[str] = None,
+        due_date: Optional[str] = None,
+        tax_amount: Optional[float] = None,
+        net_amount: Optional[float] = None,
+        variable_symbol: Optional[str] = None,
+        original_filename: Optional[str] = None,
+        nex_genesis_id: Optional[str] = None
+) -> Tuple:
+    """Values for _INSERT_INVOICE_SQL from save_invoice() arguments"""
+    return (
+        customer_name or CUSTOMER_NAME,
         message_id, gmail_id, sender, subject, received_date,
-        file_hash, original_filename, pdf_path,
-        int(time.time()), 'received',
-        nex_genesis_id, 'pending' if not nex_genesis_id else 'synced',
+        file_hash, original_filename or Path(file_path).name, file_path,
+        int(time.time()), status or 'received',
+        nex_genesis_id, 'synced' if nex_genesis_id else 'pending',
+        invoice_number, invoice_date, due_date or None,
+        total_amount, tax_amount, net_amount, variable_symbol or None,
         '2.0.0'
-    ))
+    )
 
-    invoice_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
 
-    logger.info(f"Invoice inserted: ID={invoice_id}, customer={customer_name}, hash={file_hash[:8]}...")
-    return invoice_id
+def _insert_invoice_row(cursor: sqlite3.Cursor, record: Tuple) -> int:
+    cursor.execute(_INSERT_INVOICE_SQL, record)
+    return cursor.lastrowid
 
 
 def update_nex_genesis_status(
@@ -209,27 +304,24 @@ def update_nex_genesis_status(
     Returns:
         True if updated successfully
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE invoices SET
-            nex_genesis_id = ?,
-            nex_status = ?,
-            nex_sync_date = ?,
-            nex_error_message = ?
-        WHERE id = ?
-    """, (
-        nex_genesis_id,
-        status,
-        datetime.now().isoformat(),
-        error_message,
-        invoice_id
-    ))
-
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    def write(cursor):
+        cursor.execute("""
+            UPDATE invoices SET
+                nex_genesis_id = ?,
+                nex_status = ?,
+                nex_sync_date = ?,
+                nex_error_message = ?
+            WHERE id = ?
+        """, (
+            nex_genesis_id,
+            status,
+            datetime.now().isoformat(),
+            error_message,
+            invoice_id
+        ))
+        return cursor.rowcount > 0
+
+    success = _write(write)
 
     if success:
         logger.info(f"NEX Genesis status updated: invoice_id={invoice_id}, nex_id={nex_genesis_id}, status={status}")
@@ -241,14 +333,28 @@ def update_nex_genesis_status(
 
 def get_invoice_by_id(invoice_id: int) -> Optional[Dict]:
     """Vráti faktúru podľa ID"""
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM invoices WHERE id = ?", (invoice_id,))
+        row = cursor.fetchone()
+
+    if row:
+        return dict(row)
+    return None
+
+
+def get_invoice_by_hash(file_hash: str) -> Optional[Dict]:
+    """
+    Vráti faktúru podľa hashu PDF súboru (index idx_file_hash)
 
-    cursor.execute("SELECT * FROM invoices WHERE id = ?", (invoice_id,))
-    row = cursor.fetchone()
+    Args:
+        file_hash: Hash of PDF content
 
-    conn.close()
+    Returns:
+        Invoice dict or None
+    """
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM invoices WHERE file_hash = ?", (file_hash,))
+        row = cursor.fetchone()
 
     if row:
         return dict(row)
@@ -265,14 +371,9 @@ def get_invoice_by_nex_id(nex_genesis_id: str) -> Optional[Dict]:
     Returns:
         Invoice dict or None
     """
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM invoices WHERE nex_genesis_id = ?", (nex_genesis_id,))
-    row = cursor.fetchone()
-
-    conn.close()
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM invoices WHERE nex_genesis_id = ?", (nex_genesis_id,))
+        row = cursor.fetchone()
 
     if row:
         return dict(row)
@@ -291,26 +392,22 @@ def get_all_invoices(limit: int = 100, customer_name: Optional[str] = None) -> L
     Returns:
         List of invoice dicts
     """
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    if customer_name:
-        cursor.execute("""
-            SELECT * FROM invoices 
-            WHERE customer_name = ?
-            ORDER BY created_at DESC 
-            LIMIT ?
-        """, (customer_name, limit))
-    else:
-        cursor.execute("""
-            SELECT * FROM invoices 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        """, (limit,))
-
-    rows = cursor.fetchall()
-    conn.close()
+    with _reader(sqlite3.Row) as cursor:
+        if customer_name:
+            cursor.execute("""
+                SELECT * FROM invoices 
+                WHERE customer_name = ?
+                ORDER BY created_at DESC 
+                LIMIT ?
+            """, (customer_name, limit))
+        else:
+            cursor.execute("""
+                SELECT * FROM invoices 
+                ORDER BY created_at DESC 
+                LIMIT ?
+            """, (limit,))
+
+        rows = cursor.fetchall()
 
     return [dict(row) for row in rows]
 
@@ -326,27 +423,23 @@ def get_pending_nex_sync(customer_name: Optional[str] = None, limit: int = 10) -
     Returns:
         List of invoices pending sync
     """
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    if customer_name:
-        cursor.execute("""
-            SELECT * FROM invoices 
-            WHERE nex_status = 'pending' AND customer_name = ?
-            ORDER BY created_at ASC 
-            LIMIT ?
-        """, (customer_name, limit))
-    else:
-        cursor.execute("""
-            SELECT * FROM invoices 
-            WHERE nex_status = 'pending'
-            ORDER BY created_at ASC 
-            LIMIT ?
-        """, (limit,))
-
-    rows = cursor.fetchall()
-    conn.close()
+    with _reader(sqlite3.Row) as cursor:
+        if customer_name:
+            cursor.execute("""
+                SELECT * FROM invoices 
+                WHERE nex_status = 'pending' AND customer_name = ?
+                ORDER BY created_at ASC 
+                LIMIT ?
+            """, (customer_name, limit))
+        else:
+            cursor.execute("""
+                SELECT * FROM invoices 
+                WHERE nex_status = 'pending'
+                ORDER BY created_at ASC 
+                LIMIT ?
+            """, (limit,))
+
+        rows = cursor.fetchall()
 
     return [dict(row) for row in rows]
 
@@ -356,62 +449,42 @@ def get_stats(customer_name: Optional[str] = None) -> Dict:
     Vráti štatistiky o faktúrach
     V2.0: Možnosť získať štatistiky pre konkrétneho zákazníka
 
+    Reads invoice_counters (maintained by triggers on invoices) - cost
+    does not grow with the number of invoices.
+
     Args:
         customer_name: Filter podľa zákazníka (None = všetci)
 
     Returns:
         Statistics dict
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    with _reader() as cursor:
+        if customer_name:
+            cursor.execute("""
+                SELECT customer_name, status, nex_status, total, duplicates
+                FROM invoice_counters
+                WHERE customer_name = ?
+            """, (customer_name,))
+        else:
+            cursor.execute("SELECT customer_name, status, nex_status, total, duplicates FROM invoice_counters")
+        rows = cursor.fetchall()
+
+    total = 0
+    duplicates = 0
+    by_status: Dict[Optional[str], int] = {}
+    by_nex_status: Dict[Optional[str], int] = {}
+    by_customer: Dict[Optional[str], int] = {}
+    for customer, status, nex_status, count, duplicate_count in rows:
+        # NULL is stored as '' in invoice_counters
+        total += count
+        duplicates += duplicate_count
+        by_status[status or None] = by_status.get(status or None, 0) + count
+        by_nex_status[nex_status or None] = by_nex_status.get(nex_status or None, 0) + count
+        by_customer[customer or None] = by_customer.get(customer or None, 0) + count
 
-    # Build WHERE clause
-    where_clause = ""
-    params = []
     if customer_name:
-        where_clause = "WHERE customer_name = ?"
-        params.append(customer_name)
-
-    # Total count
-    cursor.execute(f"SELECT COUNT(*) FROM invoices {where_clause}", params)
-    total = cursor.fetchone()[0]
-
-    # By status
-    cursor.execute(f"""
-        SELECT status, COUNT(*) 
-        FROM invoices 
-        {where_clause}
-        GROUP BY status
-    """, params)
-    by_status = dict(cursor.fetchall())
-
-    # By NEX sync status
-    cursor.execute(f"""
-        SELECT nex_status, COUNT(*) 
-        FROM invoices 
-        {where_clause}
-        GROUP BY nex_status
-    """, params)
-    by_nex_status = dict(cursor.fetchall())
-
-    # Duplicates
-    cursor.execute(
-        f"SELECT COUNT(*) FROM invoices {where_clause} {'AND' if where_clause else 'WHERE'} is_duplicate = 1", params)
-    duplicates = cursor.fetchone()[0]
-
-    # By customer (if not filtered)
-    if not customer_name:
-        cursor.execute("""
-            SELECT customer_name, COUNT(*) 
-            FROM invoices 
-            GROUP BY customer_name
-        """)
-        by_customer = dict(cursor.fetchall())
-    else:
         by_customer = {customer_name: total}
 
-    conn.close()
-
     return {
         "total": total,
         "by_status": by_status,
@@ -422,6 +495,30 @@ def get_stats(customer_name: Optional[str] = None) -> Dict:
     }
 
 
+def count_invoices() -> int:
+    """Počet všetkých faktúr z invoice_counters (bez prechodu tabuľky invoices)"""
+    with _reader() as cursor:
+        cursor.execute("SELECT COALESCE(SUM(total), 0) FROM invoice_counters")
+        total = cursor.fetchone()[0]
+    return total
+
+
+def reconcile_stats() -> Dict[str, Dict]:
+    """
+    Rebuild invoice_counters from the invoices table
+
+    Returns:
+        {"before": stats, "after": stats} - differ when counters drifted
+    """
+    before = get_stats()
+    _write(migrations.rebuild_invoice_counters)
+    after = get_stats()
+
+    if before != after:
+        logger.warning(f"Invoice counters reconciled: {before['total']} -> {after['total']} invoices")
+    return {"before": before, "after": after}
+
+
 def get_customer_list() -> List[str]:
     """
     Get list of all customers in database
@@ -429,24 +526,19 @@ def get_customer_list() -> List[str]:
     Returns:
         List of unique customer names
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT DISTINCT customer_name 
-        FROM invoices 
-        WHERE customer_name IS NOT NULL
-        ORDER BY customer_name
-    """)
+    with _reader() as cursor:
+        cursor.execute("""
+            SELECT DISTINCT customer_name
+            FROM invoice_counters
+            WHERE customer_name != ''
+            ORDER BY customer_name
+        """)
 
-    customers = [row[0] for row in cursor.fetchall()]
-    conn.close()
+        customers = [row[0] for row in cursor.fetchall()]
 
     return customers
 
 
-
-
 def save_invoice(
         customer_name: str,
         invoice_number: str,
@@ -456,10 +548,18 @@ def save_invoice(
         file_hash: str,
         status: str = "received",
         message_id: Optional[str] = None,
-        gmail_id: Optional[str] = None
+        gmail_id: Optional[str] = None,
+        sender: Optional[str] = None,
+        subject: Optional[str] = None,
+        received_date: Optional[str] = None,
+        due_date: Optional[str] = None,
+        tax_amount: Optional[float] = None,
+        net_amount: Optional[float] = None,
+        variable_symbol: Optional[str] = None
 ) -> int:
     """
-    Save invoice to database (simplified wrapper for insert_invoice)
+    Save complete invoice record (email metadata + extracted header)
+    with a single INSERT
 
     Args:
         customer_name: Customer name
@@ -471,46 +571,223 @@ def save_invoice(
         status: Invoice status
         message_id: Email message ID
         gmail_id: Gmail ID
+        sender: Email sender
+        subject: Email subject
+        received_date: Email received date
+        due_date: Due date
+        tax_amount: VAT amount
+        net_amount: Amount without VAT
+        variable_symbol: Variable symbol
 
     Returns:
         Invoice ID
     """
-    # Insert invoice
-    invoice_id = insert_invoice(
-        file_hash=file_hash,
-        pdf_path=file_path,
-        original_filename=Path(file_path).name,
-        message_id=message_id,
-        gmail_id=gmail_id,
-        customer_name=customer_name
+    record = _invoice_record(
+        file_path=file_path, file_hash=file_hash, customer_name=customer_name,
+        invoice_number=invoice_number, invoice_date=invoice_date, total_amount=total_amount,
+        status=status, message_id=message_id, gmail_id=gmail_id,
+        sender=sender, subject=subject, received_date=received_date,
+        due_date=due_date, tax_amount=tax_amount, net_amount=net_amount, variable_symbol=variable_symbol
     )
-
-    # Update with extracted data
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE invoices SET
-            invoice_number = ?,
-            issue_date = ?,
-            total_amount = ?,
-            status = ?
-        WHERE id = ?
-    """, (
-        invoice_number,
-        invoice_date,
-        total_amount,
-        status,
-        invoice_id
-    ))
-
-    conn.commit()
-    conn.close()
+    invoice_id = _write(lambda cursor: _insert_invoice_row(cursor, record))
 
     logger.info(f"Invoice saved: ID={invoice_id}, number={invoice_number}, amount={total_amount}")
     return invoice_id
 
 
+def save_invoices_batch(invoices: List[Dict]) -> List[Tuple[Optional[int], Optional[str]]]:
+    """
+    Save many invoices in a single transaction (POST /invoices/batch)
+
+    Args:
+        invoices: List of dicts with save_invoice() arguments
+
+    Returns:
+        (invoice_id, error) per invoice - rows violating the unique
+        file_hash constraint are skipped with an error, others are saved
+    """
+    records = [_invoice_record(**invoice) for invoice in invoices]
+    results: List[Tuple[Optional[int], Optional[str]]] = []
+
+    def write(cursor):
+        for record in records:
+            try:
+                results.append((_insert_invoice_row(cursor, record), None))
+            except sqlite3.IntegrityError as e:
+                results.append((None, f"Duplicate invoice file: {e}"))
+
+    _write(write)
+
+    saved = sum(1 for invoice_id, _ in results if invoice_id)
+    logger.info(f"Invoice batch saved: {saved}/{len(invoices)} invoices")
+    return results
+
+
+def get_invoices_after(after_id: int, limit: int) -> List[Dict]:
+    """
+    Faktúry s id > after_id zoradené podľa id (keyset stránkovanie pre backfill)
+
+    Returns:
+        List of dicts: id, file_hash, pdf_path, invoice_number, total_amount
+    """
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute("""
+            SELECT id, file_hash, pdf_path, invoice_number, total_amount
+            FROM invoices
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, limit))
+        rows = [dict(row) for row in cursor.fetchall()]
+    return rows
+
+
+def get_invoices_by_ids(invoice_ids: List[int]) -> List[Dict]:
+    """
+    Faktúry podľa id zoradené podľa id (opakovanie neúspešných v backfille)
+
+    Returns:
+        List of dicts: id, file_hash, pdf_path, invoice_number, total_amount
+    """
+    if not invoice_ids:
+        return []
+
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute(f"""
+            SELECT id, file_hash, pdf_path, invoice_number, total_amount
+            FROM invoices
+            WHERE id IN ({', '.join('?' * len(invoice_ids))})
+            ORDER BY id
+        """, list(invoice_ids))
+        rows = [dict(row) for row in cursor.fetchall()]
+    return rows
+
+
+def get_invoice_hashes() -> List[str]:
+    """Všetky file_hash v databáze (backfill - PDF bez záznamu)"""
+    with _reader() as cursor:
+        cursor.execute("SELECT file_hash FROM invoices")
+        hashes = [row[0] for row in cursor.fetchall()]
+    return hashes
+
+
+def update_extracted_fields(updates: List[Dict]) -> int:
+    """
+    Update re-extracted invoice_number/total_amount in one transaction
+
+    Args:
+        updates: List of dicts with id, invoice_number, total_amount
+                 (None keeps the stored value)
+
+    Returns:
+        Number of updated rows
+    """
+    if not updates:
+        return 0
+
+    def write(cursor):
+        cursor.executemany("""
+            UPDATE invoices SET
+                invoice_number = COALESCE(:invoice_number, invoice_number),
+                total_amount = COALESCE(:total_amount, total_amount)
+            WHERE id = :id
+        """, updates)
+        return cursor.rowcount
+
+    updated = _write(write)
+
+    logger.info(f"Re-extracted fields updated: {updated} invoices")
+    return updated
+
+
+# ============================================================================
+# ASYNC JOBS
+# ============================================================================
+
+def insert_job(job_id: str, payload_path: str, filename: Optional[str] = None,
+               message_id: Optional[str] = None) -> None:
+    """
+    Zaeviduje novú asynchrónnu úlohu (status 'queued')
+
+    Args:
+        job_id: Unique job ID
+        payload_path: Path to persisted request payload
+        filename: Original PDF filename
+        message_id: Email message ID
+    """
+    def write(cursor):
+        cursor.execute("""
+            INSERT INTO invoice_jobs (id, status, payload_path, filename, message_id, created_at)
+            VALUES (?, 'queued', ?, ?, ?, ?)
+        """, (job_id, payload_path, filename, message_id, int(time.time())))
+
+    _write(write)
+
+
+def update_job(job_id: str, status: str, result: Optional[str] = None,
+               error: Optional[str] = None) -> bool:
+    """
+    Update job status
+
+    Args:
+        job_id: Job ID
+        status: 'queued', 'processing', 'done' or 'failed'
+        result: JSON encoded processing result (for 'done')
+        error: Error message (for 'failed')
+
+    Returns:
+        True if updated successfully
+    """
+    now = int(time.time())
+
+    def write(cursor):
+        if status == 'processing':
+            cursor.execute("""
+                UPDATE invoice_jobs SET status = ?, started_at = ?, attempts = attempts + 1
+                WHERE id = ?
+            """, (status, now, job_id))
+        elif status in ('done', 'failed'):
+            cursor.execute("""
+                UPDATE invoice_jobs SET status = ?, finished_at = ?, result = ?, error = ?
+                WHERE id = ?
+            """, (status, now, result, error, job_id))
+        else:
+            cursor.execute("UPDATE invoice_jobs SET status = ? WHERE id = ?", (status, job_id))
+        return cursor.rowcount > 0
+
+    return _write(write)
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    """Vráti úlohu podľa ID"""
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM invoice_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+
+    if row:
+        return dict(row)
+    return None
+
+
+def get_unfinished_jobs() -> List[Dict]:
+    """
+    Get jobs interrupted by restart (queued or processing)
+
+    Returns:
+        List of jobs ordered by creation time
+    """
+    with _reader(sqlite3.Row) as cursor:
+        cursor.execute("""
+            SELECT * FROM invoice_jobs
+            WHERE status IN ('queued', 'processing')
+            ORDER BY created_at ASC
+        """)
+
+        rows = cursor.fetchall()
+
+    return [dict(row) for row in rows]
+
+
 # Backward compatibility - keep old function signatures working
 def get_all_invoices_legacy(limit: int = 100) -> List[Dict]:
     """Legacy function for backward compatibility"""
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - SQLite Schema Migrations
+
+Schema changes are numbered migrations applied once, in order, at
+application startup (database.init_database). Applied versions are
+recorded in the schema_version table, so request handlers never run DDL.
+
+A new schema change = a new function appended to MIGRATIONS; existing
+migrations are never edited. Migration 1 uses IF NOT EXISTS and adopts
+databases created before versioning.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _initial_schema(cursor: sqlite3.Cursor):
+    """invoices + invoice_jobs (schema v2.0)"""
+    # Hlavná tabuľka faktúr - rozšírená o multi-customer polia
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+            -- Customer identification (NEW)
+            customer_name TEXT,
+
+            -- Email metadata
+            message_id TEXT,
+            gmail_id TEXT,
+            sender TEXT,
+            subject TEXT,
+            received_date TEXT,
+
+            -- File info
+            file_hash TEXT UNIQUE NOT NULL,
+            original_filename TEXT,
+            pdf_path TEXT NOT NULL,
+            xml_path TEXT,
+
+            -- Timestamps
+            created_at INTEGER NOT NULL,
+            processed_at INTEGER,
+
+            -- Status
+            status TEXT DEFAULT 'received',
+
+            -- NEX Genesis integration (NEW)
+            nex_genesis_id TEXT,
+            nex_status TEXT DEFAULT 'pending',
+            nex_sync_date TEXT,
+            nex_error_message TEXT,
+
+            -- Extracted data (Fáza 2)
+            invoice_number TEXT,
+            issue_date TEXT,
+            due_date TEXT,
+            total_amount REAL,
+            tax_amount REAL,
+            net_amount REAL,
+            variable_symbol TEXT,
+
+            -- Flags
+            is_duplicate INTEGER DEFAULT 0,
+
+            -- Migration tracking (NEW)
+            migration_version TEXT
+        )
+    """)
+
+    # Indexy pre rýchle vyhľadávanie
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON invoices(file_hash)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_message_id ON invoices(message_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_number ON invoices(invoice_number)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON invoices(status)")
+
+    # New indexes for multi-customer support
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_name ON invoices(customer_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nex_genesis_id ON invoices(nex_genesis_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nex_status ON invoices(nex_status)")
+
+    # Asynchrónne spracovanie - fronta úloh pre POST /invoice?async=true
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS invoice_jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'queued',
+            payload_path TEXT NOT NULL,
+            filename TEXT,
+            message_id TEXT,
+            created_at INTEGER NOT NULL,
+            started_at INTEGER,
+            finished_at INTEGER,
+            attempts INTEGER DEFAULT 0,
+            result TEXT,
+            error TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_status ON invoice_jobs(status)")
+
+
+def rebuild_invoice_counters(cursor: sqlite3.Cursor):
+    """Recount invoice_counters from invoices (initial fill, reconcile)"""
+    cursor.execute("DELETE FROM invoice_counters")
+    cursor.execute("""
+        INSERT INTO invoice_counters (customer_name, status, nex_status, total, duplicates)
+        SELECT IFNULL(customer_name, ''), IFNULL(status, ''), IFNULL(nex_status, ''),
+               COUNT(*), SUM(is_duplicate = 1)
+        FROM invoices
+        GROUP BY 1, 2, 3
+    """)
+
+
+def _invoice_counters(cursor: sqlite3.Cursor):
+    """
+    invoice_counters - počty faktúr podľa customer × status × nex_status
+    pre get_stats(); NULL je uložené ako ''
+
+    Triggers update the counters in the transaction of the invoice write
+    itself (also for scripts writing to invoices directly).
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS invoice_counters (
+            customer_name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            nex_status TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            duplicates INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (customer_name, status, nex_status)
+        )
+    """)
+
+    add_new = """
+        INSERT INTO invoice_counters (customer_name, status, nex_status, total, duplicates)
+        VALUES (IFNULL(NEW.customer_name, ''), IFNULL(NEW.status, ''), IFNULL(NEW.nex_status, ''),
+                1, NEW.is_duplicate = 1)
+        ON CONFLICT (customer_name, status, nex_status) DO UPDATE SET
+            total = total + 1,
+            duplicates = duplicates + excluded.duplicates;
+    """
+    remove_old = """
+        UPDATE invoice_counters SET
+            total = total - 1,
+            duplicates = duplicates - (OLD.is_duplicate = 1)
+        WHERE customer_name = IFNULL(OLD.customer_name, '')
+          AND status = IFNULL(OLD.status, '')
+          AND nex_status = IFNULL(OLD.nex_status, '');
+        DELETE FROM invoice_counters WHERE total <= 0;
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS invoice_counters_insert AFTER INSERT ON invoices
+        BEGIN {add_new} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS invoice_counters_update
+        AFTER UPDATE OF customer_name, status, nex_status, is_duplicate ON invoices
+        BEGIN {remove_old} {add_new} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS invoice_counters_delete AFTER DELETE ON invoices
+        BEGIN {remove_old} END
+    """)
+
+    rebuild_invoice_counters(cursor)
+
+
+# (version, description, migration) - version = position, append only
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "initial schema v2.0", _initial_schema),
+    (2, "invoice_counters for get_stats", _invoice_counters),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration (0 = new or pre-versioning database)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at INTEGER NOT NULL
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply pending migrations, each in its own transaction
+
+    BEGIN IMMEDIATE takes the write lock before the version is re-read,
+    so two processes starting together apply every migration once.
+
+    Returns:
+        Versions applied by this call (empty = schema was current)
+    """
+    applied = []
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return applied
+
+    cursor = conn.cursor()
+    try:
+        for version, description, migration in MIGRATIONS:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                current = cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+                if version <= current:
+                    conn.rollback()
+                    continue
+                migration(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, int(time.time()))
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            applied.append(version)
+            logger.info(f"Database migration {version} applied: {description}")
+    finally:
+        cursor.close()
+    return applied
@@ -5,7 +5,7 @@ Zaevidovanie faktúr do staging databázy pre invoice-editor aplikáciu
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Optional, Any
 from datetime import datetime
 from decimal import Decimal
 
@@ -82,7 +82,7 @@ class PostgresStagingClient:
     def insert_invoice_with_items(
         self,
         invoice_data: Dict[str, Any],
-        items_data: List[Dict[str, Any]],
+        items_data: Iterable[Dict[str, Any]],
         isdoc_xml: Optional[str] = None
     ) -> Optional[int]:
         """
@@ -91,8 +91,9 @@ class PostgresStagingClient:
         Args:
             invoice_data: Dict s údajmi faktúry (supplier_ico, supplier_name,
                          invoice_number, invoice_date, due_date, total_amount, currency)
-            items_data: List Dict s položkami faktúry (line_number, name, quantity,
-                       unit, price_per_unit, ean, vat_rate)
+            items_data: Dict-y s položkami faktúry (line_number, name, quantity,
+                       unit, price_per_unit, ean, vat_rate) - stačí generátor,
+                       položky sa vkladajú priebežne
             isdoc_xml: Voliteľne kompletný ISDOC XML string
 
         Returns:
@@ -141,7 +142,9 @@ class PostgresStagingClient:
             )
 
             # Insert invoice items
+            item_count = 0
             for item in items_data:
+                item_count += 1
                 cursor.execute("""
                     INSERT INTO invoice_items_pending (
                         invoice_id, line_number,
@@ -166,7 +169,7 @@ class PostgresStagingClient:
                     item.get('price_per_unit')   # final_price_buy (bez rabatu)
                 ))
 
-            logger.info(f"Inserted {len(items_data)} invoice items")
+            logger.info(f"Inserted {item_count} invoice items")
 
             # Commit transaction
             self.conn.commit()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - SQLite Write Queue
+
+SQLite allows one writer at a time. Instead of every worker thread
+competing for the write lock and committing on its own, write operations
+are queued to one writer thread, which runs whatever is waiting (up to
+max_batch, optionally collecting for window_ms) in a single transaction
+and commits once. Each operation runs in its own SAVEPOINT - a failing
+operation is rolled back alone and its caller gets the exception.
+
+Callers get a concurrent.futures.Future that resolves after the commit,
+so a completed future means the row is visible to readers.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WriteOperation:
+    """operation(cursor, *args) for database db_file"""
+    db_file: str
+    operation: Callable
+    args: Tuple[Any, ...]
+    future: Future = field(default_factory=Future)
+
+
+class WriteQueue:
+    """
+    Single writer thread with group commit
+
+    connect(db_file) returns the connection of the calling thread
+    (database.get_connection).
+    """
+
+    def __init__(self, connect: Callable[[str], sqlite3.Connection], max_batch: int = 64,
+                 window_ms: float = 0.0, enabled: bool = True):
+        self.connect = connect
+        self.max_batch = max(1, max_batch)
+        self.window_ms = window_ms
+        self.enabled = enabled
+        self._queue: "queue.Queue[Optional[WriteOperation]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.operations = 0
+        self.commits = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        """Start the writer thread if not running (self._lock held)"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"SQLite writer started (max_batch={self.max_batch}, window={self.window_ms} ms)")
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Finish queued operations and stop the writer thread
+
+        The writer clears _thread itself when it exits - until then nested
+        writes of its last batch still run inline and submit() rejects new
+        operations, so there is never a second writer.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            if not self._stopping:
+                self._stopping = True
+                self._queue.put(None)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"SQLite writer did not stop within {timeout} s")
+
+    def submit(self, db_file: str, operation: Callable, *args) -> Future:
+        """
+        Queue operation(cursor, *args); Future resolves to its return value
+        after commit (or to its exception)
+
+        Runs inline when the queue is disabled or when called from the
+        writer thread itself (operation calling another write). While the
+        queue is stopping the Future fails with RuntimeError.
+        """
+        write = WriteOperation(db_file, operation, args)
+        if not self.enabled or threading.current_thread() is self._thread:
+            self._execute([write])
+            return write.future
+
+        # Under the lock - stop() cannot put its sentinel between start and put
+        with self._lock:
+            if self._stopping:
+                write.future.set_exception(RuntimeError("SQLite write queue is stopping"))
+                return write.future
+            self._start()
+            self._queue.put(write)
+        return write.future
+
+    def _run(self):
+        try:
+            while True:
+                first = self._queue.get()
+                if first is None:
+                    return
+                batch = [first]
+                stop = self._collect(batch)
+                self._execute_groups(batch)
+                if stop:
+                    return
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                self._stopping = False
+
+    def _collect(self, batch: List[WriteOperation]) -> bool:
+        """Add waiting operations to batch; True when stop was requested"""
+        deadline = time.monotonic() + self.window_ms / 1000
+        while len(batch) < self.max_batch:
+            try:
+                timeout = deadline - time.monotonic()
+                write = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return False
+            if write is None:
+                return True
+            batch.append(write)
+        return False
+
+    def _execute_groups(self, batch: List[WriteOperation]):
+        # One transaction per database file (tests switch DB_FILE)
+        groups: Dict[str, List[WriteOperation]] = {}
+        for write in batch:
+            groups.setdefault(write.db_file, []).append(write)
+        for writes in groups.values():
+            self._execute(writes)
+
+    def _execute(self, writes: List[WriteOperation]):
+        """
+        Run writes in one transaction, resolve futures after commit
+
+        A nested write (submitted by an operation on the writer thread)
+        runs in a savepoint of the already open transaction.
+        """
+        results: List[Tuple[WriteOperation, bool, Any]] = []
+        nested = False
+        try:
+            conn = self.connect(writes[0].db_file)
+            nested = conn.in_transaction
+            cursor = conn.cursor()
+            if not nested:
+                cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for write in writes:
+                    cursor.execute("SAVEPOINT write_op")
+                    try:
+                        value = write.operation(cursor, *write.args)
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO write_op")
+                        cursor.execute("RELEASE write_op")
+                        results.append((write, False, e))
+                    else:
+                        cursor.execute("RELEASE write_op")
+                        results.append((write, True, value))
+                if not nested:
+                    conn.commit()
+            except BaseException:
+                if not nested:
+                    conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        except Exception as e:
+            # BEGIN or COMMIT failed - nothing of the group was written
+            logger.error(f"SQLite group commit of {len(writes)} writes failed: {e}")
+            self.failed += len(writes)
+            for write in writes:
+                write.future.set_exception(e)
+            return
+
+        if not nested:
+            self.commits += 1
+        self.operations += len(writes)
+        for write, ok, value in results:
+            if ok:
+                write.future.set_result(value)
+            else:
+                self.failed += 1
+                write.future.set_exception(value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'running': self.running,
+            'queued': self._queue.qsize(),
+            'operations': self.operations,
+            'commits': self.commits,
+            'failed': self.failed,
+            'writes_per_commit': round(self.operations / self.commits, 2) if self.commits else 0.0,
+        }
@@ -4,7 +4,7 @@ Base Extractor - Abstract class for all invoice extractors
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from pathlib import Path
 import logging
 
@@ -15,8 +15,16 @@ class BaseExtractor(ABC):
     """
     Abstract base class for invoice extractors
     All supplier-specific extractors must inherit from this
+
+    Fingerprints are used by ExtractorRegistry to pick the extractor from
+    the first page and PDF metadata only (see fingerprint_score).
     """
 
+    # IČO dodávateľa, texty hlavičky prvej strany, Producer/Creator PDF
+    supplier_icos: Tuple[str, ...] = ()
+    header_markers: Tuple[str, ...] = ()
+    producer_markers: Tuple[str, ...] = ()
+
     def __init__(self):
         self.supplier_name = "Unknown"
 
@@ -46,4 +54,46 @@ class BaseExtractor(ABC):
             logger.error(f"File is not PDF: {pdf_path}")
             return False
 
-        return True
\ No newline at end of file
+        return True
+
+    def fingerprint_score(self, first_page: str, metadata: Dict[str, Any]) -> int:
+        """
+        How well the first page / PDF metadata match this supplier
+
+        Texts are compared without whitespace and case (pdfplumber often
+        splits digits and letters by spaces).
+
+        Returns:
+            0 = no match, IČO 4 + header marker 2 + producer 1
+        """
+        compact = "".join(first_page.split()).lower()
+        producer = " ".join(str(metadata.get(key) or "") for key in ("Producer", "Creator")).lower()
+
+        score = 0
+        if any(ico in compact for ico in self.supplier_icos):
+            score += 4
+        if any("".join(marker.split()).lower() in compact for marker in self.header_markers):
+            score += 2
+        if any(marker.lower() in producer for marker in self.producer_markers):
+            score += 1
+        return score
+
+    def extract(self, pdf_path: str, file_hash: Optional[str] = None, first_page: Optional[str] = None):
+        """
+        Extract invoice data (entry point used by ExtractorRegistry)
+
+        first_page is the page 1 text the registry read for routing -
+        extractors working on page text use it instead of laying out
+        page 1 again. Override to add caching / process pool dispatch.
+        """
+        return self.extract_from_pdf(pdf_path)
+
+    def extract_header(self, pdf_path: str, file_hash: Optional[str] = None,
+                       required_fields: Tuple[str, ...] = (), first_page: Optional[str] = None):
+        """
+        Extract at least required_fields of the header (items may be empty)
+
+        Default is a full extraction - override when the supplier format
+        allows stopping early.
+        """
+        return self.extract(pdf_path, file_hash, first_page)
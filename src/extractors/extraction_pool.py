@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - PDF Extraction Process Pool
+
+pdfplumber/pdfminer layout analysis is pure Python and holds the GIL, so
+extraction in worker threads uses one core in total. Extraction runs in
+a pool of worker processes instead; pdfplumber is imported once per
+process and workers are recycled after EXTRACTION_MAX_TASKS_PER_CHILD
+PDFs to cap pdfminer memory growth.
+
+Long invoices (EXTRACTION_PAGE_PARALLEL_MIN_PAGES and more) are split
+into tasks of EXTRACTION_PAGES_PER_TASK pages. The calling thread parses
+items of finished pages while later pages are still being extracted.
+
+EXTRACTION_PROCESSES = 0 disables the pool (extraction in calling thread).
+"""
+
+import logging
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils import config
+from src.extractors.text_cache import file_md5, text_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_worker():
+    """Process initializer - import pdfplumber and extractor once"""
+    import pdfplumber  # noqa: F401
+    from src.extractors import ls_extractor  # noqa: F401
+
+
+def _ping() -> bool:
+    return True
+
+
+def _extract_in_worker(pdf_path: str, file_hash: Optional[str], mode: str, required_fields: Tuple[str, ...],
+                       first_page: Optional[str]):
+    from src.extractors.ls_extractor import extract_invoice_data_local
+    return extract_invoice_data_local(pdf_path, file_hash, mode, required_fields, first_page)
+
+
+def _count_pages_in_worker(pdf_path: str) -> int:
+    from src.extractors.ls_extractor import count_pages
+    return count_pages(pdf_path)
+
+
+def _extract_pages_in_worker(pdf_path: str, page_numbers: List[int], first_page: Optional[str]) -> List[str]:
+    from src.extractors.ls_extractor import iter_page_texts
+    return list(iter_page_texts(pdf_path, page_numbers, first_page))
+
+
+class ExtractionPool:
+    """
+    Persistent pool of warm extraction processes
+    """
+
+    def __init__(self, processes: int, max_tasks_per_child: int):
+        self.processes = max(0, processes)
+        self.max_tasks_per_child = max_tasks_per_child if max_tasks_per_child > 0 else None
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks = 0
+        self._restarts = 0
+        self._page_parallel = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create executor lazily (also after shutdown or crash)"""
+        with self._lock:
+            if self._executor is None:
+                kwargs = {}
+                # max_tasks_per_child is available since Python 3.11
+                # (requires spawn start method - default then)
+                if self.max_tasks_per_child and sys.version_info >= (3, 11):
+                    kwargs['max_tasks_per_child'] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    initializer=_warm_worker,
+                    **kwargs
+                )
+            return self._executor
+
+    def start(self):
+        """Start and warm up worker processes (optional - pool starts on first use)"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for _ in range(self.processes):
+            executor.submit(_ping)
+        logger.info(f"Extraction pool started with {self.processes} processes")
+
+    def extract(
+            self,
+            pdf_path: str,
+            file_hash: Optional[str] = None,
+            mode: str = "full",
+            required_fields: Tuple[str, ...] = ("supplier_ico", "invoice_number"),
+            first_page: Optional[str] = None
+    ):
+        """
+        Extract invoice data in a worker process
+
+        PDFs with cached page texts are handled in the calling thread
+        (regex only, no pdfplumber). Only mode "full" is split page-parallel;
+        "header_only" stops reading pages once required_fields are found.
+        first_page (page 1 text read for routing) is not laid out again.
+
+        Returns:
+            InvoiceData or None (same as LSInvoiceExtractor.extract_from_pdf)
+        """
+        from src.extractors.ls_extractor import extract_invoice_data_local
+
+        if text_cache.enabled:
+            try:
+                file_hash = file_hash or file_md5(pdf_path)
+            except OSError:
+                # Unreadable PDF - extraction reports the error
+                file_hash = None
+            if file_hash and text_cache.contains(file_hash):
+                return extract_invoice_data_local(pdf_path, file_hash, mode, required_fields, first_page)
+
+        min_pages = config.EXTRACTION_PAGE_PARALLEL_MIN_PAGES
+        if mode == "full" and self.processes > 1 and min_pages > 0:
+            try:
+                pages = self.run(_count_pages_in_worker, pdf_path)
+            except Exception as e:
+                # Invalid PDF - normal extraction logs the error
+                logger.debug(f"Page count failed for {pdf_path}: {e}")
+                pages = 0
+
+            if pages >= min_pages:
+                return self._extract_page_parallel(pdf_path, pages, file_hash, first_page)
+
+        return self.run(_extract_in_worker, pdf_path, file_hash, mode, required_fields, first_page)
+
+    def _extract_page_parallel(self, pdf_path: str, pages: int, file_hash: Optional[str], first_page: Optional[str]):
+        """Extract page ranges in parallel, parse them in page order"""
+        from src.extractors.ls_extractor import extract_invoice_data_local, get_extractor, record_pages
+
+        executor = self._get_executor()
+        per_task = max(1, config.EXTRACTION_PAGES_PER_TASK)
+        futures = [
+            executor.submit(
+                _extract_pages_in_worker,
+                pdf_path,
+                list(range(first + 1, min(first + per_task, pages) + 1)),
+                first_page if first == 0 else None
+            )
+            for first in range(0, pages, per_task)
+        ]
+        with self._lock:
+            self._tasks += len(futures)
+            self._page_parallel += 1
+
+        def page_texts():
+            for future in futures:
+                yield from future.result()
+
+        logger.info(f"Extracting {pages} pages of {pdf_path} in {len(futures)} tasks")
+        try:
+            page_list = []
+            invoice_data = get_extractor().extract_from_pages(record_pages(page_texts(), page_list))
+            if file_hash:
+                text_cache.put(file_hash, page_list)
+            return invoice_data
+
+        except BrokenProcessPool as e:
+            logger.error(f"Extraction process pool broken, restarting: {e}")
+            self._reset(executor)
+            return extract_invoice_data_local(pdf_path, file_hash, first_page=first_page)
+
+        except Exception as e:
+            logger.error(f"Error extracting from PDF: {e}", exc_info=True)
+            return None
+
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Run module-level fn in a worker process (in-process if the pool broke)"""
+        executor = self._get_executor()
+        with self._lock:
+            self._tasks += 1
+
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool as e:
+            # Worker died (e.g. killed by OOM) - recreate pool on next call
+            logger.error(f"Extraction process pool broken, restarting: {e}")
+            self._reset(executor)
+            return fn(*args)
+
+    def _reset(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._restarts += 1
+        executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'processes': self.processes,
+            'max_tasks_per_child': self.max_tasks_per_child,
+            'running': self._executor is not None,
+            'tasks_total': self._tasks,
+            'page_parallel_total': self._page_parallel,
+            'restarts': self._restarts
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop worker processes; pool is recreated on next extract"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info("Shutting down extraction process pool")
+            executor.shutdown(wait=wait)
+
+
+# Global extraction pool
+extraction_pool = ExtractionPool(config.EXTRACTION_PROCESSES, config.EXTRACTION_MAX_TASKS_PER_CHILD)
@@ -1,14 +1,56 @@
 # -*- coding: utf-8 -*-
 """
 Generic Extractor - For standard invoice formats
+
+Header fields via flexible SK/CZ/EN label patterns, item table via
+layout analysis of word coordinates (layout.py) - no supplier template.
+Layout analysis time per page is checked against
+config.GENERIC_LAYOUT_MAX_MS_PER_PAGE (warning in log when exceeded).
 """
 
+import re
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional
+
+from src.utils import config
 from .base_extractor import BaseExtractor
+from .layout import Line, detect_table, group_lines, parse_amount, table_rows
 
 logger = logging.getLogger(__name__)
 
+_DATE = r'(\d{1,2}\s*[./]\s*\d{1,2}\s*[./]\s*\d{4}|\d{4}-\d{2}-\d{2})'
+_AMOUNT = r'(-?\d+(?:[ \xa0]\d{3})*(?:[.,]\d+)*)'
+
+# Pole -> pattern (prvý výskyt v texte), case-insensitive
+GENERIC_PATTERNS = {
+    'invoice_number': re.compile(
+        r'(?:faktúra|faktura|invoice|daňový\s+doklad)[^\n\d]*?(?:č\.|číslo|no\.?|number|#)?\s*:?\s*([A-Z]{0,4}[-/]?\d[A-Z0-9/-]{2,})',
+        re.IGNORECASE),
+    'issue_date': re.compile(r'(?:dátum\s+vystavenia|datum\s+vystaven[ií]|issue\s+date|invoice\s+date)[^\d\n]*' + _DATE,
+                             re.IGNORECASE),
+    'due_date': re.compile(r'(?:dátum\s+splatnosti|datum\s+splatnosti|splatnosť|due\s+date)[^\d\n]*' + _DATE,
+                           re.IGNORECASE),
+    'tax_point_date': re.compile(r'(?:dátum\s+daňovej\s+povinnosti|DUZP|tax\s+point)[^\d\n]*' + _DATE,
+                                 re.IGNORECASE),
+    'total_amount': re.compile(
+        r'(?:celkom\s+k\s+úhrade|spolu\s+k\s+úhrade|celkem\s+k\s+úhradě|k\s+úhrade|total\s+due|amount\s+due)[^\d\n]*' + _AMOUNT,
+        re.IGNORECASE),
+    'supplier_ico': re.compile(r'IČO?\s*:?\s*(\d{8})\b', re.IGNORECASE),
+    'supplier_dic': re.compile(r'DIČ\s*:?\s*(\d{10})\b', re.IGNORECASE),
+    'supplier_icdph': re.compile(r'IČ\s*DPH\s*:?\s*([A-Z]{2}\d{8,10})\b', re.IGNORECASE),
+    'iban': re.compile(r'IBAN\s*:?\s*([A-Z]{2}\d{2}(?:\s?[A-Z0-9]{4}){3,7})', re.IGNORECASE),
+    'variable_symbol': re.compile(r'(?:variabilný\s+symbol|variabilní\s+symbol|VS)\s*:?\s*(\d{1,10})\b',
+                                  re.IGNORECASE),
+}
+
+_ITEM_FIELDS = ('quantity', 'unit_price_no_vat', 'unit_price_with_vat', 'total_with_vat', 'vat_rate',
+                'discount_percent')
+
+
+def _extract_in_worker(pdf_path: str):
+    return GenericExtractor().extract_from_pdf(pdf_path)
+
 
 class GenericExtractor(BaseExtractor):
     """
@@ -20,16 +62,22 @@ class GenericExtractor(BaseExtractor):
         super().__init__()
         self.supplier_name = "Generic"
 
+    def extract(self, pdf_path: str, file_hash: Optional[str] = None, first_page: Optional[str] = None):
+        """
+        Extraction in extraction_pool (if enabled) - pdfplumber holds the GIL
+
+        first_page (routing text) is not used - layout needs word positions.
+        """
+        from src.extractors.extraction_pool import extraction_pool
+
+        if extraction_pool.enabled:
+            return extraction_pool.run(_extract_in_worker, pdf_path)
+        return self.extract_from_pdf(pdf_path)
+
     def extract_from_pdf(self, pdf_path: str):
         """
         Extract invoice data from standard PDF format
 
-        TODO: Implement generic extraction logic
-        - Detect common patterns (Invoice Number:, Date:, Total:)
-        - Extract using flexible regex patterns
-        - Handle multiple date formats
-        - Parse simple item tables
-
         Args:
             pdf_path: Path to PDF file
 
@@ -39,14 +87,87 @@ class GenericExtractor(BaseExtractor):
         if not self.validate_pdf(pdf_path):
             return None
 
-        logger.warning(f"Generic extractor not yet implemented for: {pdf_path}")
+        try:
+            import pdfplumber
+
+            logger.info(f"Generic extraction from: {pdf_path}")
+            lines: List[Line] = []
+            layout_seconds = 0.0
+            with pdfplumber.open(pdf_path) as pdf:
+                pages = len(pdf.pages)
+                for page in pdf.pages:
+                    words = page.extract_words()
+                    started = time.perf_counter()
+                    lines.extend(group_lines(words))
+                    layout_seconds += time.perf_counter() - started
+                    page.close()
+
+            if not lines:
+                logger.error("No text extracted from PDF")
+                return None
+
+            invoice_data = self.extract_from_lines(lines)
+            invoice_data.page_count = pages
+
+            per_page_ms = layout_seconds * 1000 / max(pages, 1)
+            if per_page_ms > config.GENERIC_LAYOUT_MAX_MS_PER_PAGE:
+                logger.warning(f"Generic layout analysis slow: {per_page_ms:.1f} ms/page ({pdf_path})")
+            return invoice_data
+
+        except Exception as e:
+            logger.error(f"Error extracting from PDF: {e}", exc_info=True)
+            return None
+
+    def extract_from_lines(self, lines: List[Line]):
+        """InvoiceData z riadkov všetkých strán (group_lines)"""
+        from src.extractors.ls_extractor import InvoiceData, InvoiceItem
+
+        text = "\n".join(line.text for line in lines)
+        values = self._extract_header_values(text)
+
+        invoice_data = InvoiceData(
+            invoice_number=values.get('invoice_number', ""),
+            issue_date=values.get('issue_date', ""),
+            due_date=values.get('due_date', ""),
+            tax_point_date=values.get('tax_point_date', ""),
+            total_amount=parse_amount(values.get('total_amount')),
+            supplier_ico=values.get('supplier_ico', ""),
+            supplier_dic=values.get('supplier_dic', ""),
+            supplier_icdph=values.get('supplier_icdph', "").upper(),
+            iban=values.get('iban', "").replace(" ", "").upper(),
+            variable_symbol=values.get('variable_symbol', "")
+        )
+
+        table = detect_table(lines)
+        if table is None:
+            logger.warning("Item table not found")
+        else:
+            for number, row in enumerate(table_rows(table, lines), 1):
+                invoice_data.items.append(InvoiceItem(
+                    line_number=number,
+                    item_code=row['item_code'],
+                    description=row['description'],
+                    unit=row['unit'],
+                    **{name: row.get(name) for name in _ITEM_FIELDS}
+                ))
+
+        logger.info(f"Extracted: {invoice_data.invoice_number}, {len(invoice_data.items)} items")
+        return invoice_data
 
-        # TODO: Implement extraction
-        return None
+    def _extract_header_values(self, text: str) -> Dict[str, Any]:
+        values = {}
+        for name, pattern in GENERIC_PATTERNS.items():
+            match = pattern.search(text)
+            if match:
+                values[name] = match.group(1).strip()
+        for name in ('issue_date', 'due_date', 'tax_point_date'):
+            if name in values:
+                values[name] = re.sub(r'\s+', '', values[name]).replace('/', '.')
+        return values
 
 
 # Helper function for compatibility
 def extract_invoice_data(pdf_path: str):
     """Wrapper function for generic extraction"""
     extractor = GenericExtractor()
-    return extractor.extract_from_pdf(pdf_path)
\ No newline at end of file
+    return extractor.extract_from_pdf(pdf_path)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Columnar Invoice Items
+
+Compact storage for large invoices and batch backfills. Instead of one
+InvoiceItem object (plus 7 Decimal objects) per row, every field is one
+column: line numbers in an int array, decimals as int64 coefficient +
+exponent arrays, texts in lists.
+
+Conversion to the dataclass API:
+    columns = ItemColumns(invoice_data.items)   # InvoiceItem -> columns
+    columns[0], list(columns)                   # columns -> InvoiceItem
+    columns.to_items()                          # List[InvoiceItem]
+
+LSInvoiceExtractor.extract_from_pages stores parsed items as ItemColumns
+in InvoiceData.items - ISDOC generation and the PostgreSQL staging insert
+only iterate items and call len().
+"""
+
+import sys
+from array import array
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.extractors.ls_extractor import InvoiceItem
+
+TEXT_FIELDS = ('item_code', 'ean_code', 'description', 'unit')
+DECIMAL_FIELDS = (
+    'quantity', 'unit_price_no_vat', 'unit_price_with_vat',
+    'total_with_vat', 'vat_rate', 'discount_percent'
+)
+
+# Exponent markers (valid exponents of invoice values are far from these)
+_NONE = -128
+_BIG = -127
+
+
+class ItemColumns:
+    """
+    Stĺpcové uloženie položiek faktúry
+    """
+
+    __slots__ = ('line_numbers', '_texts', '_coefficients', '_exponents', '_big')
+
+    def __init__(self, items: Iterable[InvoiceItem] = ()):
+        self.line_numbers = array('l')
+        self._texts: Dict[str, List[str]] = {name: [] for name in TEXT_FIELDS}
+        self._coefficients = {name: array('q') for name in DECIMAL_FIELDS}
+        self._exponents = {name: array('b') for name in DECIMAL_FIELDS}
+        # Hodnoty mimo int64/exponent rozsahu: (pole, index) -> Decimal
+        self._big: Dict[Tuple[str, int], Decimal] = {}
+        self.extend(items)
+
+    def append(self, item: InvoiceItem):
+        index = len(self.line_numbers)
+        self.line_numbers.append(item.line_number)
+
+        for name in TEXT_FIELDS:
+            value = getattr(item, name)
+            # Jednotky sa opakujú - zdieľaj jeden string
+            self._texts[name].append(sys.intern(value) if name == 'unit' else value)
+
+        for name in DECIMAL_FIELDS:
+            coefficient, exponent = _pack(getattr(item, name))
+            if exponent == _BIG:
+                self._big[(name, index)] = getattr(item, name)
+            self._coefficients[name].append(coefficient)
+            self._exponents[name].append(exponent)
+
+    def extend(self, items: Iterable[InvoiceItem]):
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self.line_numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("item index out of range")
+
+        values = {name: self._texts[name][index] for name in TEXT_FIELDS}
+        for name in DECIMAL_FIELDS:
+            values[name] = self._decimal(name, index)
+        return InvoiceItem(line_number=self.line_numbers[index], **values)
+
+    def __iter__(self) -> Iterator[InvoiceItem]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ItemColumns, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def column(self, name: str) -> list:
+        """Všetky hodnoty jedného poľa (bez tvorby InvoiceItem)"""
+        if name == 'line_number':
+            return list(self.line_numbers)
+        if name in self._texts:
+            return list(self._texts[name])
+        if name in self._coefficients:
+            return [self._decimal(name, index) for index in range(len(self))]
+        raise KeyError(name)
+
+    def to_items(self) -> List[InvoiceItem]:
+        return list(self)
+
+    def _decimal(self, name: str, index: int) -> Optional[Decimal]:
+        exponent = self._exponents[name][index]
+        if exponent == _NONE:
+            return None
+        if exponent == _BIG:
+            return self._big[(name, index)]
+        return Decimal(self._coefficients[name][index]).scaleb(exponent)
+
+
+def _pack(value: Optional[Decimal]) -> Tuple[int, int]:
+    """Decimal -> (koeficient, exponent); Decimal(coef).scaleb(exp) == value vrátane núl"""
+    if value is None:
+        return 0, _NONE
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int) or not _BIG < exponent < 128:
+        return 0, _BIG
+    coefficient = int(value.scaleb(-exponent))
+    if not -2 ** 63 <= coefficient < 2 ** 63:
+        return 0, _BIG
+    return coefficient, exponent
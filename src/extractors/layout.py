@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Layout Analysis
+
+Supplier-independent table detection from pdfplumber word coordinates
+(page.extract_words(): text, x0, x1, top, bottom).
+
+Words are grouped into lines by top coordinate, numbers are clustered
+into columns by their right edge (amounts are right-aligned) in one
+sorted pass over all edges, and the item table is the longest block of
+lines whose numbers sit in the same columns. Everything is O(n log n)
+in the number of words - no per-line regex templates.
+"""
+
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+Word = Dict[str, Any]
+
+_NUMBER = re.compile(r'^[-+]?\d+(?:[.,]\d+)*%?$')
+_THOUSANDS_TAIL = re.compile(r'^\d{3}(?:[.,]\d+)?%?$')
+_UNITS = {'ks', 'kus', 'l', 'm', 'm2', 'm3', 'kg', 'g', 't', 'bal', 'h', 'hod', 'pc', 'pcs', 'set'}
+
+# Kľúčové slová hlavičky tabuľky -> pole položky (poradie = priorita)
+_COLUMN_LABELS = [
+    ('vat_rate', ('sadzba', 'dph%', '%dph', 'vat%')),
+    ('discount_percent', ('zľava', 'zlava', 'rabat', 'discount')),
+    ('total_with_vat', ('spolu', 'celkom', 'total', 'suma', 'amount')),
+    ('unit_price_no_vat', ('cena', 'price', 'j.c')),
+    ('quantity', ('množ', 'mnoz', 'počet', 'pocet', 'qty', 'quantity')),
+]
+
+
+@dataclass(slots=True)
+class Line:
+    """Riadok textu - slová zoradené zľava"""
+    top: float
+    bottom: float
+    words: List[Word] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " ".join(word['text'] for word in self.words)
+
+
+@dataclass(slots=True)
+class Column:
+    """Stĺpec čísel - rozsah pravých okrajov"""
+    x_min: float
+    x_max: float
+    support: int
+    name: str = ""
+
+    def contains(self, x: float, tolerance: float) -> bool:
+        return self.x_min - tolerance <= x <= self.x_max + tolerance
+
+
+@dataclass(slots=True)
+class Table:
+    """Nájdená tabuľka položiek"""
+    columns: List[Column]
+    rows: List[int]
+    header: Optional[int] = None
+
+
+def is_number(text: str) -> bool:
+    return bool(_NUMBER.match(text))
+
+
+def parse_amount(text: Optional[str]) -> Optional[Decimal]:
+    """
+    Číslo v slovenskom aj anglickom formáte: 1 234,56 / 1,234.56 / 1.234,56 / 12%
+    """
+    if not text:
+        return None
+    value = text.replace('%', '').replace(' ', '').replace('\xa0', '')
+    if ',' in value and '.' in value:
+        # Desatinný oddeľovač je posledný
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        value = value.replace(',', '.')
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def group_lines(words: List[Word], tolerance: float = 3.0) -> List[Line]:
+    """Zoskupí slová do riadkov podľa top (jeden sort)"""
+    lines: List[Line] = []
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if lines and word['top'] - lines[-1].top <= tolerance:
+            line = lines[-1]
+            line.words.append(word)
+            line.bottom = max(line.bottom, word['bottom'])
+        else:
+            lines.append(Line(top=word['top'], bottom=word['bottom'], words=[word]))
+
+    for line in lines:
+        line.words.sort(key=lambda w: w['x0'])
+        line.words = merge_number_words(line.words)
+    return lines
+
+
+def merge_number_words(words: List[Word]) -> List[Word]:
+    """Spojí čísla rozdelené medzerou ako oddeľovačom tisícov (1 234,56)"""
+    merged: List[Word] = []
+    for word in words:
+        previous = merged[-1] if merged else None
+        if (previous is not None
+                and previous['text'].lstrip('-+').isdigit() and len(previous['text'].lstrip('-+')) <= 3
+                and _THOUSANDS_TAIL.match(word['text'])
+                # Medzera užšia ako pol výšky písma = oddeľovač tisícov
+                and word['x0'] - previous['x1'] < 0.5 * (word['bottom'] - word['top'])):
+            merged[-1] = dict(previous, text=previous['text'] + word['text'], x1=word['x1'])
+        else:
+            merged.append(word)
+    return merged
+
+
+def cluster_columns(edges: List[float], gap: float) -> List[Column]:
+    """Rozdelí zoradené pravé okraje na stĺpce tam, kde je medzera > gap"""
+    columns: List[Column] = []
+    for x in sorted(edges):
+        if columns and x - columns[-1].x_max <= gap:
+            columns[-1].x_max = x
+            columns[-1].support += 1
+        else:
+            columns.append(Column(x_min=x, x_max=x, support=1))
+    return columns
+
+
+def _numbers(line: Line) -> List[Word]:
+    return [word for word in line.words if is_number(word['text'])]
+
+
+def _amounts(line: Line) -> List[Word]:
+    """Čísla za prvým textovým slovom (poradové číslo / kód pred názvom sa nepočíta)"""
+    for position, word in enumerate(line.words):
+        if not is_number(word['text']):
+            return [w for w in line.words[position + 1:] if is_number(w['text'])]
+    return []
+
+
+def _aligned(line: Line, columns: List[Column], tolerance: float) -> int:
+    return sum(
+        1 for word in _amounts(line)
+        if any(column.contains(word['x1'], tolerance) for column in columns)
+    )
+
+
+def detect_table(
+        lines: List[Line],
+        gap: float = 4.0,
+        min_rows: int = 2,
+        max_skip: int = 2
+) -> Optional[Table]:
+    """
+    Nájde tabuľku položiek
+
+    Kandidát = riadok s aspoň 2 číslami za textom. Stĺpce sú zhluky pravých
+    okrajov čísel, ktoré má aspoň polovica kandidátov. Tabuľka je najdlhší
+    blok riadkov s aspoň 2 zarovnanými číslami; medzi nimi môže byť
+    max_skip iných riadkov (kód/EAN na druhom riadku položky).
+    """
+    candidates = [index for index, line in enumerate(lines) if len(_amounts(line)) >= 2]
+    if len(candidates) < min_rows:
+        return None
+
+    edges = [word['x1'] for index in candidates for word in _amounts(lines[index])]
+    threshold = max(min_rows, len(candidates) // 2)
+    columns = [column for column in cluster_columns(edges, gap) if column.support >= threshold]
+    if len(columns) < 2:
+        return None
+
+    rows = [index for index in candidates if _aligned(lines[index], columns, gap) >= 2]
+    best_start, best_end, start = 0, 0, 0
+    for position in range(1, len(rows) + 1):
+        # Koniec bloku = koniec zoznamu alebo príliš veľa riadkov medzi
+        if position == len(rows) or rows[position] - rows[position - 1] > max_skip + 1:
+            if position - start > best_end - best_start:
+                best_start, best_end = start, position
+            start = position
+    best = rows[best_start:best_end]
+
+    if len(best) < min_rows:
+        return None
+
+    table = Table(columns=columns, rows=best)
+    table.header = _find_header(lines, best[0])
+    assign_column_fields(table, lines)
+    return table
+
+
+def _find_header(lines: List[Line], first_row: int, lookback: int = 3) -> Optional[int]:
+    """Riadok hlavičky tesne nad tabuľkou (prevažne text)"""
+    for index in range(first_row - 1, max(-1, first_row - 1 - lookback), -1):
+        words = lines[index].words
+        if len(words) >= 2 and len(_numbers(lines[index])) * 2 < len(words):
+            return index
+    return None
+
+
+def assign_column_fields(table: Table, lines: List[Line]):
+    """Priradí stĺpcom polia podľa hlavičky, inak podľa poradia"""
+    columns = table.columns
+
+    if table.header is not None:
+        labels = {id(column): [] for column in columns}
+        for word in lines[table.header].words:
+            center = (word['x0'] + word['x1']) / 2
+            # Hlavička patrí najbližšiemu stĺpcu vpravo od stredu slova
+            right = [column for column in columns if column.x_max >= center]
+            if right:
+                labels[id(min(right, key=lambda c: c.x_max))].append(word['text'].lower())
+        used = set()
+        for column in columns:
+            label = "".join(labels[id(column)])
+            for name, keywords in _COLUMN_LABELS:
+                if name not in used and any(keyword in label for keyword in keywords):
+                    column.name = name
+                    used.add(name)
+                    break
+
+    if not any(column.name for column in columns):
+        # Bez hlavičky: množstvo vľavo, celkom vpravo, jednotková cena pred ním
+        columns[0].name = 'quantity'
+        columns[-1].name = 'total_with_vat'
+        if len(columns) >= 3:
+            columns[-2].name = 'unit_price_no_vat'
+
+
+def table_rows(table: Table, lines: List[Line], gap: float = 4.0) -> List[Dict[str, Any]]:
+    """
+    Hodnoty riadkov tabuľky: item_code, description, unit + polia stĺpcov
+    """
+    rows = []
+    for index in table.rows:
+        row: Dict[str, Any] = {'item_code': "", 'description': "", 'unit': ""}
+        text_words = []
+        for word in lines[index].words:
+            text = word['text']
+            if not text_words and is_number(text):
+                # Poradové číslo / kód tovaru pred názvom
+                row['item_code'] = row['item_code'] or text
+                continue
+            column = next((c for c in table.columns if is_number(text) and c.contains(word['x1'], gap)), None)
+            if column is not None:
+                if column.name and column.name not in row:
+                    row[column.name] = parse_amount(text)
+            elif text.lower().rstrip('.') in _UNITS:
+                row['unit'] = text
+            elif not is_number(text):
+                text_words.append(text)
+        row['description'] = " ".join(text_words)
+        rows.append(row)
+    return rows
@@ -6,16 +6,19 @@ Extracts invoice data from L&Š PDF invoices
 
 import re
 import logging
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator
 from dataclasses import dataclass, field
 from decimal import Decimal
 
+from src.extractors.base_extractor import BaseExtractor
+from src.extractors.text_cache import file_md5, text_cache
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceItem:
-    """Jedna položka na faktúre"""
+    """Jedna položka na faktúre (slots - bez __dict__ na položku)"""
     line_number: int
     item_code: str = ""
     ean_code: str = ""
@@ -29,9 +32,14 @@ class InvoiceItem:
     discount_percent: Optional[Decimal] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceData:
-    """Kompletné dáta z faktúry"""
+    """
+    Kompletné dáta z faktúry
+
+    items je po extrakcii z PDF ItemColumns (item_columns.py) - stĺpcová
+    forma, iteruje a indexuje sa rovnako ako zoznam InvoiceItem.
+    """
     # Hlavička
     invoice_number: str = ""
     issue_date: str = ""
@@ -68,138 +76,566 @@ class InvoiceData:
     # Položky
     items: List[InvoiceItem] = field(default_factory=list)
 
+    # Počet spracovaných strán PDF (monitoring)
+    page_count: int = 0
+
+
+# Hlavičkové polia: (pole, kľúčové slovo, pattern)
+# Pattern musí začínať svojím kľúčovým slovom (malými písmenami) - skúša sa
+# len na pozíciách, kde sa toto slovo nachádza (dispatch index namiesto
+# re.search každého patternu cez celý text)
+_HEADER_FIELDS: List[Tuple[str, str, str]] = [
+    # Hlavička - s medzerami medzi číslicami
+    ('invoice_number', 'faktúra', r'FAKTÚRA[^\d]*?(\d+)'),
+    ('issue_date', 'dátum', r'Dátum\s+vystavenia[:\s]*(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)'),
+    ('due_date', 'dátum', r'Dátum\s+splatnosti[^\d]*?(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)'),
+    ('tax_point_date', 'dátum', r'Dátum\s+daňovej\s+povinnosti[:\s]*(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)'),
+
+    # Sumy - presnejšie patterns pre oba formáty
+    ('net_amount', 'základ', r'Základ\s+DPH\s+([\d\s]+\.\s*[\d\s]+)\s*E\s*U\s*R'),
+    ('tax_amount', 'dph', r'^DPH\s+([\d\s]+\.\s*[\d\s]+)\s*E\s*U\s*R'),
+    ('total_amount', 'celkom', r'Celkom\s+k\s+úhrade\s+([\d\s]+\.[\d\s]+)\s*EUR'),
+
+    # Dodávateľ (L&Š) - supplier_name je v _SUPPLIER_NAME_PATTERN
+    ('supplier_ico', 'ičo', r'IČO:\s*(\d{8})'),
+    ('supplier_dic', 'dič', r'DIČ:\s*(\d{10})'),
+    ('supplier_icdph', 'ič', r'IČ\s+DPH:\s*(SK\d{10})'),
+
+    # Odberateľ - customer_name je v _CUSTOMER_NAME_PATTERN
+    ('customer_ico', 'ičo', r'IČO\s+odberateľ:\s*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)'),
+    ('customer_dic', 'dič', r'DIČ\s+odberateľ:\s*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)'),
+    ('customer_icdph', 'ičdph', r'IČDPH\s+odberateľ:\s*(S\s*K\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)'),
+
+    # Bankové údaje - s medzerami
+    ('iban', 'iban', r'IBAN[:\s]*(SK\s*\d\s*\d[\d\s]{20,})'),
+    ('bic', 'bic', r'BIC[:\s]*([A-Z]{6,11})'),
+    ('variable_symbol', 'variabilný', r'Variabilný\s+symbol[:\s]*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)'),
+    ('constant_symbol', 'konštantný', r'Konštantný\s+symbol[:\s]*(\d\s*\d\s*\d\s*\d)'),
+]
+
+_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Patterns bez pevného kľúčového slova na začiatku - klasický search
+_SUPPLIER_NAME_PATTERN = re.compile(r'L\s*&\s*Š,\s*s\.r\.o\.', _FLAGS)
+# Odberateľ - nájdeme riadok pred IČO odberateľ
+_CUSTOMER_NAME_PATTERN = re.compile(r'([A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ][^\n]{5,})\s*\n[^\n]*IČO\s+odberateľ', _FLAGS)
+_CUSTOMER_ANCHOR = re.compile(r'IČO\s+odberateľ', _FLAGS)
+
+# Skompilované raz pri importe modulu
+HEADER_PATTERNS: Dict[str, "re.Pattern"] = {
+    name: re.compile(pattern, _FLAGS) for name, _, pattern in _HEADER_FIELDS
+}
+HEADER_PATTERNS['supplier_name'] = _SUPPLIER_NAME_PATTERN
+HEADER_PATTERNS['customer_name'] = _CUSTOMER_NAME_PATTERN
+
+# kľúčové slovo -> [(pole, pattern)]
+_DISPATCH: Dict[str, List[Tuple[str, "re.Pattern"]]] = {}
+for _name, _keyword, _ in _HEADER_FIELDS:
+    _DISPATCH.setdefault(_keyword, []).append((_name, HEADER_PATTERNS[_name]))
+
+_WHITESPACE = re.compile(r'\s+')
+_CUSTOMER_PREFIX = re.compile(r'^.*?(?:Prepravca|Vozidlo|Štát)[^\n]*')
+_CUSTOMER_INITIALS = re.compile(r'^[A-Z]{1,2}\s+')
+_CUSTOMER_SPACED = re.compile(r'([A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ])\s+(?=[A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ])')
+
+_DATE_FIELDS = ('issue_date', 'due_date', 'tax_point_date')
+_AMOUNT_FIELDS = ('net_amount', 'tax_amount', 'total_amount')
+_SPACED_FIELDS = ('customer_ico', 'customer_dic', 'variable_symbol', 'constant_symbol', 'customer_icdph', 'iban')
+
+
+def _match_value(match) -> str:
+    return (match.group(1) if match.lastindex else match.group(0)).strip()
+
+
+def scan_header_fields(text: str) -> Dict[str, str]:
+    """
+    Nájde všetky hlavičkové polia
+
+    Výsledok je rovnaký ako prvý re.search pre každý pattern. Kľúčové slová
+    sa hľadajú cez str.find v texte s malými písmenami (re s IGNORECASE
+    nevie rýchlo hľadať literál), pattern sa skúša len na ich pozíciách
+    a hľadanie slova končí, keď sú nájdené všetky jeho polia.
+
+    Returns:
+        pole -> surová hodnota (group(1) alebo celý match)
+    """
+    values: Dict[str, str] = {}
+    lowered = text.lower()
+
+    if len(lowered) != len(text):
+        # lower() zmenil dĺžku (napr. 'İ') - pozície nesedia, hľadaj klasicky
+        for name, _, _ in _HEADER_FIELDS:
+            match = HEADER_PATTERNS[name].search(text)
+            if match:
+                values[name] = _match_value(match)
+    else:
+        for keyword, fields in _DISPATCH.items():
+            pending = list(fields)
+            pos = lowered.find(keyword)
+            while pending and pos >= 0:
+                for entry in list(pending):
+                    match = entry[1].match(text, pos)
+                    if match:
+                        values[entry[0]] = _match_value(match)
+                        pending.remove(entry)
+                pos = lowered.find(keyword, pos + 1)
+
+    match = _SUPPLIER_NAME_PATTERN.search(text)
+    if match:
+        values['supplier_name'] = _match_value(match)
+
+    # customer_name je posledný neprázdny riadok pred prvým "IČO odberateľ" -
+    # search cez celý text skúša každé písmeno každého riadku
+    anchor = _CUSTOMER_ANCHOR.search(text)
+    if anchor:
+        line_start = text.rfind('\n', 0, anchor.start()) + 1
+        previous_end = len(text[:line_start].rstrip())
+        previous_start = text.rfind('\n', 0, previous_end) + 1
+        match = (_CUSTOMER_NAME_PATTERN.search(text, previous_start, anchor.end())
+                 or _CUSTOMER_NAME_PATTERN.search(text))
+        if match:
+            values['customer_name'] = _match_value(match)
+
+    return values
+
+
+# Tabuľka položiek
+_TABLE_START = re.compile(r'č\.\s+Názov.*?Spolu s DPH', re.IGNORECASE)
+_TABLE_END = re.compile(r'%\s+Základ\s+DPH', re.IGNORECASE)
+_ITEM_FIRST_LINE = re.compile(
+    r'^(\d+)\s+(.+?)\s+(\d+(?:[,.]\d+)?)\s+(KS|L|M|KG)\s+(?:(\d+(?:[,.]\d+)?%)?\s+)?(\d+(?:[,.]\d+)?)\s+(\d+(?:[,.]\d+)?)\s+(\d+(?:[,.]\d+)?)$'
+)
+_ITEM_SECOND_LINE = re.compile(r'^(\d+)\s+(\d{10,14})?\s*(?:AKCIA\s+)?(\d+)%')
+
+
+def parse_decimal(value: Optional[str]) -> Optional[Decimal]:
+    """Parsuje string na Decimal"""
+    if not value:
+        return None
+    try:
+        # Odstráň % znak a medzery, zmeň čiarku na bodku
+        value = value.replace('%', '').replace(' ', '').replace(',', '.')
+        return Decimal(value)
+    except:
+        return None
+
+
+class ItemTableParser:
+    """
+    Priebežný parser tabuľky položiek
+
+    Text sa pridáva po častiach (stranách) cez feed(); spracujú sa len
+    celé riadky, ktoré už nemôžu byť súčasťou konca tabuľky. Výsledok je
+    rovnaký ako pri spracovaní celého textu naraz.
+
+    feed() a close() vracajú len novo dokončené položky - parser si ich
+    nedrží, pamäť je ohraničená jedným rozpracovaným riadkom.
+    """
+
+    def __init__(self, parse_decimal=parse_decimal):
+        self._parse_decimal = parse_decimal
+        self._buffer = ""
+        self._in_table = False
+        self._done = False
+        self._line_number = 0
+        self._current: Optional[InvoiceItem] = None
+        self._completed: List[InvoiceItem] = []
+        self.count = 0
+
+    def feed(self, text: str) -> List[InvoiceItem]:
+        """Pridá text, vráti položky dokončené týmto textom"""
+        if self._done:
+            return []
+        self._buffer += text
+
+        if not self._in_table:
+            # Hľadaj len v celých riadkoch - hlavička tabuľky je na jednom riadku
+            complete = self._buffer.rfind('\n') + 1
+            table_start = _TABLE_START.search(self._buffer, 0, complete)
+            if not table_start:
+                return []
+            # Koniec tabuľky pred jej začiatkom = prázdna tabuľka
+            table_end = _TABLE_END.search(self._buffer, 0, table_start.start())
+            if table_end:
+                return self._finish()
+            self._in_table = True
+            self._buffer = self._buffer[table_start.end():]
+
+        table_end = _TABLE_END.search(self._buffer)
+        if table_end:
+            self._parse_lines(self._buffer[:table_end.start()])
+            return self._finish()
+
+        # Posledný riadok môže byť neúplný a riadok končiaci '%' môže
+        # pokračovať "Základ DPH" na ďalšej strane - tie nechaj v bufferi
+        safe = self._buffer.rfind('\n') + 1
+        head = self._buffer[:safe].rstrip()
+        if head.endswith('%'):
+            safe = head.rfind('\n') + 1
+
+        self._parse_lines(self._buffer[:safe])
+        self._buffer = self._buffer[safe:]
+        return self._take()
+
+    def close(self) -> List[InvoiceItem]:
+        """Spracuje zvyšok textu a vráti zostávajúce položky"""
+        if self._done:
+            return []
+        if self._in_table:
+            self._parse_lines(self._buffer)
+        else:
+            logger.warning("Table start not found")
+        return self._finish()
+
+    def _take(self) -> List[InvoiceItem]:
+        completed, self._completed = self._completed, []
+        return completed
+
+    def _emit(self, item: InvoiceItem):
+        self._completed.append(item)
+        self.count += 1
+
+    def _finish(self) -> List[InvoiceItem]:
+        # Ulož poslednú položku
+        if self._current:
+            self._emit(self._current)
+            self._current = None
+        self._buffer = ""
+        self._done = True
+        logger.info(f"Extracted {self.count} items from table")
+        return self._take()
+
+    def _parse_lines(self, text: str):
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+
+            # Detekcia prvého riadku položky (začína číslom)
+            first_line_match = _ITEM_FIRST_LINE.match(line)
+
+            if first_line_match:
+                # Ak máme rozpracovanú položku, ulož ju
+                if self._current:
+                    self._emit(self._current)
+
+                # Nová položka
+                self._line_number += 1
+                self._current = InvoiceItem(
+                    line_number=self._line_number,
+                    description=first_line_match.group(2).strip(),
+                    quantity=self._parse_decimal(first_line_match.group(3)),
+                    unit=first_line_match.group(4),
+                    discount_percent=self._parse_decimal(first_line_match.group(5)),
+                    unit_price_no_vat=self._parse_decimal(first_line_match.group(6)),
+                    unit_price_with_vat=self._parse_decimal(first_line_match.group(7)),
+                    total_with_vat=self._parse_decimal(first_line_match.group(8))
+                )
+
+            # Detekcia druhého riadku položky (kód, EAN, DPH)
+            elif self._current:
+                second_line_match = _ITEM_SECOND_LINE.match(line)
+                if second_line_match:
+                    self._current.item_code = second_line_match.group(1)
+                    # EAN musí mať aspoň 10 číslic, inak je to chyba
+                    if second_line_match.group(2) and len(second_line_match.group(2)) >= 10:
+                        self._current.ean_code = second_line_match.group(2)
+                    self._current.vat_rate = self._parse_decimal(second_line_match.group(3))
+
+
+def iter_items(page_texts: Iterable[str], parse_decimal=parse_decimal) -> Iterator[InvoiceItem]:
+    """
+    Generátor položiek z textu strán
+
+    Strany sa čítajú lenivo a položka sa vydá hneď, ako je celá - parser
+    si drží len rozpracovaný riadok. Faktúra (extract_from_pages) ich
+    ukladá do ItemColumns, ISDOC aj PostgreSQL ich iterujú znova.
+    """
+    parser = ItemTableParser(parse_decimal)
+    for page_text in page_texts:
+        if page_text:
+            yield from parser.feed(page_text + "\n")
+    yield from parser.close()
+
+
+def iter_page_texts(
+        pdf_path: str,
+        page_numbers: Optional[List[int]] = None,
+        first_page: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Text strán PDF (pdfplumber), prázdna strana = ""
+
+    Args:
+        pdf_path: Cesta k PDF súboru
+        page_numbers: Čísla strán od 1 (None = všetky)
+        first_page: Už prečítaný text strany 1 (routing) - strana 1 sa
+                    znova nerozkladá
+
+    Cache strany sa uvoľní hneď po extrakcii.
+    """
+    # Import pdfplumber here (nie na začiatku súboru)
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            if first_page is not None and page.page_number == 1:
+                yield first_page
+            else:
+                yield page.extract_text() or ""
+            page.close()
 
-class LSInvoiceExtractor:
+
+def record_pages(page_texts: Iterable[str], pages: List[str]) -> Iterator[str]:
+    """Prepustí text strán ďalej a zároveň ho uloží do pages (pre text_cache)"""
+    for page_text in page_texts:
+        pages.append(page_text)
+        yield page_text
+
+
+def read_first_page(pdf_path: str) -> Tuple[str, Dict]:
+    """
+    Text prvej strany a metadata PDF (layout len pre stranu 1)
+
+    Zdroj textu pre MODE_FIRST_PAGE a pre routing (ExtractorRegistry.route).
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path, pages=[1]) as pdf:
+        metadata = dict(pdf.metadata or {})
+        if not pdf.pages:
+            return "", metadata
+        page = pdf.pages[0]
+        first_page = page.extract_text() or ""
+        page.close()
+    return first_page, metadata
+
+
+def count_pages(pdf_path: str) -> int:
+    """Počet strán PDF"""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+# Režimy extrakcie
+MODE_FULL = "full"                # všetky strany, hlavička + položky
+MODE_FIRST_PAGE = "first_page"    # len prvá strana (hlavička + jej položky)
+MODE_HEADER_ONLY = "header_only"  # strany len kým sa nenájdu required_fields, bez položiek
+EXTRACTION_MODES = (MODE_FULL, MODE_FIRST_PAGE, MODE_HEADER_ONLY)
+
+# Polia pre kontrolu duplicity (check_duplicate_invoice) - sú na prvej strane
+DUPLICATE_CHECK_FIELDS = ('supplier_ico', 'invoice_number')
+
+
+class LSInvoiceExtractor(BaseExtractor):
     """Extraktor pre L&Š faktúry"""
 
+    supplier_icos = ("36555720",)
+    header_markers = ("L & Š, s.r.o.",)
+
     def __init__(self):
-        self.patterns = self._init_patterns()
-
-    def _init_patterns(self) -> Dict[str, str]:
-        """Inicializácia regex patterns pre L&Š faktúry"""
-        return {
-            # Hlavička - s medzerami medzi číslicami
-            'invoice_number': r'FAKTÚRA[^\d]*?(\d+)',
-            'issue_date': r'Dátum\s+vystavenia[:\s]*(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)',
-            'due_date': r'Dátum\s+splatnosti[^\d]*?(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)',
-            'tax_point_date': r'Dátum\s+daňovej\s+povinnosti[:\s]*(\d\s*\d?\s*\.\s*\d\s*\d?\s*\.\s*\d\s*\d\s*\d\s*\d)',
-
-            # Sumy - presnejšie patterns pre oba formáty
-            'net_amount': r'Základ\s+DPH\s+([\d\s]+\.\s*[\d\s]+)\s*E\s*U\s*R',
-            'tax_amount': r'(?:^|\n)DPH\s+([\d\s]+\.\s*[\d\s]+)\s*E\s*U\s*R',
-            'total_amount': r'Celkom\s+k\s+úhrade\s+([\d\s]+\.[\d\s]+)\s*EUR',
-
-            # Dodávateľ (L&Š)
-            'supplier_name': r'L\s*&\s*Š,\s*s\.r\.o\.',
-            'supplier_ico': r'IČO:\s*(\d{8})',
-            'supplier_dic': r'DIČ:\s*(\d{10})',
-            'supplier_icdph': r'IČ\s+DPH:\s*(SK\d{10})',
-
-            # Odberateľ - nájdeme riadok pred IČO odberateľ
-            'customer_name': r'([A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ][^\n]{5,})\s*\n[^\n]*IČO\s+odberateľ',
-            'customer_ico': r'IČO\s+odberateľ:\s*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
-            'customer_dic': r'DIČ\s+odberateľ:\s*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
-            'customer_icdph': r'IČDPH\s+odberateľ:\s*(S\s*K\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
-
-            # Bankové údaje - s medzerami
-            'iban': r'IBAN[:\s]*(SK\s*\d\s*\d[\d\s]{20,})',
-            'bic': r'BIC[:\s]*([A-Z]{6,11})',
-            'variable_symbol': r'Variabilný\s+symbol[:\s]*(\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d\s*\d)',
-            'constant_symbol': r'Konštantný\s+symbol[:\s]*(\d\s*\d\s*\d\s*\d)',
-        }
-
-    def extract_from_pdf(self, pdf_path: str) -> Optional[InvoiceData]:
+        super().__init__()
+        self.supplier_name = "L&Š"
+        self.patterns = HEADER_PATTERNS
+
+    def extract(
+            self,
+            pdf_path: str,
+            file_hash: Optional[str] = None,
+            first_page: Optional[str] = None
+    ) -> Optional[InvoiceData]:
+        """Extrakcia cez extraction_pool (ak je zapnutý)"""
+        return extract_invoice_data(pdf_path, file_hash, first_page=first_page)
+
+    def extract_header(
+            self,
+            pdf_path: str,
+            file_hash: Optional[str] = None,
+            required_fields: Tuple[str, ...] = DUPLICATE_CHECK_FIELDS,
+            first_page: Optional[str] = None
+    ) -> Optional[InvoiceData]:
+        """Len hlavička (MODE_HEADER_ONLY) cez extraction_pool"""
+        return extract_invoice_header(pdf_path, file_hash, required_fields, first_page)
+
+    def extract_from_pdf(
+            self,
+            pdf_path: str,
+            file_hash: Optional[str] = None,
+            mode: str = MODE_FULL,
+            required_fields: Tuple[str, ...] = DUPLICATE_CHECK_FIELDS,
+            first_page: Optional[str] = None
+    ) -> Optional[InvoiceData]:
         """
         Hlavná metóda - extrahuje dáta z PDF
 
+        Text strán sa berie z text_cache, ak už bol PDF raz extrahovaný.
+        Do cache sa ukladá len výsledok režimu full.
+
         Args:
             pdf_path: Cesta k PDF súboru
+            file_hash: MD5 obsahu PDF (vypočíta sa, ak chýba)
+            mode: MODE_FULL, MODE_FIRST_PAGE alebo MODE_HEADER_ONLY
+            required_fields: Polia hlavičky, po ktorých nájdení
+                             MODE_HEADER_ONLY prestane čítať strany
+            first_page: Text strany 1 prečítaný pri routingu
+                        (ExtractorRegistry) - strana 1 sa nerozkladá znova
 
         Returns:
             InvoiceData alebo None ak extraction zlyhal
         """
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {mode}")
+
         try:
-            # Import pdfplumber here (nie na začiatku súboru)
-            import pdfplumber
+            logger.info(f"Extracting data from: {pdf_path} ({mode})")
 
-            logger.info(f"Extracting data from: {pdf_path}")
+            cached = None
+            if text_cache.enabled:
+                file_hash = file_hash or file_md5(pdf_path)
+                cached = text_cache.get(file_hash)
 
-            # Otvor PDF a extrahuj text
-            text = self._extract_text_from_pdf(pdf_path, pdfplumber)
+            if mode == MODE_FIRST_PAGE:
+                if cached is not None:
+                    return self.extract_from_pages(cached[:1])
+                if first_page is None:
+                    first_page = read_first_page(pdf_path)[0]
+                return self.extract_from_pages([first_page])
 
-            if not text:
-                logger.error("No text extracted from PDF")
-                return None
+            if mode == MODE_HEADER_ONLY:
+                pages = cached if cached is not None else iter_page_texts(pdf_path, first_page=first_page)
+                return self.extract_header_from_pages(pages, required_fields)
 
-            # Extrahuj hlavičku
-            invoice_data = self._extract_header(text)
+            if cached is not None:
+                return self.extract_from_pages(cached)
 
-            # Extrahuj položky
-            items = self._extract_items(text)
-            invoice_data.items = items
+            if not text_cache.enabled:
+                return self.extract_from_pages(iter_page_texts(pdf_path, first_page=first_page))
 
-            logger.info(f"Extracted: {invoice_data.invoice_number}, {len(items)} items")
+            pages = []
+            invoice_data = self.extract_from_pages(
+                record_pages(iter_page_texts(pdf_path, first_page=first_page), pages)
+            )
+            text_cache.put(file_hash, pages)
             return invoice_data
 
         except Exception as e:
             logger.error(f"Error extracting from PDF: {e}", exc_info=True)
             return None
 
-    def _extract_text_from_pdf(self, pdf_path: str, pdfplumber) -> str:
-        """Extrahuje text z PDF pomocou pdfplumber"""
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
+    def extract_header_from_pages(
+            self,
+            page_texts: Iterable[str],
+            required_fields: Tuple[str, ...] = DUPLICATE_CHECK_FIELDS
+    ) -> Optional[InvoiceData]:
+        """
+        Hlavička z najmenšieho počtu strán
+
+        Strany sa čítajú, kým text neobsahuje všetky required_fields; zvyšok
+        PDF sa nespracuje (pdfplumber sa zavrie). Položky sa neparsujú.
+        """
+        parts = []
+        page_iter = iter(page_texts)
+        try:
+            for page_text in page_iter:
+                if not page_text:
+                    continue
+                parts.append(page_text + "\n")
+                values = scan_header_fields("".join(parts))
+                if all(field in values for field in required_fields):
+                    break
+        finally:
+            # Zavrie PDF, ak sa skončilo pred poslednou stranou
+            close = getattr(page_iter, "close", None)
+            if close:
+                close()
+
+        if not parts:
+            logger.error("No text extracted from PDF")
+            return None
+
+        invoice_data = self._extract_header("".join(parts))
+        invoice_data.page_count = len(parts)
+        logger.info(f"Extracted header: {invoice_data.invoice_number} from {len(parts)} pages")
+        return invoice_data
+
+    def extract_from_pages(self, page_texts: Iterable[str]) -> Optional[InvoiceData]:
+        """
+        Extrahuje dáta z textu jednotlivých strán
+
+        Položky sa parsujú priebežne po stranách (iter_items, kým sa ďalšie
+        strany ešte extrahujú) rovno do ItemColumns, hlavička až z celého
+        textu - sumy sú na poslednej strane.
+
+        Raises:
+            Exception: Chyba pri čítaní strán (volajúci loguje)
+        """
+        parts = []
+        page_count = 0
+
+        def text_pages():
+            nonlocal page_count
+            for page_text in page_texts:
+                page_count += 1
                 if page_text:
-                    text += page_text + "\n"
-        return text
+                    parts.append(page_text + "\n")
+                    yield page_text
+
+        # item_columns importuje InvoiceItem z tohto modulu
+        from src.extractors.item_columns import ItemColumns
+
+        items = ItemColumns(iter_items(text_pages(), self._parse_decimal))
+
+        if not parts:
+            logger.error("No text extracted from PDF")
+            return None
+
+        # Extrahuj hlavičku
+        invoice_data = self._extract_header("".join(parts))
+        invoice_data.items = items
+        invoice_data.page_count = page_count
+
+        logger.info(f"Extracted: {invoice_data.invoice_number}, {len(items)} items")
+        return invoice_data
+
+    def _extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extrahuje text z PDF pomocou pdfplumber"""
+        return "".join(page_text + "\n" for page_text in iter_page_texts(pdf_path) if page_text)
 
     def _extract_header(self, text: str) -> InvoiceData:
         """Extrahuje hlavičku faktúry"""
         data = InvoiceData()
 
-        # Extrahuj každé pole pomocou regex
-        for field, pattern in self.patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                value = match.group(1).strip() if match.lastindex else match.group(0).strip()
-
-                # Cleanup hodnoty
-                if field in ['issue_date', 'due_date', 'tax_point_date']:
-                    # Odstráň medzery z dátumov: "1 6 . 0 9 . 2 0 2 5" → "16.09.2025"
-                    value = re.sub(r'\s+', '', value)
-
-                if field in ['net_amount', 'tax_amount', 'total_amount']:
-                    # Odstráň medzery a zmeň čiarku na bodku
-                    value = value.replace(' ', '').replace(',', '.')
-                    try:
-                        value = Decimal(value)
-                    except:
-                        value = None
-
-                if field in ['customer_ico', 'customer_dic', 'variable_symbol', 'constant_symbol']:
-                    # Odstráň medzery z čísel
-                    value = re.sub(r'\s+', '', value)
-
-                if field == 'customer_icdph':
-                    # SK 2 0 2 0 3 6 7 1 5 1 → SK2020367151
-                    value = re.sub(r'\s+', '', value)
-
-                if field == 'iban':
-                    value = re.sub(r'\s+', '', value)
-
-                if field == 'customer_name':
-                    # Odstráň prefix "Prepravca: V D" alebo podobné
-                    value = re.sub(r'^.*?(?:Prepravca|Vozidlo|Štát)[^\n]*', '', value)
-                    value = value.strip()
-                    # Ak stále začína 1-2 písmenami + medzera, odstráň to
-                    value = re.sub(r'^[A-Z]{1,2}\s+', '', value)
-                    # Odstráň extra medzery medzi písmenami v mene: "M Á G E RSTAV" → "MÁGERSTAV"
-                    value = re.sub(r'([A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ])\s+(?=[A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ])', r'\1', value)
-
-                # Nastav hodnotu
-                setattr(data, field, value)
+        for field, value in scan_header_fields(text).items():
+            # Cleanup hodnoty
+            if field in _DATE_FIELDS:
+                # Odstráň medzery z dátumov: "1 6 . 0 9 . 2 0 2 5" → "16.09.2025"
+                value = _WHITESPACE.sub('', value)
+
+            elif field in _AMOUNT_FIELDS:
+                # Odstráň medzery a zmeň čiarku na bodku
+                value = value.replace(' ', '').replace(',', '.')
+                try:
+                    value = Decimal(value)
+                except:
+                    value = None
+
+            elif field in _SPACED_FIELDS:
+                # Odstráň medzery z čísel: SK 2 0 2 0 3 6 7 1 5 1 → SK2020367151
+                value = _WHITESPACE.sub('', value)
+
+            elif field == 'customer_name':
+                # Odstráň prefix "Prepravca: V D" alebo podobné
+                value = _CUSTOMER_PREFIX.sub('', value)
+                value = value.strip()
+                # Ak stále začína 1-2 písmenami + medzera, odstráň to
+                value = _CUSTOMER_INITIALS.sub('', value)
+                # Odstráň extra medzery medzi písmenami v mene: "M Á G E RSTAV" → "MÁGERSTAV"
+                value = _CUSTOMER_SPACED.sub(r'\1', value)
+
+            # Nastav hodnotu
+            setattr(data, field, value)
 
         # Hardcoded pre L&Š (ak neextrahovalo)
         if not data.supplier_name:
@@ -227,94 +663,30 @@ class LSInvoiceExtractor:
         1  Akcia KO             3 KS                0.010            0.012          0.037
            293495               23%                 0.010            0.012
         """
-        items = []
-
-        # Nájdi začiatok tabuľky
-        table_start = re.search(r'č\.\s+Názov.*?Spolu s DPH', text, re.IGNORECASE)
-        if not table_start:
-            logger.warning("Table start not found")
-            return items
-
-        # Nájdi koniec tabuľky (pred sumárom)
-        table_end = re.search(r'%\s+Základ\s+DPH', text, re.IGNORECASE)
-
-        # Vystrihni tabuľku
-        start_pos = table_start.end()
-        end_pos = table_end.start() if table_end else len(text)
-        table_text = text[start_pos:end_pos]
-
-        # Split na riadky
-        lines = table_text.split('\n')
-
-        current_item = None
-        line_number = 0
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Detekcia prvého riadku položky (začína číslom)
-            first_line_match = re.match(
-                r'^(\d+)\s+(.+?)\s+(\d+(?:[,.]\d+)?)\s+(KS|L|M|KG)\s+(?:(\d+(?:[,.]\d+)?%)?\s+)?(\d+(?:[,.]\d+)?)\s+(\d+(?:[,.]\d+)?)\s+(\d+(?:[,.]\d+)?)$',
-                line
-            )
-
-            if first_line_match:
-                # Ak máme rozpracovanú položku, ulož ju
-                if current_item:
-                    items.append(current_item)
-
-                # Nová položka
-                line_number += 1
-                current_item = InvoiceItem(
-                    line_number=line_number,
-                    description=first_line_match.group(2).strip(),
-                    quantity=self._parse_decimal(first_line_match.group(3)),
-                    unit=first_line_match.group(4),
-                    discount_percent=self._parse_decimal(first_line_match.group(5)),
-                    unit_price_no_vat=self._parse_decimal(first_line_match.group(6)),
-                    unit_price_with_vat=self._parse_decimal(first_line_match.group(7)),
-                    total_with_vat=self._parse_decimal(first_line_match.group(8))
-                )
-
-            # Detekcia druhého riadku položky (kód, EAN, DPH)
-            elif current_item:
-                second_line_match = re.match(
-                    r'^(\d+)\s+(\d{10,14})?\s*(?:AKCIA\s+)?(\d+)%',
-                    line
-                )
-                if second_line_match:
-                    current_item.item_code = second_line_match.group(1)
-                    # EAN musí mať aspoň 10 číslic, inak je to chyba
-                    if second_line_match.group(2) and len(second_line_match.group(2)) >= 10:
-                        current_item.ean_code = second_line_match.group(2)
-                    current_item.vat_rate = self._parse_decimal(second_line_match.group(3))
-
-        # Ulož poslednú položku
-        if current_item:
-            items.append(current_item)
-
-        logger.info(f"Extracted {len(items)} items from table")
+        item_parser = ItemTableParser(self._parse_decimal)
+        items = item_parser.feed(text)
+        items.extend(item_parser.close())
         return items
 
     def _parse_decimal(self, value: Optional[str]) -> Optional[Decimal]:
         """Parsuje string na Decimal"""
-        if not value:
-            return None
-        try:
-            # Odstráň % znak a medzery, zmeň čiarku na bodku
-            value = value.replace('%', '').replace(' ', '').replace(',', '.')
-            return Decimal(value)
-        except:
-            return None
+        return parse_decimal(value)
 
 
 # Pomocná funkcia pre použitie v main.py
-def extract_invoice_data(pdf_path: str) -> Optional[InvoiceData]:
+def extract_invoice_data(
+        pdf_path: str,
+        file_hash: Optional[str] = None,
+        mode: str = MODE_FULL,
+        required_fields: Tuple[str, ...] = DUPLICATE_CHECK_FIELDS,
+        first_page: Optional[str] = None
+) -> Optional[InvoiceData]:
     """
     Wrapper funkcia pre extrahovanie dát
 
+    Extrakcia beží v procesnom poole (extraction_pool), ak je zapnutý.
+    mode, required_fields, first_page: ako LSInvoiceExtractor.extract_from_pdf
+
     Usage:
         from extraction import extract_invoice_data
         data = extract_invoice_data("/path/to/invoice.pdf")
@@ -322,5 +694,43 @@ def extract_invoice_data(pdf_path: str) -> Optional[InvoiceData]:
             print(f"Invoice: {data.invoice_number}")
             print(f"Items: {len(data.items)}")
     """
-    extractor = LSInvoiceExtractor()
-    return extractor.extract_from_pdf(pdf_path)
\ No newline at end of file
+    from src.extractors.extraction_pool import extraction_pool
+
+    if extraction_pool.enabled:
+        return extraction_pool.extract(pdf_path, file_hash, mode, required_fields, first_page)
+    return extract_invoice_data_local(pdf_path, file_hash, mode, required_fields, first_page)
+
+
+def extract_invoice_data_local(
+        pdf_path: str,
+        file_hash: Optional[str] = None,
+        mode: str = MODE_FULL,
+        required_fields: Tuple[str, ...] = DUPLICATE_CHECK_FIELDS,
+        first_page: Optional[str] = None
+) -> Optional[InvoiceData]:
+    """Extrakcia v aktuálnom procese (worker procesného poolu)"""
+    return _extractor.extract_from_pdf(pdf_path, file_hash, mode, required_fields, first_page)
+
+
+def extract_invoice_header(
+        pdf_path: str,
+        file_hash: Optional[str] = None,
+        required_fields: Tuple[str, ...] = DUPLICATE_CHECK_FIELDS,
+        first_page: Optional[str] = None
+) -> Optional[InvoiceData]:
+    """
+    Len hlavička - predvolene polia pre kontrolu duplicity (supplier_ico,
+    invoice_number), backfill žiada invoice_number a total_amount
+
+    Číta strany len kým sa polia nenájdu, položky neparsuje.
+    """
+    return extract_invoice_data(pdf_path, file_hash, MODE_HEADER_ONLY, required_fields, first_page)
+
+
+def get_extractor() -> LSInvoiceExtractor:
+    """Zdieľaná inštancia extraktora"""
+    return _extractor
+
+
+# Extraktor je bezstavový - jedna inštancia pre všetky requesty (aj vlákna)
+_extractor = LSInvoiceExtractor()
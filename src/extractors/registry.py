@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Extractor Registry
+
+Picks the supplier extractor from cheap fingerprints (BaseExtractor
+supplier_icos / header_markers / producer_markers) read from the first
+page and PDF metadata only, instead of trying full extractions in turn.
+Invoices without a matching fingerprint go to the fallback extractor.
+
+Adding a supplier = new BaseExtractor subclass + extractor_registry.register().
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.extractors.base_extractor import BaseExtractor
+from src.extractors.extraction_pool import extraction_pool
+from src.extractors.generic_extractor import GenericExtractor
+from src.extractors.ls_extractor import get_extractor, read_first_page
+from src.extractors.text_cache import text_cache
+
+logger = logging.getLogger(__name__)
+
+
+def read_fingerprint(pdf_path: str) -> Tuple[str, Dict[str, Any]]:
+    """Text prvej strany a metadata PDF - čítanie režimu first_page (read_first_page)"""
+    return read_first_page(pdf_path)
+
+
+class ExtractorRegistry:
+    """
+    Registered supplier extractors + first-page router
+    """
+
+    def __init__(self, fallback: BaseExtractor):
+        self.fallback = fallback
+        self._extractors: List[BaseExtractor] = []
+        self._lock = threading.Lock()
+        self._routed: Counter = Counter()
+
+    def register(self, extractor: BaseExtractor):
+        """Add extractor; on equal score the earlier registered wins"""
+        self._extractors.append(extractor)
+
+    @property
+    def extractors(self) -> List[BaseExtractor]:
+        return list(self._extractors)
+
+    def select(self, first_page: str, metadata: Dict[str, Any]) -> BaseExtractor:
+        """Extractor with the highest fingerprint score (fallback if none matches)"""
+        best, best_score = self.fallback, 0
+        for extractor in self._extractors:
+            score = extractor.fingerprint_score(first_page, metadata)
+            if score > best_score:
+                best, best_score = extractor, score
+        return best
+
+    def route(self, pdf_path: str, file_hash: Optional[str] = None) -> BaseExtractor:
+        """
+        Extractor for PDF - reads only the first page
+
+        Cached page texts (text_cache) are used without opening the PDF;
+        otherwise the first page is read in extraction_pool if enabled.
+        """
+        return self._route(pdf_path, file_hash)[0]
+
+    def _route(self, pdf_path: str, file_hash: Optional[str]) -> Tuple[BaseExtractor, Optional[str]]:
+        """
+        (extractor, page 1 text read for routing)
+
+        The text is passed on to the extraction so page 1 is laid out only
+        once; None when it came from text_cache (extraction reads the cache
+        too) or could not be read.
+        """
+        cached = text_cache.get(file_hash) if file_hash and text_cache.enabled else None
+        read_text = None
+        try:
+            if cached is not None:
+                first_page, metadata = (cached[0] if cached else ""), {}
+            else:
+                if extraction_pool.enabled:
+                    first_page, metadata = extraction_pool.run(read_fingerprint, pdf_path)
+                else:
+                    first_page, metadata = read_fingerprint(pdf_path)
+                read_text = first_page
+        except Exception as e:
+            # Invalid PDF - the extractor logs the actual error
+            logger.warning(f"Fingerprint read failed for {pdf_path}: {e}")
+            first_page, metadata = "", {}
+
+        extractor = self.select(first_page, metadata)
+        with self._lock:
+            self._routed[extractor.supplier_name] += 1
+        logger.info(f"Routing {pdf_path} to {extractor.supplier_name} extractor")
+        return extractor, read_text
+
+    def extract(self, pdf_path: str, file_hash: Optional[str] = None):
+        """Route and extract - InvoiceData or None"""
+        extractor, first_page = self._route(pdf_path, file_hash)
+        return extractor.extract(pdf_path, file_hash, first_page)
+
+    def extract_header(self, pdf_path: str, file_hash: Optional[str], required_fields: Tuple[str, ...]):
+        """Route and extract header fields only (BaseExtractor.extract_header)"""
+        extractor, first_page = self._route(pdf_path, file_hash)
+        return extractor.extract_header(pdf_path, file_hash, required_fields, first_page)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routed = dict(self._routed)
+        return {
+            'extractors': [extractor.supplier_name for extractor in self._extractors],
+            'fallback': self.fallback.supplier_name,
+            'routed': routed
+        }
+
+
+# Global registry
+extractor_registry = ExtractorRegistry(fallback=GenericExtractor())
+extractor_registry.register(get_extractor())
+
+
+def extract_invoice_data(pdf_path: str, file_hash: Optional[str] = None):
+    """Wrapper - extraction by the extractor matching the supplier"""
+    return extractor_registry.extract(pdf_path, file_hash)
+
+
+def extract_invoice_header(pdf_path: str, file_hash: Optional[str], required_fields: Tuple[str, ...]):
+    """Wrapper - header-only extraction by the extractor matching the supplier"""
+    return extractor_registry.extract_header(pdf_path, file_hash, required_fields)
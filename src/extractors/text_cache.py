@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Extracted Text Cache
+
+pdfplumber layout analysis is by far the most expensive extraction step.
+Page texts are stored gzip-compressed in config.TEXT_CACHE_DIR, keyed by
+PDF content hash (MD5, same as invoices.file_hash) and pdfplumber
+version, so re-extraction after a regex fix or for a new ISDOC version
+only pays the regex cost.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils import config
+
+logger = logging.getLogger(__name__)
+
+
+def file_md5(pdf_path: str) -> str:
+    """MD5 of PDF file content"""
+    md5 = hashlib.md5()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _pdfplumber_version() -> str:
+    import pdfplumber
+    return pdfplumber.__version__
+
+
+class PageTextCache:
+    """
+    On-disk cache: file hash + pdfplumber version -> page texts
+    """
+
+    def __init__(self, cache_dir: Path, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            self._version = _pdfplumber_version()
+        return self._version
+
+    def _path(self, file_hash: str) -> Path:
+        return self.cache_dir / f"pdfplumber-{self.version}" / file_hash[:2] / f"{file_hash}.json.gz"
+
+    def contains(self, file_hash: str) -> bool:
+        return self.enabled and self._path(file_hash).exists()
+
+    def get(self, file_hash: str) -> Optional[List[str]]:
+        """Cached page texts or None"""
+        if not self.enabled:
+            return None
+
+        path = self._path(file_hash)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                pages = json.load(f)
+        except FileNotFoundError:
+            pages = None
+        except (OSError, ValueError) as e:
+            # Corrupted entry - extract again and overwrite
+            logger.warning(f"Invalid text cache entry {path}: {e}")
+            pages = None
+
+        with self._lock:
+            if pages is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return pages
+
+    def put(self, file_hash: str, pages: List[str]):
+        """Store page texts (atomic replace)"""
+        if not self.enabled:
+            return
+
+        path = self._path(file_hash)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(pages, f, ensure_ascii=False)
+            tmp_path.replace(path)
+        except OSError as e:
+            # Cache is optional - never fail extraction because of it
+            logger.warning(f"Failed to write text cache {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self.writes += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes
+        }
+
+
+# Global cache (one instance per process)
+text_cache = PageTextCache(config.TEXT_CACHE_DIR, config.TEXT_CACHE_ENABLED)
@@ -3,8 +3,21 @@
 Supplier Invoice Loader - Configuration Loader
 """
 
+from src.utils.config_defaults import performance_defaults
+
 try:
     from config.config_customer import *
 except ImportError:
     print("WARNING: config_customer.py not found, using template")
-    from config.config_template import *
\ No newline at end of file
+    from config.config_template import *
+
+# ============================================================================
+# DEFAULTS FOR SETTINGS ADDED AFTER v2.0
+# ============================================================================
+# Existing config_customer.py files were copied from an older template and do
+# not define these. Values from config_customer.py always take precedence.
+
+_DEFAULTS = performance_defaults(STORAGE_BASE)
+
+for _name, _value in _DEFAULTS.items():
+    globals().setdefault(_name, _value)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Defaults for Settings Added After v2.0
+
+Single source of these values: config_template.py assigns its PERFORMANCE
+TUNING settings from here and config.py fills them in for config_customer.py
+files copied from an older template.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+
+def performance_defaults(storage_base: Path) -> Dict[str, Any]:
+    """Default performance settings, with LS_* environment overrides applied"""
+    return {
+        # Invoice processing worker pool
+        "WORKER_THREADS": int(os.getenv("LS_WORKER_THREADS", "4")),
+        "WORKER_QUEUE_SIZE": int(os.getenv("LS_WORKER_QUEUE_SIZE", "16")),
+        "MAX_BATCH_SIZE": int(os.getenv("LS_MAX_BATCH_SIZE", "50")),
+        "MAX_UPLOAD_SIZE_MB": int(os.getenv("LS_MAX_UPLOAD_SIZE_MB", "50")),
+        "DUPLICATE_CACHE_SIZE": int(os.getenv("LS_DUPLICATE_CACHE_SIZE", "10000")),
+        "IDEMPOTENCY_CACHE_SIZE": int(os.getenv("LS_IDEMPOTENCY_CACHE_SIZE", "1000")),
+        "IDEMPOTENCY_TTL_SECONDS": int(os.getenv("LS_IDEMPOTENCY_TTL_SECONDS", "86400")),
+
+        # PDF extraction process pool (0 = extract in calling thread)
+        "EXTRACTION_PROCESSES": int(os.getenv("LS_EXTRACTION_PROCESSES", str(os.cpu_count() or 1))),
+        "EXTRACTION_MAX_TASKS_PER_CHILD": int(os.getenv("LS_EXTRACTION_MAX_TASKS_PER_CHILD", "50")),
+        "EXTRACTION_PAGE_PARALLEL_MIN_PAGES": int(os.getenv("LS_EXTRACTION_PAGE_PARALLEL_MIN_PAGES", "8")),
+        "EXTRACTION_PAGES_PER_TASK": int(os.getenv("LS_EXTRACTION_PAGES_PER_TASK", "4")),
+        "TEXT_CACHE_ENABLED": True,
+        "TEXT_CACHE_DIR": storage_base / "TEXT_CACHE",
+        "GENERIC_LAYOUT_MAX_MS_PER_PAGE": float(os.getenv("LS_GENERIC_LAYOUT_MAX_MS_PER_PAGE", "20")),
+
+        # Asynchronous jobs (POST /invoice?async=true)
+        "JOB_WORKERS": int(os.getenv("LS_JOB_WORKERS", "2")),
+        "JOB_QUEUE_SIZE": int(os.getenv("LS_JOB_QUEUE_SIZE", "200")),
+        "JOBS_DIR": storage_base / "JOBS",
+
+        # SQLite connections (WAL mode, one connection per thread)
+        "SQLITE_BUSY_TIMEOUT_MS": int(os.getenv("LS_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "SQLITE_CACHE_SIZE_KB": int(os.getenv("LS_SQLITE_CACHE_SIZE_KB", "8192")),
+        "SQLITE_SYNCHRONOUS": os.getenv("LS_SQLITE_SYNCHRONOUS", "NORMAL"),
+        "SQLITE_WRITE_QUEUE_ENABLED": True,
+        "SQLITE_GROUP_COMMIT_MAX": int(os.getenv("LS_SQLITE_GROUP_COMMIT_MAX", "64")),
+        "SQLITE_GROUP_COMMIT_WINDOW_MS": float(os.getenv("LS_SQLITE_GROUP_COMMIT_WINDOW_MS", "0")),
+    }
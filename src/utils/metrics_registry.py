@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Metrics Registry
+Labeled counters, gauges and histograms in Prometheus text format
+
+Small in-process replacement for prometheus_client (deployments are 32-bit
+Windows services with a short dependency list). Values are updated
+incrementally in the hot path; a scrape only formats current values.
+Gauges that describe the environment (uptime, memory, disk) and
+deprecated aliases are read by cheap callbacks at scrape time.
+"""
+
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _format_labels(pairs: Sequence[Tuple[str, Any]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed buckets (Prometheus semantics)
+
+    Observations are counted into the first bucket with value <= bound;
+    quantiles are estimated by linear interpolation inside the bucket,
+    like PromQL histogram_quantile().
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Last slot = +Inf
+            self._counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """(cumulative counts per bucket with +Inf last, sum, count) - consistent"""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self.sum
+            count = self.count
+        cumulative = []
+        running = 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total_sum, count
+
+    def cumulative(self) -> List[int]:
+        """Cumulative counts per bucket, last = +Inf (= count)"""
+        return self.snapshot()[0]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0..1), None without observations"""
+        cumulative = self.cumulative()
+        if not cumulative[-1]:
+            return None
+        rank = q * cumulative[-1]
+        index = bisect.bisect_left(cumulative, rank)
+        if index >= len(self.buckets):
+            # +Inf bucket - highest finite bound is the best estimate
+            return self.buckets[-1]
+        lower = self.buckets[index - 1] if index else 0.0
+        below = cumulative[index - 1] if index else 0
+        in_bucket = cumulative[index] - below
+        return lower + (self.buckets[index] - lower) * (rank - below) / in_bucket
+
+    def summary(self) -> Dict[str, Any]:
+        """count, sum and p50/p95/p99 estimates (for JSON endpoints)"""
+        quantiles = {f"p{int(q * 100)}": self.quantile(q) for q in (0.5, 0.95, 0.99)}
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            **{name: round(value, 6) if value is not None else None for name, value in quantiles.items()}
+        }
+
+
+class CounterValue:
+    """One labeled counter - only goes up"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        if amount < 0:
+            raise ValueError("Counter can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class GaugeValue:
+    """One labeled gauge - set, inc or dec"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+
+class MetricFamily:
+    """
+    Metric name + label names; one child value per label combination
+
+    Children are created on first use: family.labels(customer="X").inc()
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], Optional[float]]] = None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        # With function the (label-less) value is read at scrape time
+        self.function = function
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """Child for label values (positional in labelnames order, or by name)"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {key}")
+
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return iter(items)
+
+    def reset(self):
+        with self._lock:
+            self._children.clear()
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[Tuple[str, Any]], float]]:
+        """(sample name, label pairs, value)"""
+        if self.function is not None:
+            yield from self._function_samples()
+            return
+        for key, child in self.children():
+            yield self.name, list(zip(self.labelnames, key)), child.value
+
+    def _function_samples(self):
+        try:
+            value = self.function()
+        except Exception as e:
+            logger.debug(f"Metric {self.name} callback failed: {e}")
+            return
+        if value is not None:
+            yield self.name, [], value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type_name}']
+        for name, pairs, value in self.samples():
+            lines.append(f'{name}{_format_labels(pairs)} {_format_value(value)}')
+        return lines
+
+
+class Counter(MetricFamily):
+    type_name = "counter"
+
+    def _new_child(self):
+        return CounterValue()
+
+    def inc(self, amount: float = 1):
+        """Counter without labels"""
+        self.labels().inc(amount)
+
+    def total(self, **match) -> float:
+        """Sum over children whose labels contain match"""
+        indexes = [(self.labelnames.index(name), str(value)) for name, value in match.items()]
+        return sum(
+            child.value for key, child in self.children()
+            if all(key[index] == value for index, value in indexes)
+        )
+
+
+class Gauge(MetricFamily):
+    """
+    Gauge family; with function the (label-less) value is read at scrape time
+    """
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return GaugeValue()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class HistogramFamily(MetricFamily):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return Histogram(self.buckets)
+
+    def observe(self, value: float):
+        """Histogram without labels"""
+        self.labels().observe(value)
+
+    def samples(self):
+        bounds = [_format_value(float(bound)) for bound in self.buckets] + ['+Inf']
+        for key, histogram in self.children():
+            pairs = list(zip(self.labelnames, key))
+            cumulative, total_sum, count = histogram.snapshot()
+            for bound, value in zip(bounds, cumulative):
+                yield f'{self.name}_bucket', pairs + [('le', bound)], value
+            yield f'{self.name}_sum', pairs, total_sum
+            yield f'{self.name}_count', pairs, count
+
+
+class MetricsRegistry:
+    """Named metric families rendered together as one exposition"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: Dict[str, MetricFamily] = {}
+
+    def register(self, family: MetricFamily) -> MetricFamily:
+        with self._lock:
+            if family.name in self._families:
+                raise ValueError(f"Metric already registered: {family.name}")
+            self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                function: Optional[Callable[[], Optional[float]]] = None) -> Counter:
+        return self.register(Counter(name, help_text, labelnames, function))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+              function: Optional[Callable[[], Optional[float]]] = None) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames, function))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float],
+                  labelnames: Sequence[str] = ()) -> HistogramFamily:
+        return self.register(HistogramFamily(name, help_text, buckets, labelnames))
+
+    def get(self, name: str) -> Optional[MetricFamily]:
+        return self._families.get(name)
+
+    def reset(self):
+        """Drop all values of families updated in the hot path"""
+        for family in list(self._families.values()):
+            family.reset()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+            lines.append('')
+        return '\n'.join(lines)
@@ -7,11 +7,14 @@ Tracks application health, uptime, and processing statistics
 import time
 import psutil
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 from pathlib import Path
 
 from src.utils import config
+from src.utils.metrics_registry import MetricsRegistry
 from src.database import database
 
 logger = logging.getLogger(__name__)
@@ -21,62 +24,219 @@ logger = logging.getLogger(__name__)
 # GLOBAL STATE
 # ============================================================================
 
+APP_VERSION = '2.0.0'
+
+# Stages of the invoice pipeline (invoice_processor)
+PIPELINE_STAGES = ("decode", "duplicate_check", "write_pdf", "extract", "sqlite", "isdoc", "postgres")
+
+# Histogram bucket upper bounds (Prometheus "le")
+STAGE_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+INVOICE_PAGES_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+INVOICE_ITEMS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Invoice outcomes (app_invoices_total status label)
+STATUS_PROCESSED = 'processed'
+STATUS_FAILED = 'failed'
+STATUS_DUPLICATE = 'duplicate'
+
+
+def _db_size_bytes() -> Optional[int]:
+    db_file = Path(database.DB_FILE)
+    return db_file.stat().st_size if db_file.exists() else None
+
+
+# health_overall gauge - check_storage_health() writes test files, so the
+# result is reused between scrapes for this long
+HEALTH_OVERALL_TTL_SECONDS = 60.0
+
+_health_lock = threading.Lock()
+_health_checked_at: Optional[float] = None
+_health_value = 0
+
+
+def _check_health_overall() -> int:
+    """1 if storage is writable and the database readable"""
+    try:
+        database.count_invoices()
+    except Exception:
+        return 0
+    return 1 if check_storage_health()['storage_healthy'] else 0
+
+
+def _health_overall() -> int:
+    """Cached _check_health_overall() - refreshed after HEALTH_OVERALL_TTL_SECONDS"""
+    global _health_checked_at, _health_value
+    with _health_lock:
+        now = time.monotonic()
+        if _health_checked_at is None or now - _health_checked_at >= HEALTH_OVERALL_TTL_SECONDS:
+            _health_value = _check_health_overall()
+            _health_checked_at = now
+        return _health_value
+
+
 class ApplicationMetrics:
     """
     In-memory metrics tracking
     Persists for the lifetime of the application process
+
+    Values live in labeled families of self.registry, updated in the hot
+    path; counter attributes (invoices_processed, ...) are totals over
+    all labels. Scraping never touches the database.
     """
 
     def __init__(self):
         self.start_time = time.time()
         self.start_datetime = datetime.now()
 
-        # Processing counters (since startup)
-        self.invoices_processed = 0
-        self.invoices_failed = 0
-        self.invoices_duplicates = 0
-        self.extraction_errors = 0
-        self.xml_generation_errors = 0
+        self.registry = MetricsRegistry()
+        registry = self.registry
+
+        self.info = registry.gauge('app_info', 'Application information', ('version', 'customer'))
+        registry.gauge('app_uptime_seconds', 'Application uptime in seconds', function=self.get_uptime_seconds)
+
+        # Processing counters (since startup); customer is always the
+        # configured CUSTOMER_NAME - names extracted from PDFs are free text
+        self.invoice_counter = registry.counter(
+            'app_invoices_total', 'Invoices handled since startup by outcome', ('customer', 'status'))
+        self.stage_error_counter = registry.counter(
+            'app_stage_errors_total', 'Pipeline stage failures since startup', ('stage',))
+        self.stage_seconds = registry.histogram(
+            'app_stage_duration_seconds', 'Invoice pipeline stage duration in seconds',
+            STAGE_SECONDS_BUCKETS, ('stage',))
+        self.invoice_pages = registry.histogram(
+            'app_invoice_pages', 'Pages per extracted invoice', INVOICE_PAGES_BUCKETS)
+        self.invoice_items = registry.histogram(
+            'app_invoice_items', 'Items per extracted invoice', INVOICE_ITEMS_BUCKETS)
 
         # Request counters
-        self.api_requests = 0
-        self.auth_failures = 0
+        self.request_counter = registry.counter(
+            'app_api_requests_total', 'API requests since startup by HTTP status', ('status',))
+        self.auth_failure_counter = registry.counter(
+            'app_auth_failures_total', 'Rejected API keys since startup')
+
+        # Environment - cheap reads at scrape time
+        registry.gauge('system_cpu_percent', 'CPU usage percentage since previous scrape',
+                       function=lambda: psutil.cpu_percent(interval=None))
+        registry.gauge('system_memory_percent', 'Memory usage percentage',
+                       function=lambda: psutil.virtual_memory().percent)
+        registry.gauge('storage_disk_free_bytes', 'Free space on storage disk in bytes',
+                       function=lambda: psutil.disk_usage(str(config.STORAGE_BASE)).free)
+        registry.gauge('db_size_bytes', 'SQLite database file size in bytes', function=_db_size_bytes)
+
+        # DEPRECATED: pre-2.0 series kept for existing dashboards and alerts
+        # for one release - use app_invoices_total / db_size_bytes instead
+        registry.counter('app_invoices_processed_total',
+                         'DEPRECATED (use app_invoices_total) Invoices processed successfully since startup',
+                         function=lambda: self.invoices_processed)
+        registry.counter('app_invoices_failed_total',
+                         'DEPRECATED (use app_invoices_total) Invoices failed processing since startup',
+                         function=lambda: self.invoices_failed)
+        registry.counter('app_invoices_duplicates_total',
+                         'DEPRECATED (use app_invoices_total) Duplicate invoices detected since startup',
+                         function=lambda: self.invoices_duplicates)
+        registry.gauge('db_invoices_total', 'DEPRECATED Total invoices in database (all-time)',
+                       function=database.count_invoices)
+        registry.gauge('health_overall', 'DEPRECATED Overall health status (1=healthy, 0=unhealthy)',
+                       function=_health_overall)
 
         # Last activity
         self.last_invoice_time: Optional[datetime] = None
         self.last_error_time: Optional[datetime] = None
 
+        self._init_series()
+
+    def _init_series(self):
+        """Series exported with zero values before first event"""
+        self.info.labels(APP_VERSION, config.CUSTOMER_NAME).set(1)
+        for stage in PIPELINE_STAGES:
+            self.stage_seconds.labels(stage)
+        self.invoice_pages.labels()
+        self.invoice_items.labels()
+        self.auth_failure_counter.labels()
+
+    @property
+    def invoices_processed(self) -> int:
+        return self.invoice_counter.total(status=STATUS_PROCESSED)
+
+    @property
+    def invoices_failed(self) -> int:
+        return self.invoice_counter.total(status=STATUS_FAILED)
+
+    @property
+    def invoices_duplicates(self) -> int:
+        return self.invoice_counter.total(status=STATUS_DUPLICATE)
+
+    @property
+    def extraction_errors(self) -> int:
+        return self.stage_error_counter.total(stage='extract')
+
+    @property
+    def xml_generation_errors(self) -> int:
+        return self.stage_error_counter.total(stage='isdoc')
+
+    @property
+    def api_requests(self) -> int:
+        return self.request_counter.total()
+
+    @property
+    def auth_failures(self) -> int:
+        return self.auth_failure_counter.total()
+
     def increment_processed(self):
         """Increment successful invoice counter"""
-        self.invoices_processed += 1
+        self.invoice_counter.labels(config.CUSTOMER_NAME, STATUS_PROCESSED).inc()
         self.last_invoice_time = datetime.now()
 
     def increment_failed(self):
         """Increment failed invoice counter"""
-        self.invoices_failed += 1
+        self.invoice_counter.labels(config.CUSTOMER_NAME, STATUS_FAILED).inc()
         self.last_error_time = datetime.now()
 
     def increment_duplicate(self):
         """Increment duplicate counter"""
-        self.invoices_duplicates += 1
+        self.invoice_counter.labels(config.CUSTOMER_NAME, STATUS_DUPLICATE).inc()
+
+    def increment_stage_error(self, stage: str):
+        """Increment failure counter of a pipeline stage"""
+        self.stage_error_counter.labels(stage).inc()
+        self.last_error_time = datetime.now()
 
     def increment_extraction_error(self):
         """Increment extraction error counter"""
-        self.extraction_errors += 1
-        self.last_error_time = datetime.now()
+        self.increment_stage_error('extract')
 
     def increment_xml_error(self):
         """Increment XML generation error counter"""
-        self.xml_generation_errors += 1
-        self.last_error_time = datetime.now()
+        self.increment_stage_error('isdoc')
 
-    def increment_api_request(self):
+    def increment_api_request(self, status: Any = 'unknown'):
         """Increment API request counter"""
-        self.api_requests += 1
+        self.request_counter.labels(status).inc()
 
     def increment_auth_failure(self):
         """Increment authentication failure counter"""
-        self.auth_failures += 1
+        self.auth_failure_counter.inc()
+
+    def observe_stage(self, stage: str, seconds: float):
+        """Record duration of one pipeline stage"""
+        self.stage_seconds.labels(stage).observe(seconds)
+
+    @contextmanager
+    def time_stage(self, stage: str) -> Iterator[None]:
+        """Time the with-block as pipeline stage; exceptions count as stage errors"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment_stage_error(stage)
+            raise
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    def observe_invoice_size(self, pages: int, items: int):
+        """Record page and item count of an extracted invoice"""
+        self.invoice_pages.observe(pages)
+        self.invoice_items.observe(items)
 
     def get_uptime_seconds(self) -> float:
         """Get uptime in seconds"""
@@ -90,13 +250,8 @@ class ApplicationMetrics:
     def reset_counters(self):
         """Reset all counters (keep start_time)"""
         logger.info("Resetting application metrics counters")
-        self.invoices_processed = 0
-        self.invoices_failed = 0
-        self.invoices_duplicates = 0
-        self.extraction_errors = 0
-        self.xml_generation_errors = 0
-        self.api_requests = 0
-        self.auth_failures = 0
+        self.registry.reset()
+        self._init_series()
         self.last_invoice_time = None
         self.last_error_time = None
 
@@ -316,7 +471,7 @@ def get_detailed_status() -> Dict[str, Any]:
         'status': overall_status,
         'timestamp': datetime.now().isoformat(),
         'customer': config.CUSTOMER_NAME,
-        'version': '2.0.0',
+        'version': APP_VERSION,
 
         # Uptime
         'uptime': {
@@ -415,59 +570,34 @@ def get_metrics() -> Dict[str, Any]:
         # Health flags (1 = healthy, 0 = unhealthy)
         'health_storage': 1 if storage['storage_healthy'] else 0,
         'health_database': 1 if database['database_healthy'] else 0,
-        'health_overall': 1 if (storage['storage_healthy'] and database['database_healthy']) else 0
+        'health_overall': 1 if (storage['storage_healthy'] and database['database_healthy']) else 0,
+
+        # Pipeline latency and invoice size (since startup)
+        'app_stage_duration_seconds': {
+            stage: histogram.summary() for (stage,), histogram in metrics.stage_seconds.children()
+        },
+        'app_invoice_pages': metrics.invoice_pages.labels().summary(),
+        'app_invoice_items': metrics.invoice_items.labels().summary()
     }
 
 
 # ============================================================================
-# PROMETHEUS FORMAT (Optional)
+# PROMETHEUS FORMAT
 # ============================================================================
 
 def get_metrics_prometheus() -> str:
     """
     Get metrics in Prometheus text format
 
+    Renders the in-memory registry - frequent scrapes stay cheap
+    regardless of database size. Only the deprecated db_invoices_total and
+    health_overall series read the small invoice_counters table and check
+    storage. All-time database totals are on /stats.
+
     Returns:
         String in Prometheus exposition format
     """
-    metrics_dict = get_metrics()
-
-    lines = [
-        '# HELP app_uptime_seconds Application uptime in seconds',
-        '# TYPE app_uptime_seconds gauge',
-        f'app_uptime_seconds {metrics_dict["uptime_seconds"]}',
-        '',
-        '# HELP app_invoices_processed_total Total invoices processed successfully since startup',
-        '# TYPE app_invoices_processed_total counter',
-        f'app_invoices_processed_total {metrics_dict["app_invoices_processed_total"]}',
-        '',
-        '# HELP app_invoices_failed_total Total invoices failed processing since startup',
-        '# TYPE app_invoices_failed_total counter',
-        f'app_invoices_failed_total {metrics_dict["app_invoices_failed_total"]}',
-        '',
-        '# HELP app_invoices_duplicates_total Total duplicate invoices detected since startup',
-        '# TYPE app_invoices_duplicates_total counter',
-        f'app_invoices_duplicates_total {metrics_dict["app_invoices_duplicates_total"]}',
-        '',
-        '# HELP db_invoices_total Total invoices in database (all-time)',
-        '# TYPE db_invoices_total gauge',
-        f'db_invoices_total {metrics_dict["db_invoices_total"]}',
-        '',
-        '# HELP system_cpu_percent CPU usage percentage',
-        '# TYPE system_cpu_percent gauge',
-        f'system_cpu_percent {metrics_dict["system_cpu_percent"] or 0}',
-        '',
-        '# HELP system_memory_percent Memory usage percentage',
-        '# TYPE system_memory_percent gauge',
-        f'system_memory_percent {metrics_dict["system_memory_percent"] or 0}',
-        '',
-        '# HELP health_overall Overall health status (1=healthy, 0=unhealthy)',
-        '# TYPE health_overall gauge',
-        f'health_overall {metrics_dict["health_overall"]}',
-        ''
-    ]
-
-    return '\n'.join(lines)
+    return metrics.registry.render()
 
 
 # ============================================================================
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier Invoice Loader - Worker Pool
+Runs blocking invoice processing off the asyncio event loop
+with bounded admission (back-pressure instead of unbounded queueing)
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.utils import config
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolFull(Exception):
+    """Raised when all workers are busy and the admission queue is full"""
+
+
+class WorkerPool:
+    """
+    Thread pool with a bounded number of admitted tasks
+
+    At most max_workers tasks run concurrently and at most max_pending
+    further tasks wait for a worker. Submitting beyond that raises
+    WorkerPoolFull so the API can answer 503 immediately.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, name: str = "invoice-worker"):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.name = name
+
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._admitted = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create executor lazily (also after shutdown)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name
+                )
+            return self._executor
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit blocking callable to the pool
+
+        Raises:
+            WorkerPoolFull: If no admission slot is free
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise WorkerPoolFull(
+                f"Worker pool '{self.name}' is full "
+                f"({self.max_workers} running, {self.max_pending} queued)"
+            )
+
+        with self._lock:
+            self._admitted += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Submit callable and await its result from async code"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _release(self):
+        with self._lock:
+            self._admitted -= 1
+        self._slots.release()
+
+    @property
+    def is_full(self) -> bool:
+        """True if the next submit would be rejected"""
+        return self._admitted >= self.max_workers + self.max_pending
+
+    @property
+    def in_flight(self) -> int:
+        """Number of admitted tasks (running + queued)"""
+        return self._admitted
+
+    def get_stats(self) -> Dict[str, int]:
+        """Pool statistics for /status and monitoring"""
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'in_flight': self._admitted,
+            'rejected_total': self._rejected
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop worker threads; pool is recreated on next submit"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info(f"Shutting down worker pool '{self.name}'")
+            executor.shutdown(wait=wait)
+
+
+# Global pool for /invoice processing
+invoice_pool = WorkerPool(config.WORKER_THREADS, config.WORKER_QUEUE_SIZE)
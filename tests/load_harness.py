@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Load-test harness for POST /invoice
+
+Replays PDFs against the app at a fixed concurrency and reports latency
+percentiles, throughput and error rates - for the whole request and for
+each pipeline stage (decode, duplicate check, PDF write, extraction,
+SQLite, ISDOC, PostgreSQL staging).
+
+In-process mode drives main.app through httpx.ASGITransport with storage
+in a temporary directory and FakePostgresStagingClient instead of
+PostgreSQL. Remote mode (base_url) only measures whole requests.
+
+CLI: scripts/load_test.py
+"""
+
+import asyncio
+import base64
+import contextlib
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import httpx
+
+# Pipeline stages - functions in invoice_processor (database.save_invoice separately)
+PIPELINE_STAGES = [
+    "decode_pdf", "check_duplicate", "write_pdf", "extract_saved_invoice",
+    "generate_isdoc", "save_to_postgres_staging",
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil (lineárna interpolácia) zo zoradených hodnôt"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class StageRecorder:
+    """Thread-safe durations and error counts per stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float, error: bool = False):
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+            if error:
+                self._errors[stage] = self._errors.get(stage, 0) + 1
+
+    def wrap(self, stage: str, fn: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                self.record(stage, time.perf_counter() - start, error=True)
+                raise
+            self.record(stage, time.perf_counter() - start)
+            return result
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            items = [(stage, sorted(values), self._errors.get(stage, 0)) for stage, values in self._durations.items()]
+        return {
+            stage: {
+                "count": len(values),
+                "errors": errors,
+                "error_rate": round(errors / len(values), 4),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+            for stage, values, errors in items
+        }
+
+
+class FakePostgresStagingClient:
+    """
+    Stand-in for PostgresStagingClient - same interface, in memory
+
+    latency_ms simulates the round trip of each statement.
+    """
+
+    latency_ms = 0.0
+    _lock = threading.Lock()
+    _next_id = 1
+    _keys = set()
+    items_inserted = 0
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def __enter__(self):
+        self._sleep()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def _sleep(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def check_duplicate_invoice(self, supplier_ico: str, invoice_number: str) -> bool:
+        self._sleep()
+        with self._lock:
+            return (supplier_ico, invoice_number) in self._keys
+
+    def insert_invoice_with_items(self, invoice_data, items_data, isdoc_xml=None) -> Optional[int]:
+        count = sum(1 for _ in items_data)
+        self._sleep()
+        cls = type(self)
+        with cls._lock:
+            cls._keys.add((invoice_data.get('supplier_ico'), invoice_data.get('invoice_number')))
+            invoice_id = cls._next_id
+            cls._next_id += 1
+            cls.items_inserted += count
+        return invoice_id
+
+    @classmethod
+    def reset(cls, latency_ms: float = 0.0):
+        with cls._lock:
+            cls.latency_ms = latency_ms
+            cls._next_id = 1
+            cls._keys = set()
+            cls.items_inserted = 0
+
+
+@contextlib.contextmanager
+def in_process_environment(storage_dir: Path, recorder: StageRecorder, pg_latency_ms: float = 0.0) -> Iterator[Any]:
+    """
+    Patch app for a local run: storage in storage_dir, fake PostgreSQL,
+    timing wrappers around pipeline stages. Yields main.app.
+    """
+    from main import app
+    from src.business import invoice_processor
+    from src.business.duplicate_check import duplicate_index
+    from src.business.idempotency import idempotency_registry
+    from src.database import database
+    from src.extractors.text_cache import text_cache
+
+    config = invoice_processor.config
+    for name in ("PDF", "XML", "TEXT_CACHE"):
+        (storage_dir / name).mkdir(parents=True, exist_ok=True)
+    FakePostgresStagingClient.reset(pg_latency_ms)
+    duplicate_index.clear()
+    idempotency_registry.clear()
+
+    with contextlib.ExitStack() as stack:
+        patch = stack.enter_context
+        patch(mock.patch.object(config, "PDF_DIR", storage_dir / "PDF"))
+        patch(mock.patch.object(config, "XML_DIR", storage_dir / "XML"))
+        patch(mock.patch.object(config, "POSTGRES_STAGING_ENABLED", True))
+        patch(mock.patch.object(database, "DB_FILE", storage_dir / "load_test.db"))
+        patch(mock.patch.object(text_cache, "cache_dir", storage_dir / "TEXT_CACHE"))
+        patch(mock.patch.object(invoice_processor, "PostgresStagingClient", FakePostgresStagingClient))
+        for stage in PIPELINE_STAGES:
+            patch(mock.patch.object(invoice_processor, stage, recorder.wrap(stage, getattr(invoice_processor, stage))))
+        patch(mock.patch.object(database, "save_invoice", recorder.wrap("save_invoice", database.save_invoice)))
+
+        database.init_database()
+        yield app
+
+
+def load_corpus(pdf_dir: Path) -> List[Tuple[str, bytes]]:
+    """(filename, content) of all PDFs in directory"""
+    return [(path.name, path.read_bytes()) for path in sorted(pdf_dir.glob("*.pdf"))]
+
+
+def synthetic_corpus(count: int, items: int = 20) -> List[Tuple[str, bytes]]:
+    """Distinct synthetic L&Š invoices (unique content and invoice numbers)"""
+    from tests.synthetic_invoices import make_invoice_pdf
+
+    corpus = []
+    for n in range(count):
+        number = str(32600000 + n)
+        pdf, _, _ = make_invoice_pdf(items, seed=n, invoice_number=number)
+        corpus.append((f"{number}_FAK.pdf", pdf))
+    return corpus
+
+
+async def run_load(
+        client: httpx.AsyncClient,
+        corpus: List[Tuple[str, bytes]],
+        requests: int,
+        concurrency: int,
+        recorder: StageRecorder,
+        api_key: str,
+        upload: str = "json"
+) -> Dict[str, Any]:
+    """
+    Send requests (round-robin over corpus) with concurrency parallel clients
+
+    upload: "json" (base64 InvoiceRequest) or "raw" (application/pdf body)
+    """
+    payloads = [(name, content, base64.b64encode(content).decode()) for name, content in corpus]
+    status_codes: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def send(index: int):
+        name, content, content_b64 = payloads[index % len(payloads)]
+        message_id = f"load-{index}-{uuid.uuid4().hex[:8]}"
+        headers = {"X-API-Key": api_key}
+        start = time.perf_counter()
+        try:
+            if upload == "raw":
+                response = await client.post(
+                    "/invoice", content=content, params={"filename": name, "message_id": message_id},
+                    headers=dict(headers, **{"Content-Type": "application/pdf"})
+                )
+            else:
+                response = await client.post(
+                    "/invoice", json={"file_b64": content_b64, "filename": name, "message_id": message_id},
+                    headers=headers
+                )
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        recorder.record("request", time.perf_counter() - start, error=status != "200")
+        status_codes[status] = status_codes.get(status, 0) + 1
+
+    async def worker():
+        for index in counter:
+            await send(index)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "upload": upload,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "status_codes": status_codes,
+        "stages": recorder.summary(),
+    }
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic L&Š invoice PDFs (no real invoices needed)
+
+Text layout follows what pdfplumber returns for real L&Š invoices,
+including the quirks ls_extractor.py handles: spaced digits in dates,
+symbols and customer IDs, two-line items, optional discount column,
+items without EAN and a table end marker that can fall on the next page.
+
+Used by unit tests and scripts/benchmark_extraction.py.
+"""
+
+import random
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+# Glyphs outside WinAnsiEncoding mapped via /Differences (codes 128+)
+_DIFFERENCES = {
+    "č": "ccaron", "Č": "Ccaron", "š": "scaron", "Š": "Scaron", "ľ": "lcaron", "Ľ": "Lcaron",
+    "ť": "tcaron", "Ť": "Tcaron", "ž": "zcaron", "Ž": "Zcaron", "ň": "ncaron", "Ň": "Ncaron", "ď": "dcaron",
+}
+_CODES = {ch: 128 + i for i, ch in enumerate(_DIFFERENCES)}
+
+LINES_PER_PAGE = 60
+
+_PRODUCTS = ["Skrutka", "Matica", "Podložka", "Kábel", "Žiarovka", "Ťažná tyč", "Lepidlo", "Čistič", "Šnúra"]
+_VARIANTS = ["M6", "M8", "biela", "čierna", "10 ks", "5 m", "Ľahká", "Ňufák"]
+_UNITS = ["KS", "KS", "KS", "L", "M", "KG"]
+_CENT = Decimal("0.01")
+_MILL = Decimal("0.001")
+
+
+def _pdf_text(line):
+    out = bytearray()
+    for ch in line:
+        if ch in _CODES:
+            out.append(_CODES[ch])
+        elif ch in "()\\":
+            out += b"\\" + ch.encode()
+        else:
+            out += ch.encode("cp1252")
+    return bytes(out)
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal PDF (Helvetica) with one text line per list item on each page"""
+    differences = " ".join(f"/{name}" for name in _DIFFERENCES.values())
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ).encode(),
+        ("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding << /Type /Encoding "
+         f"/BaseEncoding /WinAnsiEncoding /Differences [128 {differences}] >> >>").encode(),
+    ]
+    for i, lines in enumerate(pages):
+        stream = b"BT /F1 9 Tf 12 TL 40 800 Td " + b" ".join(b"(" + _pdf_text(line) + b") Tj T*" for line in lines) + b" ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def spaced(value: str) -> str:
+    """Číslice oddelené medzerami - ako ich vracia pdfplumber z L&Š faktúr"""
+    return " ".join(value)
+
+
+def invoice_lines(item_count: int, seed: int = 0, invoice_number: str = "32510374") -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Text lines of one synthetic L&Š invoice + expected extraction result
+
+    Returns:
+        (lines, expected) - expected has header values and item tuples
+        (item_code, ean_code, quantity, total_with_vat)
+    """
+    rng = random.Random(seed)
+    lines = [
+        "L & Š, s.r.o.",
+        "IČO: 36555720 DIČ: 2020204418 IČ DPH: SK2020204418",
+        f"FAKTÚRA - DAŇOVÝ DOKLAD č. {invoice_number}",
+        f"Dátum vystavenia: {spaced('16.09.2025')}",
+        f"Dátum splatnosti: {spaced('30.09.2025')}",
+        f"Dátum daňovej povinnosti: {spaced('16.09.2025')}",
+        "IBAN: SK12 0200 0000 0012 3456 7890 BIC: SUBASKBX",
+        f"Variabilný symbol: {spaced(invoice_number)}",
+        f"Konštantný symbol: {spaced('0008')}",
+        "MÁGERSTAV, spol. s r.o.",
+        f"Hlavná 1, Bratislava IČO odberateľ: {spaced('31436871')}",
+        f"DIČ odberateľ: {spaced('2020367151')}",
+        f"IČDPH odberateľ: S K {spaced('2020367151')}",
+        "č. Názov Množstvo MJ Zľava Cena/MJ bez DPH Cena/MJ s DPH Spolu s DPH",
+    ]
+
+    items = []
+    net_total = Decimal("0")
+    for n in range(1, item_count + 1):
+        quantity = rng.randint(1, 50)
+        price = Decimal(rng.randint(10, 99999)) * _MILL
+        price_vat = (price * Decimal("1.23")).quantize(_MILL)
+        total = (price_vat * quantity).quantize(_MILL)
+        discount = f"{rng.choice([5, 10, 15])}% " if rng.random() < 0.2 else ""
+        code = str(290000 + n)
+        ean = f"858{rng.randint(0, 10 ** 10 - 1):010d}" if rng.random() < 0.7 else ""
+        name = f"{rng.choice(_PRODUCTS)} {rng.choice(_VARIANTS)}"
+
+        lines.append(f"{n} {name} {quantity} {rng.choice(_UNITS)} {discount}{price} {price_vat} {total}")
+        lines.append(" ".join(part for part in (code, ean, "23%", str(price), str(price_vat)) if part))
+        items.append((code, ean, Decimal(quantity), total))
+        net_total += price * quantity
+
+    net = net_total.quantize(_CENT)
+    tax = (net * Decimal("0.23")).quantize(_CENT)
+    lines += [
+        "23 %",
+        f"Základ DPH {spaced(str(net))} EUR",
+        f"DPH {tax} EUR",
+        f"Celkom k úhrade {net + tax} EUR",
+    ]
+
+    expected = {
+        "invoice_number": invoice_number,
+        "issue_date": "16.09.2025",
+        "customer_ico": "31436871",
+        "net_amount": net,
+        "tax_amount": tax,
+        "total_amount": net + tax,
+        "items": items,
+    }
+    return lines, expected
+
+
+def paginate(lines: List[str], lines_per_page: int = LINES_PER_PAGE) -> List[List[str]]:
+    return [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+
+
+def make_invoice_pdf(item_count: int, seed: int = 0, **kwargs) -> Tuple[bytes, List[List[str]], Dict[str, Any]]:
+    """PDF bytes, page lines and expected values of a synthetic invoice"""
+    lines, expected = invoice_lines(item_count, seed, **kwargs)
+    pages = paginate(lines)
+    expected["pages"] = len(pages)
+    return make_pdf(pages), pages, expected
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for re-extraction backfill (without real PDF extraction)
+"""
+
+from decimal import Decimal
+
+import pytest
+
+
+@pytest.fixture
+def backfill_env(tmp_path, monkeypatch):
+    """Database with 5 stored invoices and fake extraction"""
+    from src.business import backfill
+    from src.database import database
+    from src.extractors.ls_extractor import InvoiceData
+
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "backfill_test.db")
+    monkeypatch.setattr(backfill.config, "PDF_DIR", tmp_path / "PDF")
+    (tmp_path / "PDF").mkdir()
+    database.init_database()
+
+    invoices = []
+    for n in range(1, 6):
+        pdf_path = tmp_path / "PDF" / f"invoice_{n}.pdf"
+        pdf_path.write_bytes(f"invoice:{n}".encode())
+        invoices.append({
+            'invoice_number': f"OLD{n}",
+            'total_amount': 10.0 * n,
+            'file_path': str(pdf_path),
+            'file_hash': f"hash{n}"
+        })
+    # Invoice 4 was stored with a path from the old server
+    invoices[3]['file_path'] = r"C:\NEX\IMPORT\LS\PDF\invoice_4.pdf"
+    # Invoice 5 PDF is gone
+    (tmp_path / "PDF" / "invoice_5.pdf").unlink()
+    database.save_invoices_batch(invoices)
+
+    extracted = []
+
+    def fake_extract(pdf_path, file_hash=None, required_fields=()):
+        extracted.append(file_hash)
+        n = int(open(pdf_path).read().split(":")[1])
+        if n == 1:
+            # Unchanged
+            return InvoiceData(invoice_number="OLD1", total_amount=Decimal("10.00"))
+        if n == 3:
+            return None
+        return InvoiceData(invoice_number=f"NEW{n}", total_amount=Decimal("99.90"))
+
+    monkeypatch.setattr(backfill, "extract_invoice_header", fake_extract)
+    return tmp_path, extracted
+
+
+def test_backfill_updates_changed_invoices(backfill_env):
+    """Test diff, batched update and statistics"""
+    from src.business import backfill
+    from src.database import database
+
+    tmp_path, _ = backfill_env
+    report_path = tmp_path / "diff.csv"
+
+    stats = backfill.run_backfill(tmp_path / "checkpoint.json", workers=2, batch_size=2, report_path=report_path)
+
+    assert (stats.processed, stats.changed, stats.unchanged, stats.failed, stats.missing_pdf) == (5, 2, 1, 1, 1)
+
+    rows = {row['id']: row for row in database.get_invoices_after(0, 10)}
+    assert rows[1]['invoice_number'] == "OLD1"
+    assert rows[2]['invoice_number'] == "NEW2"
+    assert rows[2]['total_amount'] == pytest.approx(99.9)
+    assert rows[3]['invoice_number'] == "OLD3"
+    assert rows[4]['invoice_number'] == "NEW4"
+
+    report = report_path.read_text(encoding="utf-8").splitlines()
+    assert report[0].startswith("id,pdf_path")
+    # 2 changes, failed invoice 3, missing PDF of invoice 5
+    assert len(report) == 5
+    assert report[2].startswith("3,") and report[2].endswith(",failed")
+    assert report[4].endswith(",missing_pdf")
+
+
+def test_backfill_retries_failed_invoices(backfill_env, monkeypatch):
+    """Test failed extraction is kept in checkpoint and retried next run"""
+    from src.business import backfill
+    from src.database import database
+    from src.extractors.ls_extractor import InvoiceData
+
+    tmp_path, extracted = backfill_env
+    checkpoint = tmp_path / "checkpoint.json"
+
+    stats = backfill.run_backfill(checkpoint, workers=2, batch_size=2)
+    assert stats.failed_ids == [3]
+    assert backfill.load_checkpoint(checkpoint).failed_ids == [3]
+
+    def fixed_extract(pdf_path, file_hash=None, required_fields=()):
+        extracted.append(file_hash)
+        return InvoiceData(invoice_number="NEW3", total_amount=Decimal("30.00"))
+
+    monkeypatch.setattr(backfill, "extract_invoice_header", fixed_extract)
+    extracted.clear()
+    stats = backfill.run_backfill(checkpoint, workers=2, batch_size=2)
+
+    assert extracted == ["hash3"]
+    assert (stats.processed, stats.failed, stats.failed_ids) == (5, 0, [])
+    assert database.get_invoices_after(2, 1)[0]['invoice_number'] == "NEW3"
+
+
+def test_diff_invoice_keeps_stored_values_for_empty_fields():
+    """Test weaker re-extraction does not overwrite stored data"""
+    from src.business.backfill import diff_invoice
+    from src.extractors.ls_extractor import InvoiceData
+
+    row = {'id': 7, 'invoice_number': "1001", 'total_amount': 12.3}
+
+    assert diff_invoice(row, InvoiceData(invoice_number="", total_amount=Decimal("0"))) is None
+    assert diff_invoice(row, InvoiceData(invoice_number="", total_amount=Decimal("15.00"))) == {
+        'id': 7, 'invoice_number': None, 'total_amount': 15.0
+    }
+    assert diff_invoice(row, InvoiceData(invoice_number="1002", total_amount=None)) == {
+        'id': 7, 'invoice_number': "1002", 'total_amount': None
+    }
+
+
+def test_backfill_resumes_from_checkpoint(backfill_env, monkeypatch):
+    """Test interrupted run continues after last finished chunk"""
+    from src.business import backfill
+    from src.database import database
+
+    tmp_path, extracted = backfill_env
+    checkpoint = tmp_path / "checkpoint.json"
+
+    original_update = database.update_extracted_fields
+    calls = []
+
+    def failing_update(updates):
+        calls.append(updates)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return original_update(updates)
+
+    monkeypatch.setattr(database, "update_extracted_fields", failing_update)
+    with pytest.raises(RuntimeError):
+        backfill.run_backfill(checkpoint, workers=2, batch_size=2)
+
+    assert backfill.load_checkpoint(checkpoint).last_id == 2
+
+    monkeypatch.setattr(database, "update_extracted_fields", original_update)
+    extracted.clear()
+    stats = backfill.run_backfill(checkpoint, workers=2, batch_size=2)
+
+    # Only invoices 3-5 extracted again (5 has no PDF)
+    assert sorted(extracted) == ["hash3", "hash4"]
+    assert stats.processed == 5
+    assert stats.last_id == 5
+    assert database.get_invoices_after(3, 1)[0]['invoice_number'] == "NEW4"
+
+
+def test_backfill_dry_run_and_limit(backfill_env):
+    """Test dry run reports but does not write database or checkpoint"""
+    from src.business import backfill
+    from src.database import database
+
+    tmp_path, _ = backfill_env
+    checkpoint = tmp_path / "checkpoint.json"
+
+    stats = backfill.run_backfill(checkpoint, workers=1, batch_size=10, dry_run=True, limit=2)
+
+    assert stats.processed == 2
+    assert stats.changed == 1
+    assert not checkpoint.exists()
+    assert database.get_invoices_after(1, 1)[0]['invoice_number'] == "OLD2"
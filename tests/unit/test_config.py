@@ -156,6 +156,18 @@ def test_config_environment_variable_override():
             del sys.modules[module_name]
 
 
+def test_config_template_uses_shared_performance_defaults():
+    """Test that the template takes performance settings from config_defaults"""
+    from src.utils.config_defaults import performance_defaults
+
+    template = Path(__file__).resolve().parents[2] / "config" / "config_template.py"
+    source = template.read_text(encoding="utf-8")
+
+    assert "_DEFAULTS = performance_defaults(STORAGE_BASE)" in source
+    for name in performance_defaults(Path("storage")):
+        assert f'{name} = _DEFAULTS["{name}"]' in source, name
+
+
 def test_config_log_level_valid():
     """Test that LOG_LEVEL is a valid logging level"""
     from src.utils import config
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for SQLite access layer (per-thread WAL connections)
+"""
+
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Empty database in temporary directory"""
+    from src.database import database
+
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "database_test.db")
+    database.init_database()
+    yield database
+    database.close_connections()
+
+
+def test_connection_is_reused_per_thread_in_wal_mode(db):
+    """Test one WAL connection per thread, new one in another thread"""
+    conn = db.get_connection()
+
+    assert db.get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db.SQLITE_BUSY_TIMEOUT_MS
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+    db.close_connections()
+    assert db.get_connection() is not conn
+
+
+def test_failed_write_is_rolled_back(db):
+    """Test that a failed insert leaves no open transaction on the reused connection"""
+    import sqlite3
+
+    db.insert_invoice(file_hash="h1", pdf_path="/tmp/a.pdf", original_filename="a.pdf")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.insert_invoice(file_hash="h1", pdf_path="/tmp/b.pdf", original_filename="b.pdf")
+
+    assert not db.get_connection().in_transaction
+    assert db.get_stats()["total"] == 1
+
+
+def test_reader_sees_committed_rows_during_write(db):
+    """Test WAL reader on another thread is not blocked by an open write transaction"""
+    db.insert_invoice(file_hash="h1", pdf_path="/tmp/a.pdf", original_filename="a.pdf")
+
+    totals = []
+
+    def update_and_read(cursor):
+        cursor.execute("UPDATE invoices SET status = 'processing'")
+        reader = threading.Thread(target=lambda: totals.append(db.get_stats()["by_status"]))
+        reader.start()
+        reader.join(timeout=2)
+
+    db._write(update_and_read)
+
+    assert totals == [{"received": 1}]
+
+
+def test_save_invoice_is_single_insert(db, monkeypatch):
+    """Test complete record (header fields included) is written by one INSERT"""
+    monkeypatch.setattr(db.write_queue, "enabled", False)
+    statements = []
+    db.get_connection().set_trace_callback(statements.append)
+
+    invoice_id = db.save_invoice(
+        "C", "1001", "16.09.2025", 12.3, "/tmp/a.pdf", "h1",
+        message_id="m1", sender="dodavatel@example.sk", due_date="30.09.2025",
+        tax_amount=2.05, net_amount=10.25, variable_symbol="1001"
+    )
+    db.get_connection().set_trace_callback(None)
+
+    # Trigger programs (invoice_counters) are traced with their parent statement
+    writes = {s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE"))}
+    assert len(writes) == 1 and writes.pop().lstrip().startswith("INSERT INTO invoices")
+
+    invoice = db.get_invoice_by_id(invoice_id)
+    assert invoice["invoice_number"] == "1001"
+    assert invoice["status"] == "received"
+    assert invoice["sender"] == "dodavatel@example.sk"
+    assert (invoice["due_date"], invoice["variable_symbol"]) == ("30.09.2025", "1001")
+    assert (invoice["net_amount"], invoice["tax_amount"], invoice["total_amount"]) == (10.25, 2.05, 12.3)
+
+
+def test_migrations_run_once_and_adopt_legacy_database(tmp_path):
+    """Test migrations are recorded in schema_version and not re-applied"""
+    import sqlite3
+    from src.database import migrations
+
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    # Database created by init_database() before versioned migrations
+    migrations._initial_schema(conn.cursor())
+    conn.execute("INSERT INTO invoices (file_hash, pdf_path, created_at) VALUES ('h1', '/tmp/a.pdf', 1)")
+    conn.commit()
+
+    assert migrations.migrate(conn) == [version for version, _, _ in migrations.MIGRATIONS]
+    assert migrations.migrate(conn) == []
+    assert migrations.get_schema_version(conn) == migrations.LATEST_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0] == 1
+    conn.close()
+
+
+def test_save_invoice_runs_no_ddl(db, monkeypatch):
+    """Test request-path writes do not touch the schema"""
+    monkeypatch.setattr(db.write_queue, "enabled", False)
+    statements = []
+    db.get_connection().set_trace_callback(statements.append)
+
+    db.save_invoice("C", "1001", "16.09.2025", 12.3, "/tmp/a.pdf", "h1")
+    db.get_stats()
+    db.get_connection().set_trace_callback(None)
+
+    assert not [s for s in statements if s.lstrip().upper().startswith(("CREATE", "ALTER", "DROP"))]
+
+
+def test_stats_counters_follow_invoice_writes(db):
+    """Test invoice_counters track inserts, status changes and direct deletes"""
+    first = db.save_invoice("A", "1", "01.01.2025", 1.0, "/tmp/a.pdf", "h1")
+    db.save_invoice("A", "2", "01.01.2025", 2.0, "/tmp/b.pdf", "h2", status="processed")
+    db.insert_invoice(file_hash="h3", pdf_path="/tmp/c.pdf", original_filename="c.pdf", customer_name="B")
+    db.update_nex_genesis_status(first, "NEX-1")
+
+    def insert_and_delete(cursor):
+        cursor.execute("INSERT INTO invoices (file_hash, pdf_path, created_at, is_duplicate) VALUES ('h4', '/tmp/d.pdf', 1, 1)")
+        cursor.execute("DELETE FROM invoices WHERE file_hash = 'h2'")
+
+    db._write(insert_and_delete)
+
+    stats = db.get_stats()
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"received": 3}
+    assert stats["by_nex_status"] == {"synced": 1, "pending": 2}
+    assert stats["by_customer"] == {"A": 1, "B": 1, None: 1}
+    assert stats["duplicates"] == 1
+    assert db.get_stats("A")["by_customer"] == {"A": 1}
+    assert db.get_customer_list() == ["A", "B"]
+
+    # Counters equal a full recount
+    assert db.reconcile_stats()["before"] == stats
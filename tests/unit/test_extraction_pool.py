@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for PDF extraction process pool and extracted text cache
+"""
+
+import pytest
+
+from tests.synthetic_invoices import make_pdf
+
+
+@pytest.fixture(autouse=True)
+def text_cache_dir(tmp_path, monkeypatch):
+    """Keep text cache of this process in tmp_path"""
+    from src.extractors.text_cache import text_cache
+
+    monkeypatch.setattr(text_cache, "cache_dir", tmp_path / "text_cache")
+    return tmp_path / "text_cache"
+
+
+def test_disabled_pool_extracts_in_process(monkeypatch):
+    """Test EXTRACTION_PROCESSES=0 keeps extraction in calling thread"""
+    from src.extractors import ls_extractor
+    from src.extractors.extraction_pool import ExtractionPool
+
+    pool = ExtractionPool(processes=0, max_tasks_per_child=10)
+    monkeypatch.setattr("src.extractors.extraction_pool.extraction_pool", pool)
+
+    calls = []
+    monkeypatch.setattr(
+        ls_extractor, "extract_invoice_data_local",
+        lambda path, file_hash=None, mode="full", required_fields=(), first_page=None: calls.append(path)
+    )
+
+    ls_extractor.extract_invoice_data("/tmp/missing.pdf")
+
+    assert calls == ["/tmp/missing.pdf"]
+    assert pool.get_stats()["running"] is False
+
+
+def test_pool_extracts_in_worker_process_and_recycles(tmp_path):
+    """Test extraction runs in worker process with max tasks per child"""
+    from src.extractors.extraction_pool import ExtractionPool
+
+    pool = ExtractionPool(processes=1, max_tasks_per_child=1)
+    try:
+        # Missing/invalid PDF - extractor logs error and returns None
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+
+        assert pool.extract(str(broken)) is None
+        assert pool.extract(str(tmp_path / "missing.pdf")) is None
+
+        stats = pool.get_stats()
+        assert stats["tasks_total"] == 2
+        assert stats["running"] is True
+        assert stats["restarts"] == 0
+    finally:
+        pool.shutdown()
+
+    assert pool.get_stats()["running"] is False
+
+
+INVOICE_PAGES = [
+    [
+        "L & Š, s.r.o.",
+        "FAKTÚRA - DAŇOVÝ DOKLAD č. 32510374",
+        "Dátum vystavenia: 16.09.2025",
+        "MÁGERSTAV, spol. s r.o.",
+        "Hlavná 1 IČO odberateľ: 31436871",
+        "č. Názov Množstvo MJ Zľava Cena/MJ bez DPH Cena/MJ s DPH Spolu s DPH",
+        "1 Akcia KO 3 KS 0.010 0.012 0.037",
+        "293495 23% 0.010 0.012",
+    ],
+    [
+        "2 Skrutka 10 KS 0.100 0.123 1.230",
+        "293496 8586000123456 23% 0.100 0.123",
+        "23 %",
+    ],
+    [
+        "Základ DPH 1.01 EUR",
+        "DPH 0.23 EUR",
+        "Celkom k úhrade 1.24 EUR",
+    ],
+]
+
+
+def test_item_parser_fed_by_pages_matches_whole_text():
+    """Test streaming item parser gives same items as whole text"""
+    from src.extractors.ls_extractor import ItemTableParser, LSInvoiceExtractor
+
+    extractor = LSInvoiceExtractor()
+    pages = ["\n".join(lines) + "\n" for lines in INVOICE_PAGES]
+
+    parser = ItemTableParser(extractor._parse_decimal)
+    streamed = []
+    for page in pages:
+        streamed.extend(parser.feed(page))
+    streamed.extend(parser.close())
+
+    whole = extractor._extract_items("".join(pages))
+
+    assert streamed == whole
+    assert [item.item_code for item in streamed] == ["293495", "293496"]
+    assert streamed[1].ean_code == "8586000123456"
+
+
+def test_page_parallel_extraction_matches_serial(tmp_path, monkeypatch):
+    """Test page-parallel extraction returns same data as serial extraction"""
+    from src.extractors import extraction_pool as pool_module
+    from src.extractors.ls_extractor import extract_invoice_data_local
+
+    pdf_path = tmp_path / "long.pdf"
+    pdf_path.write_bytes(make_pdf(INVOICE_PAGES))
+
+    monkeypatch.setattr(pool_module.config, "EXTRACTION_PAGE_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(pool_module.config, "EXTRACTION_PAGES_PER_TASK", 1)
+
+    pool = pool_module.ExtractionPool(processes=2, max_tasks_per_child=0)
+    try:
+        parallel = pool.extract(str(pdf_path))
+        assert pool.get_stats()["page_parallel_total"] == 1
+    finally:
+        pool.shutdown()
+
+    serial = extract_invoice_data_local(str(pdf_path))
+
+    assert parallel == serial
+    assert parallel.invoice_number == "32510374"
+    assert str(parallel.total_amount) == "1.24"
+    assert len(parallel.items) == 2
+
+
+def test_header_only_and_first_page_modes_stop_early(tmp_path, monkeypatch):
+    """Test header_only reads pages only until duplicate-check fields are found"""
+    from src.extractors import ls_extractor
+
+    monkeypatch.setattr(ls_extractor.text_cache, "enabled", False)
+    first_page = INVOICE_PAGES[0][:1] + ["IČO: 36555720 DIČ: 2020204418"] + INVOICE_PAGES[0][1:]
+    filler = [f"{n} Položka {n} 1 KS 0.010 0.012 0.012" for n in range(3, 40)]
+    pages = [first_page] + [filler] * 20 + INVOICE_PAGES[1:]
+    pdf_path = tmp_path / "long.pdf"
+    pdf_path.write_bytes(make_pdf(pages))
+
+    read = []
+    iter_page_texts = ls_extractor.iter_page_texts
+
+    def counting_page_texts(*args, **kwargs):
+        for text in iter_page_texts(*args, **kwargs):
+            read.append(text)
+            yield text
+
+    monkeypatch.setattr(ls_extractor, "iter_page_texts", counting_page_texts)
+    extractor = ls_extractor.LSInvoiceExtractor()
+
+    header = extractor.extract_from_pdf(str(pdf_path), mode=ls_extractor.MODE_HEADER_ONLY)
+    assert (header.supplier_ico, header.invoice_number) == ("36555720", "32510374")
+    assert header.items == []
+    assert len(read) == 1
+
+    # Fields missing on page 1 - reads until found (total is on the last page)
+    read.clear()
+    header = extractor.extract_from_pdf(str(pdf_path), mode="header_only", required_fields=("total_amount",))
+    assert str(header.total_amount) == "1.24"
+    assert len(read) == len(pages)
+
+    # first_page lays out page 1 only (same read as routing)
+    read.clear()
+    read_first_page = ls_extractor.read_first_page
+    monkeypatch.setattr(
+        ls_extractor, "read_first_page",
+        lambda path: read.append(path) or read_first_page(path)
+    )
+    first = extractor.extract_from_pdf(str(pdf_path), mode=ls_extractor.MODE_FIRST_PAGE)
+    assert read == [str(pdf_path)]
+    assert [item.item_code for item in first.items] == ["293495"]
+
+    read.clear()
+    full = extractor.extract_from_pdf(str(pdf_path))
+    assert len(read) == len(pages)
+    assert len(full.items) == 2 + 20 * len(filler)
+    assert full.invoice_number == header.invoice_number
+
+
+def test_text_cache_skips_pdfplumber_on_reextraction(tmp_path, monkeypatch, text_cache_dir):
+    """Test second extraction of same PDF uses cached page texts"""
+    from src.extractors import ls_extractor
+    from src.extractors.text_cache import file_md5, text_cache
+
+    pdf_path = tmp_path / "cached.pdf"
+    pdf_path.write_bytes(make_pdf(INVOICE_PAGES))
+    file_hash = file_md5(str(pdf_path))
+
+    first = ls_extractor.extract_invoice_data_local(str(pdf_path), file_hash)
+    assert text_cache.contains(file_hash)
+    assert list(text_cache_dir.rglob("*.json.gz"))
+
+    def no_pdfplumber(*args, **kwargs):
+        raise AssertionError("pdfplumber must not run for cached PDF")
+
+    monkeypatch.setattr(ls_extractor, "iter_page_texts", no_pdfplumber)
+
+    # Hash computed from file when caller does not pass it
+    second = ls_extractor.extract_invoice_data_local(str(pdf_path))
+    assert second == first
+    assert text_cache.get(file_hash) == ["\n".join(lines) for lines in INVOICE_PAGES]
+
+
+def test_text_cache_ignores_corrupted_entry(text_cache_dir):
+    """Test invalid cache file is treated as miss"""
+    from src.extractors.text_cache import PageTextCache
+
+    cache = PageTextCache(text_cache_dir)
+    cache.put("ab" * 16, ["page 1", "page 2"])
+    assert cache.get("ab" * 16) == ["page 1", "page 2"]
+
+    next(text_cache_dir.rglob("*.json.gz")).write_bytes(b"not gzip")
+    assert cache.get("ab" * 16) is None
+    assert cache.get_stats()["misses"] == 1
+
+    disabled = PageTextCache(text_cache_dir, enabled=False)
+    disabled.put("cd" * 16, ["x"])
+    assert disabled.get("cd" * 16) is None
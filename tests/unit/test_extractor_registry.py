@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for extractor registry routing
+"""
+
+LS_FIRST_PAGE = """L & Š, s.r.o.
+IČO: 36555720 DIČ: 2020204418 IČ DPH: SK2020204418
+FAKTÚRA - DAŇOVÝ DOKLAD č. 32510374
+"""
+
+
+def make_registry():
+    from src.extractors.base_extractor import BaseExtractor
+    from src.extractors.generic_extractor import GenericExtractor
+    from src.extractors.ls_extractor import LSInvoiceExtractor
+    from src.extractors.registry import ExtractorRegistry
+
+    class OtherExtractor(BaseExtractor):
+        supplier_icos = ("12345678",)
+        producer_markers = ("OtherERP",)
+
+        def __init__(self):
+            super().__init__()
+            self.supplier_name = "Other"
+
+        def extract_from_pdf(self, pdf_path):
+            return None
+
+    registry = ExtractorRegistry(fallback=GenericExtractor())
+    registry.register(LSInvoiceExtractor())
+    registry.register(OtherExtractor())
+    return registry
+
+
+def test_select_by_first_page_and_metadata():
+    """Test extractor is chosen by IČO, header marker or PDF producer"""
+    registry = make_registry()
+
+    assert registry.select(LS_FIRST_PAGE, {}).supplier_name == "L&Š"
+    # pdfplumber may split the name and IČO by spaces
+    assert registry.select("L &  Š , s.r.o.\nIČO: 3655 5720", {}).supplier_name == "L&Š"
+    assert registry.select("Faktúra 1\nIČO: 12345678", {}).supplier_name == "Other"
+    assert registry.select("Faktúra 1", {"Producer": "OtherERP 5.1"}).supplier_name == "Other"
+    assert registry.select("Faktúra 1", {"Producer": "LibreOffice"}).supplier_name == "Generic"
+
+
+def test_route_reads_only_cached_first_page(tmp_path, monkeypatch):
+    """Test routing uses cached page texts without opening the PDF"""
+    from src.extractors import registry as registry_module
+    from src.extractors.text_cache import text_cache
+
+    monkeypatch.setattr(text_cache, "cache_dir", tmp_path)
+    monkeypatch.setattr(text_cache, "enabled", True)
+    text_cache.put("abc123", ["Faktúra 1\nIČO: 12345678", LS_FIRST_PAGE])
+
+    def fail_read(pdf_path):
+        raise AssertionError("PDF should not be opened")
+
+    monkeypatch.setattr(registry_module, "read_fingerprint", fail_read)
+    monkeypatch.setattr(registry_module.extraction_pool, "processes", 0)
+    registry = make_registry()
+
+    assert registry.route("/missing.pdf", "abc123").supplier_name == "Other"
+    # Unreadable PDF without cache goes to fallback
+    assert registry.route("/missing.pdf").supplier_name == "Generic"
+    assert registry.get_stats()["routed"] == {"Other": 1, "Generic": 1}
+
+
+def test_routing_text_is_reused_by_extraction(tmp_path, monkeypatch):
+    """Test page 1 is laid out once - for routing - and its text feeds the extraction"""
+    import pdfplumber.page
+    from src.extractors import registry as registry_module
+    from src.extractors.text_cache import text_cache
+    from tests.synthetic_invoices import make_invoice_pdf
+
+    monkeypatch.setattr(text_cache, "enabled", False)
+    monkeypatch.setattr(registry_module.extraction_pool, "processes", 0)
+    pdf_path = tmp_path / "invoice.pdf"
+    pdf_bytes, pages, _ = make_invoice_pdf(150, seed=1)
+    pdf_path.write_bytes(pdf_bytes)
+
+    laid_out = []
+    extract_text = pdfplumber.page.Page.extract_text
+
+    def counting_extract_text(page, *args, **kwargs):
+        laid_out.append(page.page_number)
+        return extract_text(page, *args, **kwargs)
+
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_text", counting_extract_text)
+    registry = make_registry()
+
+    data = registry.extract(str(pdf_path))
+
+    assert data.supplier_ico == "36555720"
+    assert len(data.items) == 150
+    assert laid_out == list(range(1, len(pages) + 1))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for idempotent /invoice request handling
+"""
+
+import asyncio
+
+import pytest
+
+
+def test_concurrent_requests_coalesce():
+    """Test that concurrent requests with same key run once"""
+    from src.business.idempotency import IdempotencyRegistry
+
+    registry = IdempotencyRegistry(max_size=10, ttl_seconds=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 200, {"invoice_number": "1001"}
+
+    async def scenario():
+        return await asyncio.gather(*(registry.execute("key-1", factory) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(outcome == (200, {"invoice_number": "1001"}) for outcome, _ in results)
+    assert [replayed for _, replayed in results].count(False) == 1
+    assert registry.get_stats()["coalesced"] == 4
+
+
+def test_completed_response_is_replayed():
+    """Test that later retry gets cached response"""
+    from src.business.idempotency import IdempotencyRegistry
+
+    registry = IdempotencyRegistry(max_size=10, ttl_seconds=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return 202, {"job_id": "abc"}
+
+    first, replayed_first = asyncio.run(registry.execute("key-2", factory))
+    second, replayed_second = asyncio.run(registry.execute("key-2", factory))
+
+    assert first == second == (202, {"job_id": "abc"})
+    assert (replayed_first, replayed_second) == (False, True)
+    assert len(calls) == 1
+
+
+def test_errors_are_shared_but_not_cached():
+    """Test that failure propagates to waiters and retry runs again"""
+    from src.business.idempotency import IdempotencyRegistry
+
+    registry = IdempotencyRegistry(max_size=10, ttl_seconds=60)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("extraction failed")
+
+    async def scenario():
+        return await asyncio.gather(
+            registry.execute("key-3", failing),
+            registry.execute("key-3", failing),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(calls) == 1
+
+    with pytest.raises(ValueError):
+        asyncio.run(registry.execute("key-3", failing))
+    assert len(calls) == 2
+
+
+def test_expired_response_is_not_replayed():
+    """Test TTL expiry of cached responses"""
+    from src.business.idempotency import IdempotencyRegistry
+
+    registry = IdempotencyRegistry(max_size=10, ttl_seconds=-1)
+
+    async def factory():
+        return 200, {}
+
+    asyncio.run(registry.execute("key-4", factory))
+    _, replayed = asyncio.run(registry.execute("key-4", factory))
+
+    assert replayed is False
+
+
+def test_cancelled_caller_does_not_cancel_execution():
+    """Test that a disconnected first caller leaves the execution running"""
+    from src.business.idempotency import IdempotencyRegistry
+
+    registry = IdempotencyRegistry(max_size=10, ttl_seconds=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 200, {"invoice_number": "1002"}
+
+    async def scenario():
+        first = asyncio.ensure_future(registry.execute("key-5", factory))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(registry.execute("key-5", factory))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        # Retry after the disconnect joins the running execution
+        assert registry.get_stats()["in_flight"] == 1
+        retry = await registry.execute("key-5", factory)
+        return first, await waiter, retry
+
+    first, waiter, retry = asyncio.run(scenario())
+
+    assert first.cancelled()
+    assert waiter == retry == ((200, {"invoice_number": "1002"}), True)
+    assert len(calls) == 1
+    assert registry.get_stats()["in_flight"] == 0
+
+
+def test_default_key_uses_message_id_and_hash():
+    """Test default idempotency key composition"""
+    import base64
+    import hashlib
+    from src.business.idempotency import default_key, pdf_hash_b64
+
+    assert default_key("msg-1", pdf_hash_b64("QUJD")) == default_key("msg-1", pdf_hash_b64("QUJD"))
+    assert default_key("msg-1", pdf_hash_b64("QUJD")) != default_key("msg-2", pdf_hash_b64("QUJD"))
+    assert default_key(None, "abc") == ":abc"
+
+    # Same key as a raw upload of the same PDF (MD5 of the bytes)
+    pdf = b"%PDF-1.4 invoice"
+    assert pdf_hash_b64(base64.b64encode(pdf).decode()) == hashlib.md5(pdf).hexdigest()
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for invoice processing pipeline (without real PDF extraction)
+"""
+
+import base64
+from decimal import Decimal
+
+import pytest
+
+
+@pytest.fixture
+def pipeline_env(tmp_path, monkeypatch):
+    """Temporary storage, database and fake extraction/ISDOC"""
+    from src.business import invoice_processor
+    from src.business.idempotency import idempotency_registry
+    from src.database import database
+    from src.extractors.ls_extractor import InvoiceData
+
+    # Patch the config module the pipeline actually uses
+    config = invoice_processor.config
+    (tmp_path / "PDF").mkdir()
+    (tmp_path / "XML").mkdir()
+    monkeypatch.setattr(config, "PDF_DIR", tmp_path / "PDF")
+    monkeypatch.setattr(config, "XML_DIR", tmp_path / "XML")
+    monkeypatch.setattr(config, "POSTGRES_STAGING_ENABLED", False)
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "pipeline_test.db")
+    database.init_database()
+    invoice_processor.duplicate_index.clear()
+    idempotency_registry.clear()
+
+    def fake_extract(pdf_path, file_hash=None):
+        content = open(pdf_path, "rb").read()
+        if content.startswith(b"broken"):
+            return None
+        return InvoiceData(
+            invoice_number=content.decode().split(":")[1],
+            issue_date="16.09.2025",
+            due_date="30.09.2025",
+            total_amount=Decimal("12.30"),
+            tax_amount=Decimal("2.05"),
+            net_amount=Decimal("10.25"),
+            variable_symbol="1001",
+            customer_name="Test Customer"
+        )
+
+    monkeypatch.setattr(invoice_processor, "extract_invoice_data", fake_extract)
+    monkeypatch.setattr(invoice_processor, "generate_isdoc_xml", lambda data, path: "<Invoice/>")
+    return tmp_path
+
+
+def make_request(content: bytes, filename="invoice.pdf"):
+    from src.api.models import InvoiceRequest
+
+    return InvoiceRequest(file_b64=base64.b64encode(content).decode(), filename=filename)
+
+
+def test_process_invoice_request(pipeline_env):
+    """Test single invoice pipeline result"""
+    from src.business.invoice_processor import process_invoice_request
+    from src.database import database
+
+    result = process_invoice_request(make_request(b"invoice:1001"))
+
+    assert result["success"] is True
+    assert result["invoice_number"] == "1001"
+    assert result["total_amount"] == 12.30
+    assert database.get_stats()["total"] == 1
+
+    invoice = database.get_all_invoices()[0]
+    assert invoice["due_date"] == "30.09.2025"
+    assert (invoice["net_amount"], invoice["tax_amount"], invoice["total_amount"]) == (10.25, 2.05, 12.30)
+    assert invoice["variable_symbol"] == "1001"
+
+
+def test_pipeline_stages_are_timed(pipeline_env):
+    """Test that every stage of a single invoice lands in stage histograms"""
+    from src.business.invoice_processor import process_invoice_request
+    from src.utils import monitoring
+
+    stage_seconds = monitoring.metrics.stage_seconds
+    before = {stage: stage_seconds.labels(stage).count for stage in monitoring.PIPELINE_STAGES}
+    items_before = monitoring.metrics.invoice_items.labels().count
+    processed_before = monitoring.metrics.invoices_processed
+
+    process_invoice_request(make_request(b"invoice:1002"))
+
+    for stage in ("decode", "duplicate_check", "write_pdf", "extract", "sqlite", "isdoc"):
+        assert stage_seconds.labels(stage).count == before[stage] + 1, stage
+    # PostgreSQL staging disabled - not timed
+    assert stage_seconds.labels("postgres").count == before["postgres"]
+    assert monitoring.metrics.invoice_items.labels().count == items_before + 1
+    assert monitoring.metrics.invoices_processed == processed_before + 1
+
+
+def test_duplicate_pdf_skips_extraction(pipeline_env, monkeypatch):
+    """Test that redelivered PDF returns stored result without extraction"""
+    from src.business import invoice_processor
+    from src.database import database
+    from src.utils import monitoring
+
+    first = invoice_processor.process_invoice_request(make_request(b"invoice:1501"))
+
+    def fail_extract(pdf_path):
+        raise AssertionError("Extraction must be skipped for duplicates")
+
+    monkeypatch.setattr(invoice_processor, "extract_invoice_data", fail_extract)
+    duplicates_before = monitoring.metrics.invoices_duplicates
+
+    # From in-memory cache
+    second = invoice_processor.process_invoice_request(make_request(b"invoice:1501"))
+    assert second["duplicate"] is True
+    assert second["invoice_number"] == first["invoice_number"]
+
+    # From SQLite (cache cleared, e.g. after restart)
+    invoice_processor.duplicate_index.clear()
+    third = invoice_processor.process_invoice_request(make_request(b"invoice:1501"))
+    assert third["duplicate"] is True
+    assert third["pdf_saved"] == first["pdf_saved"]
+
+    assert monitoring.metrics.invoices_duplicates == duplicates_before + 2
+    assert database.get_stats()["total"] == 1
+    assert len(list((pipeline_env / "PDF").iterdir())) == 1
+
+
+def test_concurrent_duplicate_pdfs_share_one_extraction(pipeline_env, monkeypatch):
+    """Test that identical PDFs uploaded concurrently are extracted once"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from src.api.models import InvoiceRequest
+    from src.business import invoice_processor
+    from src.database import database
+
+    extract = invoice_processor.extract_invoice_data
+    calls = []
+    release = threading.Event()
+
+    def slow_extract(pdf_path, file_hash=None):
+        calls.append(pdf_path)
+        release.wait(5)
+        return extract(pdf_path, file_hash)
+
+    monkeypatch.setattr(invoice_processor, "extract_invoice_data", slow_extract)
+    pdf_b64 = base64.b64encode(b"invoice:1601").decode()
+    requests = [InvoiceRequest(file_b64=pdf_b64, message_id=f"msg-{n}") for n in range(4)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(invoice_processor.process_invoice_request, r) for r in requests]
+        # Let the other requests reach the in-flight claim
+        while invoice_processor.duplicate_index.get_stats()["waits"] < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result["success"] for result in results)
+    assert sum(1 for result in results if result.get("duplicate")) == 3
+    assert database.get_stats()["total"] == 1
+    assert len(list((pipeline_env / "PDF").iterdir())) == 1
+
+
+def test_unique_hash_conflict_returns_stored_duplicate(pipeline_env, monkeypatch):
+    """Test that losing the file_hash INSERT race returns the stored result"""
+    import hashlib
+    from src.business import invoice_processor
+    from src.database import database
+
+    extract = invoice_processor.extract_invoice_data
+    content = b"invoice:1701"
+
+    def extract_while_other_request_saves(pdf_path, file_hash=None):
+        # Request that did not see our claim (e.g. a batch) stores the same PDF
+        database.save_invoice(
+            customer_name="Test Customer", invoice_number="1701", invoice_date="16.09.2025",
+            total_amount=12.30, file_path=str(pipeline_env / "PDF" / "other.pdf"),
+            file_hash=hashlib.md5(content).hexdigest()
+        )
+        return extract(pdf_path, file_hash)
+
+    monkeypatch.setattr(invoice_processor, "extract_invoice_data", extract_while_other_request_saves)
+
+    result = invoice_processor.process_invoice_request(make_request(content))
+
+    assert result["duplicate"] is True
+    assert result["pdf_saved"] == str(pipeline_env / "PDF" / "other.pdf")
+    assert database.get_stats()["total"] == 1
+    # Our redundant copy is removed
+    assert not list((pipeline_env / "PDF").iterdir())
+
+
+def test_process_invoice_batch_per_item_results(pipeline_env):
+    """Test batch returns per-item results and isolates failures"""
+    from src.business.invoice_processor import process_invoice_batch
+    from src.database import database
+
+    results = process_invoice_batch([
+        make_request(b"invoice:2001", "a.pdf"),
+        make_request(b"broken", "b.pdf"),
+        make_request(b"invoice:2003", "c.pdf"),
+        # Same content as first item - stored result of the first item
+        make_request(b"invoice:2001", "d.pdf"),
+    ])
+
+    assert [r["success"] for r in results] == [True, False, True, True]
+    assert results[0]["invoice_number"] == "2001"
+    assert "extract" in results[1]["message"]
+    assert results[3]["duplicate"] is True
+    assert results[3]["pdf_saved"] == results[0]["pdf_saved"]
+    assert database.get_stats()["total"] == 2
+    # Copy of the duplicate item is removed
+    assert not list((pipeline_env / "PDF").glob("*_d.pdf"))
+
+
+def test_process_invoice_batch_same_filename(pipeline_env):
+    """Test that batch items with the same attachment name keep their own PDF"""
+    from src.business.invoice_processor import process_invoice_batch
+    from src.database import database
+
+    results = process_invoice_batch([
+        make_request(b"invoice:2101"),
+        make_request(b"invoice:2102"),
+        make_request(b"invoice:2103"),
+    ])
+
+    assert [r["invoice_number"] for r in results] == ["2101", "2102", "2103"]
+    paths = [r["pdf_saved"] for r in results]
+    assert len(set(paths)) == 3
+    for path, number in zip(paths, ["2101", "2102", "2103"]):
+        assert path.endswith("_invoice.pdf")
+        assert open(path, "rb").read() == f"invoice:{number}".encode()
+
+    stored = {invoice["invoice_number"]: invoice["pdf_path"] for invoice in database.get_all_invoices()}
+    assert stored == dict(zip(["2101", "2102", "2103"], paths))
+
+
+def test_batch_endpoint_rejects_oversized_batch(pipeline_env, monkeypatch):
+    """Test /invoices/batch size limit"""
+    import main
+    from fastapi.testclient import TestClient
+
+    config = main.config
+    monkeypatch.setattr(config, "MAX_BATCH_SIZE", 1)
+    request = make_request(b"invoice:3001").model_dump(by_alias=True)
+
+    response = TestClient(main.app).post(
+        "/invoices/batch",
+        headers={"X-API-Key": config.API_KEY},
+        json={"invoices": [request, request]}
+    )
+
+    assert response.status_code == 413
+
+
+def test_invoice_endpoint_raw_pdf_upload(pipeline_env):
+    """Test /invoice with raw application/pdf body and query metadata"""
+    import hashlib
+    import main
+    from fastapi.testclient import TestClient
+
+    response = TestClient(main.app).post(
+        "/invoice?filename=raw.pdf&message_id=msg-raw",
+        headers={"X-API-Key": main.config.API_KEY, "Content-Type": "application/pdf"},
+        content=b"invoice:4001"
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["invoice_number"] == "4001"
+    assert data["pdf_saved"].endswith("_raw.pdf")
+
+    stored = open(data["pdf_saved"], "rb").read()
+    assert stored == b"invoice:4001"
+    assert not list((pipeline_env / "PDF").glob("*.part"))
+
+    from src.database import database
+    invoice = database.get_all_invoices()[0]
+    assert invoice["file_hash"] == hashlib.md5(b"invoice:4001").hexdigest()
+
+
+def test_invoice_endpoint_multipart_upload(pipeline_env):
+    """Test /invoice with multipart/form-data upload"""
+    import main
+    from fastapi.testclient import TestClient
+
+    response = TestClient(main.app).post(
+        "/invoice",
+        headers={"X-API-Key": main.config.API_KEY},
+        files={"file": ("multi.pdf", b"invoice:4002", "application/pdf")},
+        data={"received_date": "2025-10-06T10:00:00"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["invoice_number"] == "4002"
+    assert data["received_date"] == "2025-10-06T10:00:00"
+    assert data["pdf_saved"].endswith("_multi.pdf")
+
+
+def test_invoice_endpoint_multipart_streamed_in_chunks(pipeline_env):
+    """Test multipart body parsed incrementally - fields after the file part"""
+    import main
+    from fastapi.testclient import TestClient
+
+    pdf = b"invoice:4004:" + b"0123456789abcdef" * 12800
+    boundary = "----invoice-boundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="upload.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + pdf + (
+        f"\r\n--{boundary}\r\n"
+        'Content-Disposition: form-data; name="filename"\r\n\r\n'
+        "renamed.pdf"
+        f"\r\n--{boundary}--\r\n"
+    ).encode()
+
+    def chunks():
+        for start in range(0, len(body), 1000):
+            yield body[start:start + 1000]
+
+    response = TestClient(main.app).post(
+        "/invoice",
+        headers={
+            "X-API-Key": main.config.API_KEY,
+            "Content-Type": f"multipart/form-data; boundary={boundary}"
+        },
+        content=chunks()
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["invoice_number"] == "4004"
+    assert data["pdf_saved"].endswith("_renamed.pdf")
+    assert open(data["pdf_saved"], "rb").read() == pdf
+    assert not list((pipeline_env / "PDF").glob("*.part"))
+
+
+def test_invoice_endpoint_multipart_missing_file(pipeline_env):
+    """Test multipart upload without 'file' part"""
+    import main
+    from fastapi.testclient import TestClient
+
+    response = TestClient(main.app).post(
+        "/invoice",
+        headers={"X-API-Key": main.config.API_KEY},
+        files={"subject": (None, "Faktúra")}
+    )
+
+    assert response.status_code == 422
+    assert not list((pipeline_env / "PDF").iterdir())
+
+
+def test_invoice_endpoint_upload_too_large(pipeline_env, monkeypatch):
+    """Test raw upload size limit removes partial file"""
+    import main
+    from fastapi.testclient import TestClient
+    from src.api import uploads
+
+    monkeypatch.setattr(uploads.config, "MAX_UPLOAD_SIZE_MB", 0)
+
+    response = TestClient(main.app).post(
+        "/invoice",
+        headers={"X-API-Key": main.config.API_KEY, "Content-Type": "application/octet-stream"},
+        content=b"invoice:4003"
+    )
+
+    assert response.status_code == 413
+    assert not list((pipeline_env / "PDF").iterdir())
+
+
+def test_invoice_endpoint_idempotency_key_replay(pipeline_env):
+    """Test retried /invoice with same Idempotency-Key returns cached response"""
+    import main
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    headers = {
+        "X-API-Key": main.config.API_KEY,
+        "Content-Type": "application/pdf",
+        "Idempotency-Key": "retry-5001"
+    }
+
+    first = client.post("/invoice?filename=retry.pdf", headers=headers, content=b"invoice:5001")
+    second = client.post("/invoice?filename=retry.pdf", headers=headers, content=b"invoice:5001")
+
+    assert first.status_code == second.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+
+    # Replayed upload must not leave a second PDF copy
+    assert len(list((pipeline_env / "PDF").iterdir())) == 1
+
+
+def test_invoice_endpoint_json_and_raw_share_default_key(pipeline_env):
+    """Test that one PDF sent as base64 JSON and as raw body is one request"""
+    import main
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    request = make_request(b"invoice:5002")
+    request.message_id = "msg-5002"
+
+    first = client.post(
+        "/invoice",
+        headers={"X-API-Key": main.config.API_KEY},
+        json=request.model_dump(by_alias=True)
+    )
+    second = client.post(
+        "/invoice?message_id=msg-5002",
+        headers={"X-API-Key": main.config.API_KEY, "Content-Type": "application/pdf"},
+        content=b"invoice:5002"
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert len(list((pipeline_env / "PDF").iterdir())) == 1
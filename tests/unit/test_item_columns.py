@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for columnar invoice item storage
+"""
+
+import pickle
+from decimal import Decimal
+
+
+def make_items():
+    from src.extractors.ls_extractor import InvoiceItem
+
+    return [
+        InvoiceItem(
+            line_number=1, item_code="293495", ean_code="8586000123456", description="Akcia KO",
+            quantity=Decimal("3"), unit="KS", unit_price_no_vat=Decimal("0.010"),
+            unit_price_with_vat=Decimal("0.012"), total_with_vat=Decimal("0.037"),
+            vat_rate=Decimal("23")
+        ),
+        InvoiceItem(line_number=2, description="Bez cien", unit="L"),
+        InvoiceItem(
+            line_number=3, quantity=Decimal("123456789012345678901234"),
+            unit_price_no_vat=Decimal("-1.50"), discount_percent=Decimal("1E+2")
+        ),
+    ]
+
+
+def test_round_trip_preserves_items():
+    """Test conversion back to InvoiceItem keeps values, None and exponents"""
+    from src.extractors.item_columns import ItemColumns
+
+    items = make_items()
+    columns = ItemColumns(items)
+
+    assert len(columns) == 3
+    assert columns.to_items() == items
+    assert columns[-1] == items[2]
+    assert str(columns[0].unit_price_no_vat) == "0.010"
+    assert columns.column("vat_rate") == [Decimal("23"), None, None]
+    assert columns.column("line_number") == [1, 2, 3]
+
+
+def test_columns_as_invoice_items_and_pickle():
+    """Test ItemColumns works as InvoiceData.items and crosses processes"""
+    from src.extractors.item_columns import ItemColumns
+    from src.extractors.ls_extractor import InvoiceData
+
+    data = InvoiceData(invoice_number="1", items=ItemColumns(make_items()))
+    restored = pickle.loads(pickle.dumps(data))
+
+    assert [item.line_number for item in restored.items] == [1, 2, 3]
+    assert list(restored.items) == make_items()
+    assert not hasattr(data, "__dict__")
+
+
+def test_extraction_stores_items_as_columns():
+    """Test parsed invoice items are kept columnar and still behave like a list"""
+    from src.extractors.item_columns import ItemColumns
+    from src.extractors.ls_extractor import LSInvoiceExtractor
+
+    pages = [
+        "FAKTÚRA - DAŇOVÝ DOKLAD č. 32510374\n"
+        "č. Názov Množstvo MJ Zľava Cena/MJ bez DPH Cena/MJ s DPH Spolu s DPH\n"
+        "1 Akcia KO 3 KS 0.010 0.012 0.037\n"
+        "293495 23% 0.010 0.012",
+        "2 Skrutka 10 KS 0.100 0.123 1.230\n"
+        "293496 8586000123456 23% 0.100 0.123\n"
+        "23 % Základ DPH 1.01 EUR\nCelkom k úhrade 1.24 EUR",
+    ]
+    extractor = LSInvoiceExtractor()
+    data = extractor.extract_from_pages(pages)
+
+    assert isinstance(data.items, ItemColumns)
+    assert data.items == extractor._extract_items("\n".join(pages))
+    assert [item.item_code for item in data.items[:1]] == ["293495"]
+    assert data.items[1].ean_code == "8586000123456"
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for asynchronous invoice jobs
+"""
+
+import asyncio
+import base64
+
+import pytest
+
+
+@pytest.fixture
+def job_env(tmp_path, monkeypatch):
+    """Temporary SQLite database and jobs directory"""
+    from src.business import job_queue
+    from src.database import database
+
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "jobs_test.db")
+    monkeypatch.setattr(job_queue.config, "JOBS_DIR", tmp_path / "JOBS")
+    return tmp_path
+
+
+def make_request(filename="test.pdf"):
+    from src.api.models import InvoiceRequest
+
+    return InvoiceRequest(
+        file_b64=base64.b64encode(b"dummy pdf content").decode(),
+        filename=filename,
+        message_id="msg-1"
+    )
+
+
+def test_job_completes_with_result(job_env):
+    """Test that queued job is processed and result stored"""
+    from src.business.job_queue import JobManager
+
+    manager = JobManager(workers=1, processor=lambda req: {"invoice_number": req.filename})
+    try:
+        job_id = manager.submit(make_request("A.pdf"))
+        job = asyncio.run(manager.wait(job_id, timeout=5))
+
+        assert job["status"] == "done"
+        assert job["result"] == {"invoice_number": "A.pdf"}
+        assert job["attempts"] == 1
+        # Payload removed after success
+        assert not (job_env / "JOBS" / f"{job_id}.json").exists()
+    finally:
+        manager.stop()
+
+
+def test_job_failure_is_recorded(job_env):
+    """Test that processing error marks job as failed"""
+    from src.business.job_queue import JobManager
+
+    def fail(request):
+        raise Exception("Failed to extract data from PDF")
+
+    manager = JobManager(workers=1, processor=fail)
+    try:
+        job_id = manager.submit(make_request())
+        job = asyncio.run(manager.wait(job_id, timeout=5))
+
+        assert job["status"] == "failed"
+        assert "extract" in job["error"]
+    finally:
+        manager.stop()
+
+
+def test_unknown_job_returns_none(job_env):
+    """Test lookup of unknown job ID"""
+    from src.business.job_queue import JobManager
+    from src.database import database
+
+    database.init_database()
+    manager = JobManager(workers=1)
+
+    assert manager.get("does-not-exist") is None
+
+
+def test_wait_is_woken_by_job_completion(job_env):
+    """Test long-poll returns on completion without polling the database"""
+    import threading
+    import time
+    from src.business.job_queue import JobManager
+
+    release = threading.Event()
+
+    def processor(req):
+        release.wait(5)
+        return {"invoice_number": req.filename}
+
+    manager = JobManager(workers=1, processor=processor)
+    reads = []
+    get = manager.get
+    manager.get = lambda job_id: reads.append(job_id) or get(job_id)
+    try:
+        job_id = manager.submit(make_request("C.pdf"))
+        threading.Timer(0.2, release.set).start()
+
+        started = time.monotonic()
+        job = asyncio.run(manager.wait(job_id, timeout=10))
+
+        assert job["status"] == "done"
+        assert time.monotonic() - started < 5
+        # Status before waiting and after wake-up only
+        assert len(reads) == 2
+        assert not manager._waiters
+    finally:
+        release.set()
+        manager.stop()
+
+
+def test_interrupted_job_is_resumed(job_env):
+    """Test that jobs left queued by a previous run are requeued on start"""
+    from src.business.job_queue import JobManager, config
+    from src.database import database
+
+    database.init_database()
+    config.JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    payload_path = config.JOBS_DIR / "old-job.json"
+    payload_path.write_text(make_request("old.pdf").model_dump_json(by_alias=True))
+    database.insert_job("old-job", str(payload_path), filename="old.pdf")
+    database.update_job("old-job", "processing")
+
+    manager = JobManager(workers=1, processor=lambda req: {"invoice_number": req.filename})
+    try:
+        manager.start()
+        job = asyncio.run(manager.wait("old-job", timeout=5))
+
+        assert job["status"] == "done"
+        assert job["attempts"] == 2
+    finally:
+        manager.stop()
+
+
+def test_invoice_endpoint_async_mode(job_env, monkeypatch):
+    """Test POST /invoice?async=true returns 202 and job is pollable"""
+    import main
+    from fastapi.testclient import TestClient
+    from src.business.job_queue import JobManager
+    from src.utils import config
+
+    manager = JobManager(workers=1, processor=lambda req: {"invoice_number": "123"})
+    monkeypatch.setattr(main, "job_manager", manager)
+    client = TestClient(main.app)
+    headers = {"X-API-Key": config.API_KEY}
+
+    try:
+        response = client.post(
+            "/invoice?async=true",
+            headers=headers,
+            json=make_request().model_dump(by_alias=True)
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        response = client.get(f"/jobs/{job_id}/wait?timeout=5", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["status"] == "done"
+
+        response = client.get("/jobs/unknown", headers=headers)
+        assert response.status_code == 404
+    finally:
+        manager.stop()
+
+
+def test_job_queue_is_bounded(job_env):
+    """Test submit beyond max_queued raises JobQueueFull until a job finishes"""
+    import threading
+    import time
+    from src.business.job_queue import JobManager, JobQueueFull
+
+    release = threading.Event()
+
+    def blocking(request):
+        release.wait(5)
+        return {"invoice_number": request.filename}
+
+    manager = JobManager(workers=1, processor=blocking, max_queued=2)
+    try:
+        first = manager.submit(make_request("A.pdf"))
+        manager.submit(make_request("B.pdf"))
+        with pytest.raises(JobQueueFull):
+            manager.submit(make_request("C.pdf"))
+        assert manager.is_full
+        assert manager.get_stats()["rejected_total"] == 1
+        # Rejected request left no payload behind
+        assert len(list((job_env / "JOBS").glob("*.json"))) == 2
+
+        release.set()
+        assert asyncio.run(manager.wait(first, timeout=5))["status"] == "done"
+        for _ in range(100):
+            if not manager.is_full:
+                break
+            time.sleep(0.01)
+        manager.submit(make_request("D.pdf"))
+    finally:
+        release.set()
+        manager.stop()
+
+
+def test_invoice_endpoint_async_mode_returns_503_when_queue_full(job_env, monkeypatch):
+    """Test POST /invoice?async=true answers 503 instead of queueing without limit"""
+    import main
+    from fastapi.testclient import TestClient
+    from src.business.job_queue import JobManager
+    from src.utils import config
+
+    manager = JobManager(workers=1, processor=lambda req: {"invoice_number": "123"}, max_queued=1)
+    monkeypatch.setattr(main, "job_manager", manager)
+    monkeypatch.setattr(manager, "_pending", 1)
+    monkeypatch.setattr(config, "PDF_DIR", job_env / "PDF")
+    (job_env / "PDF").mkdir()
+    client = TestClient(main.app)
+    headers = {"X-API-Key": config.API_KEY}
+
+    try:
+        response = client.post(
+            "/invoice?async=true",
+            headers={**headers, "Idempotency-Key": "queue-full-json"},
+            json=make_request().model_dump(by_alias=True)
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+        response = client.post(
+            "/invoice?async=true&filename=a.pdf",
+            headers={**headers, "Idempotency-Key": "queue-full-raw", "Content-Type": "application/pdf"},
+            content=b"%PDF-1.4 dummy"
+        )
+        assert response.status_code == 503
+        assert list((job_env / "PDF").iterdir()) == []
+    finally:
+        manager.stop()
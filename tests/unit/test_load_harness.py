@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for load-test harness (in-process, fake PostgreSQL)
+"""
+
+import asyncio
+
+
+def test_percentile_interpolates():
+    """Test percentile of sorted values"""
+    from tests.load_harness import percentile
+
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 95) == 0.0
+
+
+def test_in_process_load_run_reports_stages(tmp_path, monkeypatch):
+    """Test small load run through ASGI app records every pipeline stage"""
+    import httpx
+
+    from src.extractors.extraction_pool import extraction_pool
+    from src.utils import config
+    from tests.load_harness import (
+        FakePostgresStagingClient, StageRecorder, in_process_environment, run_load, synthetic_corpus,
+    )
+
+    monkeypatch.setattr(extraction_pool, "processes", 0)
+    corpus = synthetic_corpus(3, items=2)
+    recorder = StageRecorder()
+
+    async def run(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            return await run_load(client, corpus, 4, 2, recorder, config.API_KEY)
+
+    with in_process_environment(tmp_path, recorder) as app:
+        report = asyncio.run(run(app))
+
+    assert report["status_codes"] == {"200": 4}
+    stages = report["stages"]
+    assert stages["request"]["count"] == 4
+    # 4th request repeats the first PDF - stops at duplicate check
+    assert stages["check_duplicate"]["count"] == 4
+    assert stages["extract_saved_invoice"]["count"] == 3
+    assert stages["save_to_postgres_staging"]["count"] == 3
+    assert stages["save_invoice"]["error_rate"] == 0
+    assert FakePostgresStagingClient.items_inserted == 6
+    assert len(list((tmp_path / "PDF").glob("*.pdf"))) == 3
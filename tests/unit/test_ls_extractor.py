@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for L&Š header extraction (without PDF)
+"""
+
+from decimal import Decimal
+
+SAMPLE_TEXT = """L & Š, s.r.o.
+IČO: 36555720 DIČ: 2020204418 IČ DPH: SK2020204418
+FAKTÚRA - DAŇOVÝ DOKLAD č. 32510374
+Dátum vystavenia: 1 6 . 0 9 . 2 0 2 5
+Dátum splatnosti: 3 0 . 0 9 . 2 0 2 5
+Dátum daňovej povinnosti: 1 6 . 0 9 . 2 0 2 5
+IBAN: SK12 0200 0000 0012 3456 7890 BIC: SUBASKBX
+Variabilný symbol: 3 2 5 1 0 3 7 4
+Konštantný symbol: 0 0 0 8
+MÁGERSTAV, spol. s r.o.
+
+Hlavná 1, Bratislava IČO odberateľ: 3 1 4 3 6 8 7 1
+DIČ odberateľ: 2 0 2 0 3 6 7 1 5 1
+IČDPH odberateľ: S K 2 0 2 0 3 6 7 1 5 1
+č. Názov Množstvo MJ Zľava Cena/MJ bez DPH Cena/MJ s DPH Spolu s DPH
+1 Akcia KO 3 KS 0.010 0.012 0.037
+293495 23% 0.010 0.012
+23 % Základ DPH 1 2 3.45 EUR
+DPH 28.39 EUR
+Celkom k úhrade 151.84 EUR
+"""
+
+
+def legacy_scan(text):
+    """First re.search of every pattern - behaviour before the scanner"""
+    from src.extractors.ls_extractor import HEADER_PATTERNS
+
+    values = {}
+    for name, pattern in HEADER_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            values[name] = match.group(1).strip() if match.lastindex else match.group(0).strip()
+    return values
+
+
+def test_scan_matches_per_pattern_search():
+    """Test single scan finds the same values as separate searches"""
+    from src.extractors.ls_extractor import HEADER_PATTERNS, scan_header_fields
+
+    values = scan_header_fields(SAMPLE_TEXT)
+
+    assert values == legacy_scan(SAMPLE_TEXT)
+    assert set(values) == set(HEADER_PATTERNS)
+
+
+def test_scan_is_case_insensitive_and_takes_first_match():
+    """Test IGNORECASE semantics and leftmost match are preserved"""
+    from src.extractors.ls_extractor import scan_header_fields
+
+    text = SAMPLE_TEXT.replace("FAKTÚRA", "faktúra").replace("Celkom k úhrade", "CELKOM K ÚHRADE")
+    text += "Celkom k úhrade 999.99 EUR\n"
+
+    values = scan_header_fields(text)
+
+    assert values == legacy_scan(text)
+    assert values["invoice_number"] == "32510374"
+    assert values["total_amount"] == "151.84"
+
+
+def test_scan_without_fields():
+    """Test text without any header fields"""
+    from src.extractors.ls_extractor import scan_header_fields
+
+    text = "Dobrý deň,\nv prílohe posielame dodací list.\n"
+    assert scan_header_fields(text) == legacy_scan(text) == {}
+
+
+def test_extract_header_cleans_values():
+    """Test header values are normalized"""
+    from src.extractors.ls_extractor import LSInvoiceExtractor
+
+    data = LSInvoiceExtractor()._extract_header(SAMPLE_TEXT)
+
+    assert data.invoice_number == "32510374"
+    assert data.issue_date == "16.09.2025"
+    assert data.due_date == "30.09.2025"
+    assert data.net_amount == Decimal("123.45")
+    assert data.tax_amount == Decimal("28.39")
+    assert data.total_amount == Decimal("151.84")
+    assert data.customer_name == "MÁGERSTAV, spol. s r.o."
+    assert data.customer_ico == "31436871"
+    assert data.customer_icdph == "SK2020367151"
+    assert data.iban == "SK1202000000001234567890"
+    assert data.variable_symbol == "32510374"
+
+
+def test_iter_items_yields_items_lazily():
+    """Test generator yields finished items before later pages are read"""
+    from src.extractors.ls_extractor import LSInvoiceExtractor, iter_items
+
+    header, table = SAMPLE_TEXT.split("1 Akcia KO", 1)
+    rows = []
+    for number in range(1, 501):
+        rows.append(f"{number} Tovar {number} 2 KS 1.00 1.23 2.46")
+        rows.append(f"{100000 + number} 8586000{number:06d} 23%")
+    pages = [header + "\n".join(rows[i:i + 100]) for i in range(0, len(rows), 100)]
+    pages.append("23 % Základ DPH 1 2 3.45 EUR\nCelkom k úhrade 151.84 EUR")
+
+    read = []
+
+    def page_texts():
+        for page in pages:
+            read.append(page)
+            yield page if len(read) == 1 else page[len(header):]
+
+    items = iter_items(page_texts())
+    first = next(items)
+
+    assert first.line_number == 1 and first.item_code == "100001"
+    assert len(read) == 1
+
+    rest = list(items)
+    whole = LSInvoiceExtractor()._extract_items("\n".join(
+        [pages[0]] + [page[len(header):] for page in pages[1:]]
+    ))
+    assert [first] + rest == whole
+    assert len(whole) == 500
+    assert whole[-1].ean_code == "8586000000500"
+
+
+def test_invoice_item_has_slots():
+    """Test item records do not carry a per-instance __dict__"""
+    from src.extractors.ls_extractor import InvoiceItem
+
+    item = InvoiceItem(line_number=1)
+    assert not hasattr(item, "__dict__")
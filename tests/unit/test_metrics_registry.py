@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for labeled metrics registry (Prometheus text format)
+"""
+
+import pytest
+
+
+def test_histogram_buckets_and_quantile():
+    """Test histogram bucket counts (le semantics) and quantile estimate"""
+    from src.utils.metrics_registry import Histogram
+
+    histogram = Histogram((0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [2, 3, 4]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert histogram.quantile(0.625) == pytest.approx(0.55)
+    # +Inf bucket - highest finite bound
+    assert histogram.quantile(0.99) == 1.0
+
+
+def test_registry_renders_labeled_families():
+    """Test counter, gauge and histogram exposition with labels"""
+    from src.utils.metrics_registry import MetricsRegistry
+
+    registry = MetricsRegistry()
+    invoices = registry.counter("invoices_total", "Invoices", ("customer", "status"))
+    registry.gauge("uptime_seconds", "Uptime", function=lambda: 12.5)
+    registry.gauge("broken", "Callback error is skipped", function=lambda: 1 / 0)
+    latency = registry.histogram("stage_seconds", "Latency", (0.1, 1.0), ("stage",))
+
+    invoices.labels("A \"quoted\"", "processed").inc()
+    invoices.labels(customer="B", status="failed").inc(2)
+    latency.labels("extract").observe(0.5)
+
+    text = registry.render()
+
+    assert '# TYPE invoices_total counter' in text
+    assert 'invoices_total{customer="A \\"quoted\\"",status="processed"} 1' in text
+    assert 'invoices_total{customer="B",status="failed"} 2' in text
+    assert 'uptime_seconds 12.5' in text
+    assert '# TYPE broken gauge' in text and '\nbroken ' not in text
+    assert 'stage_seconds_bucket{stage="extract",le="0.1"} 0' in text
+    assert 'stage_seconds_bucket{stage="extract",le="+Inf"} 1' in text
+    assert 'stage_seconds_sum{stage="extract"} 0.5' in text
+    assert invoices.total(status="failed") == 2
+    assert invoices.total() == 3
+
+    with pytest.raises(ValueError):
+        invoices.labels("only-customer")
+    with pytest.raises(ValueError):
+        invoices.labels("A", "processed").inc(-1)
+    with pytest.raises(ValueError):
+        registry.counter("invoices_total", "Duplicate name")
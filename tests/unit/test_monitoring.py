@@ -241,6 +241,114 @@ def test_get_metrics_prometheus():
     assert '# HELP' in result
     assert '# TYPE' in result
     assert 'app_uptime_seconds' in result
+    assert '# TYPE app_stage_duration_seconds histogram' in result
+
+
+def test_stage_histograms_prometheus_format(monkeypatch):
+    """Test stage timing and invoice size in Prometheus output"""
+    from src.utils import monitoring
+
+    metrics = monitoring.ApplicationMetrics()
+    with metrics.time_stage("extract"):
+        pass
+    metrics.observe_stage("sqlite", 0.2)
+    metrics.observe_invoice_size(pages=3, items=40)
+
+    assert metrics.stage_seconds.labels("extract").count == 1
+    assert metrics.stage_seconds.labels("sqlite").summary()["count"] == 1
+
+    monkeypatch.setattr(monitoring, "metrics", metrics)
+    text = monitoring.get_metrics_prometheus()
+
+    assert 'app_stage_duration_seconds_bucket{stage="sqlite",le="0.25"} 1' in text
+    assert 'app_stage_duration_seconds_bucket{stage="sqlite",le="0.1"} 0' in text
+    assert 'app_stage_duration_seconds_count{stage="sqlite"} 1' in text
+    assert 'app_invoice_pages_bucket{le="3.0"} 1' in text
+    assert 'app_invoice_items_bucket{le="+Inf"} 1' in text
+
+    metrics.reset_counters()
+    assert metrics.invoice_items.labels().count == 0
+
+
+def test_labeled_invoice_counters(monkeypatch):
+    """Test invoice outcomes are labeled by configured customer and status"""
+    from src.utils import monitoring
+
+    monkeypatch.setattr(monitoring.config, "CUSTOMER_NAME", "MAGERSTAV")
+    metrics = monitoring.ApplicationMetrics()
+    metrics.increment_processed()
+    metrics.increment_processed()
+    metrics.increment_failed()
+    with pytest.raises(ValueError):
+        with metrics.time_stage("extract"):
+            raise ValueError("broken PDF")
+
+    assert metrics.invoices_processed == 2
+    assert metrics.invoices_failed == 1
+    assert metrics.extraction_errors == 1
+
+    monkeypatch.setattr(monitoring, "metrics", metrics)
+    text = monitoring.get_metrics_prometheus()
+
+    assert 'app_invoices_total{customer="MAGERSTAV",status="processed"} 2' in text
+    assert 'app_stage_errors_total{stage="extract"} 1' in text
+    assert '# TYPE app_uptime_seconds gauge' in text
+    assert f'app_info{{version="{monitoring.APP_VERSION}"' in text
+
+
+def test_prometheus_scrape_does_not_query_database(monkeypatch):
+    """Test that Prometheus output is built without database.get_stats()"""
+    from src.utils import monitoring
+
+    def fail_get_stats(*args, **kwargs):
+        raise AssertionError("Scrape must not query the database")
+
+    monkeypatch.setattr(monitoring.database, "get_stats", fail_get_stats)
+
+    assert 'app_invoices_total' in monitoring.get_metrics_prometheus()
+
+
+def test_deprecated_prometheus_series_are_kept(monkeypatch, tmp_path):
+    """Test pre-2.0 metric names are still exported next to the labeled ones"""
+    from src.utils import monitoring
+
+    monkeypatch.setattr(monitoring.database, "DB_FILE", tmp_path / "metrics_test.db")
+    monitoring.database.init_database()
+
+    metrics = monitoring.ApplicationMetrics()
+    metrics.increment_processed()
+    metrics.increment_failed()
+    metrics.increment_duplicate()
+    monkeypatch.setattr(monitoring, "metrics", metrics)
+
+    text = monitoring.get_metrics_prometheus()
+
+    assert '# TYPE app_invoices_processed_total counter' in text
+    assert 'app_invoices_processed_total 1' in text
+    assert 'app_invoices_failed_total 1' in text
+    assert 'app_invoices_duplicates_total 1' in text
+    assert 'db_invoices_total 0' in text
+    assert '# TYPE health_overall gauge' in text
+
+
+def test_health_overall_is_cached_between_scrapes(monkeypatch):
+    """Test scrapes reuse the storage check instead of writing test files each time"""
+    from src.utils import monitoring
+
+    checks = []
+    monkeypatch.setattr(monitoring, "_check_health_overall", lambda: checks.append(1) or 1)
+    monkeypatch.setattr(monitoring, "_health_checked_at", None)
+
+    assert monitoring._health_overall() == 1
+    assert monitoring._health_overall() == 1
+    assert len(checks) == 1
+
+    # Expired - checked again
+    monkeypatch.setattr(
+        monitoring, "_health_checked_at", time.monotonic() - monitoring.HEALTH_OVERALL_TTL_SECONDS
+    )
+    monitoring._health_overall()
+    assert len(checks) == 2
 
 
 def test_global_metrics_instance():
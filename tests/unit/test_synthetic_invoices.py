@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for synthetic L&Š invoice generator (benchmark corpus)
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("item_count", [1, 80])
+def test_synthetic_invoice_extracts_to_expected_values(tmp_path, monkeypatch, item_count):
+    """Test generated PDF round-trips through the L&Š extractor"""
+    from src.extractors import ls_extractor
+    from tests.synthetic_invoices import make_invoice_pdf
+
+    monkeypatch.setattr(ls_extractor.text_cache, "enabled", False)
+    pdf, pages, expected = make_invoice_pdf(item_count, seed=item_count)
+    pdf_path = tmp_path / "synthetic.pdf"
+    pdf_path.write_bytes(pdf)
+
+    data = ls_extractor.extract_invoice_data_local(str(pdf_path))
+
+    assert expected["pages"] == len(pages) == (1 if item_count == 1 else 3)
+    assert data.invoice_number == expected["invoice_number"]
+    assert data.issue_date == expected["issue_date"]
+    assert data.customer_ico == expected["customer_ico"]
+    assert (data.net_amount, data.tax_amount, data.total_amount) == (
+        expected["net_amount"], expected["tax_amount"], expected["total_amount"]
+    )
+    assert [(i.item_code, i.ean_code, i.quantity, i.total_with_vat) for i in data.items] == expected["items"]
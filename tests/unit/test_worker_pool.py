@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for invoice processing worker pool
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+
+def test_worker_pool_runs_task():
+    """Test that submitted task runs and returns result"""
+    from src.utils.worker_pool import WorkerPool
+
+    pool = WorkerPool(max_workers=2, max_pending=0)
+    try:
+        future = pool.submit(lambda a, b: a + b, 2, 3)
+        assert future.result(timeout=5) == 5
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_rejects_when_full():
+    """Test that pool raises WorkerPoolFull beyond workers + pending"""
+    from src.utils.worker_pool import WorkerPool, WorkerPoolFull
+
+    pool = WorkerPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    try:
+        first = pool.submit(release.wait, 5)
+        second = pool.submit(release.wait, 5)
+
+        with pytest.raises(WorkerPoolFull):
+            pool.submit(release.wait, 5)
+
+        assert pool.in_flight == 2
+        assert pool.get_stats()['rejected_total'] == 1
+
+        release.set()
+        first.result(timeout=5)
+        second.result(timeout=5)
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_worker_pool_releases_slot_on_error():
+    """Test that failing task frees its admission slot"""
+    from src.utils.worker_pool import WorkerPool
+
+    def fail():
+        raise ValueError("boom")
+
+    pool = WorkerPool(max_workers=1, max_pending=0)
+    try:
+        with pytest.raises(ValueError):
+            pool.submit(fail).result(timeout=5)
+
+        # Slot is free again
+        assert pool.submit(lambda: "ok").result(timeout=5) == "ok"
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_async_run():
+    """Test awaiting pool task from event loop"""
+    from src.utils.worker_pool import WorkerPool
+
+    pool = WorkerPool(max_workers=1, max_pending=0)
+    try:
+        result = asyncio.run(pool.run(lambda: threading.current_thread().name))
+        assert result.startswith("invoice-worker")
+    finally:
+        pool.shutdown()
+
+
+def test_invoice_endpoint_returns_503_when_pool_full(monkeypatch):
+    """Test /invoice back-pressure when worker pool is full"""
+    import base64
+    from fastapi.testclient import TestClient
+    from main import app
+    from src.utils import config, worker_pool
+    from src.utils.worker_pool import WorkerPool
+
+    full_pool = WorkerPool(max_workers=1, max_pending=0)
+    release = threading.Event()
+    blocker = full_pool.submit(release.wait, 5)
+    monkeypatch.setattr(worker_pool, "invoice_pool", full_pool)
+
+    try:
+        response = TestClient(app).post(
+            "/invoice",
+            headers={"X-API-Key": config.API_KEY},
+            json={"file_b64": base64.b64encode(b"dummy").decode(), "filename": "test.pdf"}
+        )
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+        full_pool.shutdown()
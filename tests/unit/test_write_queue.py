@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for single-writer SQLite queue with group commit
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def writer(tmp_path):
+    """WriteQueue on a temporary database with one table"""
+    from src.database.write_queue import WriteQueue
+
+    db_file = str(tmp_path / "write_queue_test.db")
+    connections = {}
+
+    def connect(path):
+        key = (threading.get_ident(), path)
+        if key not in connections:
+            connections[key] = sqlite3.connect(path, check_same_thread=False)
+        return connections[key]
+
+    connect(db_file).execute("CREATE TABLE items (name TEXT UNIQUE)")
+    queue = WriteQueue(connect)
+    yield queue, db_file
+    queue.stop()
+    for conn in connections.values():
+        conn.close()
+
+
+def insert(cursor, name):
+    cursor.execute("INSERT INTO items (name) VALUES (?)", (name,))
+    return cursor.lastrowid
+
+
+def test_queued_writes_share_one_commit(writer):
+    """Test writes queued while the writer is busy are committed together"""
+    queue, db_file = writer
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(cursor):
+        started.set()
+        release.wait(5)
+        return insert(cursor, "first")
+
+    first = queue.submit(db_file, blocking)
+    assert started.wait(5)
+    futures = [queue.submit(db_file, insert, f"item-{n}") for n in range(10)]
+    release.set()
+
+    assert first.result(5) == 1
+    assert [future.result(5) for future in futures] == list(range(2, 12))
+    stats = queue.get_stats()
+    assert stats["operations"] == 11
+    assert stats["commits"] == 2
+
+
+def test_failed_write_does_not_roll_back_group(writer):
+    """Test that a failing write gets its exception, others in group are committed"""
+    queue, db_file = writer
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(cursor):
+        started.set()
+        release.wait(5)
+        return insert(cursor, "a")
+
+    first = queue.submit(db_file, blocking)
+    assert started.wait(5)
+    duplicate = queue.submit(db_file, insert, "a")
+    other = queue.submit(db_file, insert, "b")
+    release.set()
+
+    first.result(5)
+    with pytest.raises(sqlite3.IntegrityError):
+        duplicate.result(5)
+    assert other.result(5)
+
+    rows = sqlite3.connect(db_file).execute("SELECT name FROM items ORDER BY name").fetchall()
+    assert rows == [("a",), ("b",)]
+
+
+def test_stop_never_starts_second_writer(writer):
+    """Test writes submitted while stopping are rejected, nested writes of the last batch run inline"""
+    queue, db_file = writer
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(cursor):
+        started.set()
+        release.wait(5)
+        return queue.submit(db_file, insert, "nested").result(5)
+
+    first = queue.submit(db_file, blocking)
+    assert started.wait(5)
+    writer_thread = queue._thread
+    stopper = threading.Thread(target=queue.stop)
+    stopper.start()
+    deadline = time.monotonic() + 5
+    while not queue._stopping and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    late = queue.submit(db_file, insert, "late")
+    with pytest.raises(RuntimeError):
+        late.result(5)
+    assert queue._thread is writer_thread
+
+    release.set()
+    stopper.join(5)
+    assert first.result(5) == 1
+    assert not queue.running
+
+    # Next write starts a fresh writer
+    assert queue.submit(db_file, insert, "after").result(5) == 2
+    rows = sqlite3.connect(db_file).execute("SELECT name FROM items ORDER BY rowid").fetchall()
+    assert rows == [("nested",), ("after",)]
+    assert queue.get_stats()["commits"] == 2
+
+
+def test_database_writes_go_through_writer_thread(tmp_path, monkeypatch):
+    """Test that database.save_invoice runs on the writer thread and returns the row ID"""
+    from src.database import database
+
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "writer_test.db")
+    database.init_database()
+
+    threads = []
+    real_insert = database._insert_invoice_row
+
+    def recording_insert(cursor, *args):
+        threads.append(threading.current_thread().name)
+        return real_insert(cursor, *args)
+
+    monkeypatch.setattr(database, "_insert_invoice_row", recording_insert)
+
+    invoice_id = database.save_invoice("C", "1001", "16.09.2025", 12.3, "/tmp/a.pdf", "hash-a")
+
+    assert threads == ["sqlite-writer"]
+    assert database.get_invoice_by_id(invoice_id)["invoice_number"] == "1001"
+    database.close_connections()